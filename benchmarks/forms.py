@@ -0,0 +1,64 @@
+# coding: utf-8
+"""
+    benchmarks.forms
+    ~~~~~~~~~~~~~~~~
+
+    Compares the methods generated for forms by :mod:`relief.schema.codegen`
+    with the generic implementation for forms with many fields.
+
+    Run with ``python benchmarks/forms.py``.
+
+    :copyright: 2013 by Daniel Neuhäuser
+    :license: BSD, see LICENSE.rst for details
+"""
+from __future__ import print_function
+import os
+import sys
+from timeit import repeat
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from relief import Form, Integer
+
+
+def measure(function, number=200):
+    return min(repeat(function, number=number, repeat=5)) / number
+
+
+def main():
+    print("{0:>6} {1:>14} {2:>14} {3:>14}".format(
+        "fields", "operation", "generic", "generated"
+    ))
+    for fields in [10, 100]:
+        schema = Form.of([
+            ("field%d" % index, Integer) for index in range(fields)
+        ])
+        raw_value = dict(
+            ("field%d" % index, u"%d" % index) for index in range(fields)
+        )
+        native_value = dict(
+            ("field%d" % index, index) for index in range(fields)
+        )
+        forms = [schema.using(generate_code=False), schema.using()]
+        elements = [form(raw_value) for form in forms]
+        operations = [
+            ("instantiate", lambda form, element: form()),
+            ("set_from_raw",
+             lambda form, element: element.set_from_raw(raw_value)),
+            ("set_native",
+             lambda form, element: element.set_from_native(native_value)),
+            ("value", lambda form, element: element.value),
+            ("validate", lambda form, element: element.validate())
+        ]
+        for name, operation in operations:
+            timings = [
+                measure(lambda: operation(form, element)) * 1e6
+                for form, element in zip(forms, elements)
+            ]
+            print("{0:>6} {1:>14} {2:>12.1f}us {3:>12.1f}us".format(
+                fields, name, *timings
+            ))
+
+
+if __name__ == "__main__":
+    main()
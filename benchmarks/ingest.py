@@ -0,0 +1,61 @@
+# coding: utf-8
+"""
+    benchmarks.ingest
+    ~~~~~~~~~~~~~~~~~
+
+    Compares :func:`relief.ingest.csv.validate_rows` with reading rows using
+    :class:`csv.DictReader` and creating a form for each row.
+
+    Run with ``python benchmarks/ingest.py``.
+
+    :copyright: 2013 by Daniel Neuhäuser
+    :license: BSD, see LICENSE.rst for details
+"""
+from __future__ import print_function
+import io
+import os
+import csv
+import sys
+from timeit import repeat
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from relief import Form, Integer, Unicode
+from relief.ingest.csv import validate_rows
+
+
+def measure(function):
+    return min(repeat(function, number=1, repeat=3))
+
+
+def main():
+    print("{0:>7} {1:>6} {2:>14} {3:>14}".format(
+        "rows", "fields", "DictReader", "validate_rows"
+    ))
+    for rows, fields in [(5000, 5), (5000, 20)]:
+        schema = Form.of([
+            ("field%d" % index, Integer if index % 2 else Unicode)
+            for index in range(fields)
+        ])
+        data = u",".join(u"field%d" % index for index in range(fields))
+        data += u"\n" + (
+            u",".join(u"%d" % index for index in range(fields)) + u"\n"
+        ) * rows
+
+        def dict_reader():
+            for row in csv.DictReader(io.StringIO(data)):
+                form = schema(row)
+                form.validate()
+                form.value
+
+        def ingest():
+            for _ in validate_rows(schema, io.StringIO(data)):
+                pass
+
+        print("{0:>7} {1:>6} {2:>12.1f}ms {3:>12.1f}ms".format(
+            rows, fields, measure(dict_reader) * 1e3, measure(ingest) * 1e3
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# coding: utf-8
+"""
+    benchmarks.serialization
+    ~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Compares encoding the value of a large list of forms with :func:`json.dumps`
+    to :meth:`~relief.schema.core.BaseElement.to_json_bytes` and decoding with
+    :func:`json.loads` to :meth:`~relief.schema.core.BaseElement.from_json`.
+
+    Run with ``python benchmarks/serialization.py``.
+
+    :copyright: 2013 by Daniel Neuhäuser
+    :license: BSD, see LICENSE.rst for details
+"""
+from __future__ import print_function
+import os
+import sys
+import json
+from timeit import repeat
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from relief import Form, List, Integer, Unicode
+
+
+class Item(Form):
+    id = Integer
+    name = Unicode
+
+
+def measure(function, number=3):
+    return min(repeat(function, number=number, repeat=3)) / number
+
+
+def peak_memory(function):
+    if tracemalloc is None:
+        return float("nan")
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    print("{0:>8} {1:>12} {2:>14} {3:>14}".format(
+        "items", "measure", "json", "relief"
+    ))
+    for items in [1000, 100000]:
+        element = List.of(Item)([
+            {u"id": i, u"name": u"item %d" % i} for i in range(items)
+        ])
+        dumps = lambda: json.dumps(element.value).encode('ascii')
+        to_json_bytes = lambda: element.to_json_bytes()
+        print("{0:>8} {1:>12} {2:>12.1f}ms {3:>12.1f}ms".format(
+            items, "time", measure(dumps) * 1e3, measure(to_json_bytes) * 1e3
+        ))
+        print("{0:>8} {1:>12} {2:>12.1f}MB {3:>12.1f}MB".format(
+            items, "peak memory",
+            peak_memory(dumps) / 2.0 ** 20,
+            peak_memory(lambda: element.dump_json(Discard())) / 2.0 ** 20
+        ))
+        schema = element.__class__
+        data = element.to_json_bytes()
+        loads = lambda: schema(json.loads(data.decode('utf-8')))
+        from_json = lambda: schema.from_json(data)
+        print("{0:>8} {1:>12} {2:>12.1f}ms {3:>12.1f}ms".format(
+            items, "decode", measure(loads) * 1e3, measure(from_json) * 1e3
+        ))
+
+
+class Discard(object):
+    def write(self, chunk):
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# coding: utf-8
+"""
+    benchmarks.traversal
+    ~~~~~~~~~~~~~~~~~~~~
+
+    Compares the recursive methods of elements with the iterative functions
+    in :mod:`relief.schema.traversal` for deeply nested lists.
+
+    Run with ``python benchmarks/traversal.py``.
+
+    :copyright: 2013 by Daniel Neuhäuser
+    :license: BSD, see LICENSE.rst for details
+"""
+from __future__ import print_function
+import os
+import sys
+from timeit import repeat
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from relief import Tuple, List, Integer
+from relief.schema import traversal
+
+
+def nested(depth):
+    schema, raw_value = Integer, u"1"
+    for _ in range(depth):
+        schema, raw_value = Tuple.of(Integer, schema), (u"1", raw_value)
+    return schema, raw_value
+
+
+def measure(function, number=20):
+    return min(repeat(function, number=number, repeat=5)) / number
+
+
+def main():
+    print("{0:>6} {1:>10} {2:>14} {3:>14}".format(
+        "depth", "operation", "recursive", "iterative"
+    ))
+    for depth in [10, 100, 200]:
+        schema, raw_value = nested(depth)
+        element = schema(raw_value)
+        operations = [
+            (
+                "set",
+                lambda: element.set_from_raw(raw_value),
+                lambda: traversal.set_from_raw(element, raw_value)
+            ),
+            (
+                "validate",
+                lambda: element.validate(),
+                lambda: traversal.validate(element)
+            ),
+            (
+                "load",
+                lambda: (element.set_from_raw(raw_value), element.validate()),
+                lambda: traversal.load(element, raw_value)
+            ),
+            (
+                "value",
+                lambda: element.value,
+                lambda: traversal.get_value(element)
+            )
+        ]
+        for name, recursive, iterative in operations:
+            print("{0:>6} {1:>10} {2:>12.1f}us {3:>12.1f}us".format(
+                depth, name,
+                measure(recursive) * 1e6,
+                measure(iterative) * 1e6
+            ))
+
+    depth = 10000
+    schema, raw_value = Integer, 1
+    for _ in range(depth):
+        schema, raw_value = List.of(schema), [raw_value]
+    element = schema()
+    traversal.set_from_raw(element, raw_value)
+    assert traversal.validate(element)
+    print("{0:>6} {1:>10} {2:>14} {3:>12.1f}us".format(
+        depth, "validate", "-", measure(
+            lambda: traversal.validate(element), number=1
+        ) * 1e6
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -8,9 +8,11 @@
 """
 from relief.constants import Unspecified, NotUnserializable, Unnamed
 from relief.schema.core import Element
-from relief.schema.meta import Maybe
+from relief.validation import ValidationContext
+from relief.schema.meta import Maybe, OneOf
 from relief.schema.scalars import (
-    Boolean, Integer, Float, Complex, Unicode, Bytes
+    Boolean, Integer, Float, Complex, Unicode, Bytes, Enum, Literal, DateTime,
+    Date, Decimal, UUID
 )
 from relief.schema.mappings import Dict, OrderedDict, Form
 from relief.schema.sequences import Tuple, List
@@ -22,15 +24,16 @@ __version_info__ = (2, 1, 0)
 
 __all__ = [
     # constants
-    "Unspecified", "NotUnserializable", "Unnamed"
+    "Unspecified", "NotUnserializable", "Unnamed",
     # core
-    "Element",
+    "Element", "ValidationContext",
     # scalars
-    "Boolean", "Integer", "Float", "Complex", "Unicode", "Bytes",
+    "Boolean", "Integer", "Float", "Complex", "Unicode", "Bytes", "Enum",
+    "Literal", "DateTime", "Date", "Decimal", "UUID",
     # mappings
     "Dict", "OrderedDict", "Form",
     # sequences
     "Tuple", "List",
     # meta
-    "Maybe"
+    "Maybe", "OneOf"
 ]
@@ -34,6 +34,7 @@ if PY2:
         return d.iteritems()
 
     text_type = unicode
+    string_types = (str, unicode)
 
     class Prepareable(type):
         def __new__(cls, name, bases, attributes):
@@ -83,6 +84,7 @@ else:
         return iter(d.items())
 
     text_type = str
+    string_types = (str, )
 
     Prepareable = type
 
@@ -111,6 +113,6 @@ def implements_bool(cls):
 
 __all__ = [
     'Counter', 'OrderedDict', 'itervalues', 'iteritems', 'text_type',
-    'Prepareable', 'add_native_itermethods', 'with_metaclass',
+    'string_types', 'Prepareable', 'add_native_itermethods', 'with_metaclass',
     'implements_bool'
 ]
@@ -0,0 +1,552 @@
+# coding: utf-8
+"""
+    relief.cli
+    ~~~~~~~~~~
+
+    Command line interface for validating newline-delimited JSON files::
+
+        python -m relief.cli validate --schema module:Form input.ndjson
+
+    Each line of the input is a JSON document, that is validated against the
+    schema. The input is read in chunks of lines, which may be validated by
+    several processes, the order of the lines is preserved in the output.
+
+    :copyright: 2013 by Daniel Neuhäuser
+    :license: BSD, see LICENSE.rst for details
+"""
+from __future__ import print_function, division
+import os
+import sys
+import json
+import errno
+import argparse
+import importlib
+import collections
+import multiprocessing
+from timeit import default_timer
+
+from relief.schema import traversal
+from relief.utils import map_ordered, read_chunks
+from relief._compat import text_type, iteritems
+
+
+def import_schema(path):
+    """
+    Imports a schema given as ``'module:attribute'``, the attribute may
+    contain dots to refer to an attribute of an attribute.
+
+    Raises :exc:`ValueError`, if `path` is not of that form.
+
+    .. versionadded:: 2.2.0
+    """
+    module_name, separator, attribute = path.partition(':')
+    if not (module_name and separator and attribute):
+        raise ValueError("%r is not of the form 'module:attribute'" % path)
+    schema = importlib.import_module(module_name)
+    for name in attribute.split('.'):
+        schema = getattr(schema, name)
+    return schema
+
+
+def validate_line(schema, line, line_number, context=None):
+    """
+    Validates the JSON document in the UTF-8 encoded byte string `line`
+    against `schema` with the given validation `context`. Returns `None`, if
+    the document is valid, otherwise a report of the errors as a dictionary,
+    with the `line_number` and a list of errors with their paths.
+
+    Exceptions raised while the document is loaded, e.g. a :exc:`KeyError`
+    for an unknown key in a :class:`~relief.Form`, are reported as an error
+    of the document, so that a single bad line does not stop validation.
+
+    .. versionadded:: 2.2.0
+    """
+    try:
+        raw_value = json.loads(line.decode('utf-8'))
+    except ValueError as error:
+        return _report_document_error(
+            line_number, u'Not a valid JSON document: %s' % error
+        )
+    element = schema()
+    try:
+        is_valid = element.load(raw_value, context)
+    except Exception as error:
+        return _report_document_error(
+            line_number, u'Cannot be loaded: %s: %s' % (
+                error.__class__.__name__, error
+            )
+        )
+    if is_valid:
+        return None
+    return {
+        u'line': line_number,
+        u'errors': [
+            {u'path': list(path), u'errors': list(errors)}
+            for path, errors in traversal.iter_errors(element)
+        ]
+    }
+
+
+def _report_document_error(line_number, message):
+    return {
+        u'line': line_number,
+        u'errors': [{u'path': [], u'errors': [message]}]
+    }
+
+
+#: Schemas imported by :func:`_validate_chunk`, by their path.
+_schemas = {}
+
+
+def _validate_chunk(task):
+    """
+    Validates a chunk of lines, returns the indices of the valid lines, the
+    reports of the invalid ones as encoded JSON documents, the number of
+    errors per path and the time spent in each validator, if `profile` is
+    `True`.
+
+    Called in worker processes, so the schema is imported by path.
+    """
+    schema_path, first_line, lines, profile = task
+    try:
+        schema = _schemas[schema_path]
+    except KeyError:
+        schema = _schemas[schema_path] = import_schema(schema_path)
+    context = {'profile': {}} if profile else None
+    valid = []
+    reports = []
+    error_paths = collections.Counter()
+    for index, line in enumerate(lines):
+        if not line.strip():
+            continue
+        report = validate_line(schema, line, first_line + index, context)
+        if report is None:
+            valid.append(index)
+            continue
+        for error in report[u'errors']:
+            error_paths[_format_path(error[u'path'])] += len(error[u'errors'])
+        reports.append(json.dumps(
+            report, default=text_type, separators=(',', ':')
+        ).encode('ascii') + b'\n')
+    timings = {}
+    if profile:
+        for validator, seconds in context['profile'].items():
+            name = _get_validator_name(validator)
+            timings[name] = timings.get(name, 0.0) + seconds
+    return valid, reports, error_paths, timings
+
+
+def _format_path(path):
+    # Indices are replaced with *, so that errors in the members of
+    # sequences are counted together.
+    return u"/" + u"/".join(
+        u"*" if isinstance(key, int) else text_type(key) for key in path
+    )
+
+
+def _get_validator_name(validator):
+    name = getattr(validator, '__name__', None)
+    if name is None:
+        name = validator.__class__.__name__
+    return text_type(name)
+
+
+class ValidationStats(object):
+    """
+    Counts the lines, that have been validated.
+
+    .. versionadded:: 2.2.0
+    """
+    def __init__(self):
+        #: The number of lines that have been read.
+        self.lines = 0
+        #: The number of valid and invalid lines, blank lines are ignored.
+        self.valid = 0
+        self.invalid = 0
+        #: The number of bytes that have been read.
+        self.bytes = 0
+        #: A :class:`collections.Counter` of the number of errors per path,
+        #: indices in paths are replaced with ``*``.
+        self.error_paths = collections.Counter()
+        #: A dictionary mapping the names of validators to the time spent in
+        #: them in seconds, if validators are profiled.
+        self.profile = {}
+        self.started = default_timer()
+        self._resumed_records = 0
+        self._resumed_bytes = 0
+
+    def to_dict(self):
+        """
+        Returns the counts as a dictionary, that can be encoded as JSON.
+        """
+        return {
+            u'lines': self.lines,
+            u'valid': self.valid,
+            u'invalid': self.invalid,
+            u'bytes': self.bytes,
+            u'error_paths': dict(self.error_paths),
+            u'profile': self.profile
+        }
+
+    @classmethod
+    def from_dict(cls, counts):
+        """
+        Returns stats with the `counts` returned by :meth:`to_dict`, the
+        throughput is computed only for lines validated afterwards.
+        """
+        stats = cls()
+        stats.lines = counts[u'lines']
+        stats.valid = counts[u'valid']
+        stats.invalid = counts[u'invalid']
+        stats.bytes = counts[u'bytes']
+        stats.error_paths.update(counts[u'error_paths'])
+        stats.profile = dict(counts[u'profile'])
+        stats._resumed_records = stats.valid + stats.invalid
+        stats._resumed_bytes = stats.bytes
+        return stats
+
+    def format(self):
+        elapsed = max(default_timer() - self.started, 1e-9)
+        records = self.valid + self.invalid
+        return (
+            u"%d records (%d valid, %d invalid) in %.2fs, "
+            u"%.0f records/s, %.2f MB/s" % (
+                records, self.valid, self.invalid, elapsed,
+                (records - self._resumed_records) / elapsed,
+                (self.bytes - self._resumed_bytes) / elapsed / 1024 / 1024
+            )
+        )
+
+
+class CheckpointMismatch(ValueError):
+    """
+    Raised by :func:`validate_file`, if a checkpoint is resumed, that has been
+    created for another schema.
+
+    .. versionadded:: 2.2.0
+    """
+
+
+class Checkpoint(object):
+    """
+    Records the progress of :func:`validate_file` in the file at `path`,
+    after every `every` records or `interval` seconds, whichever comes first,
+    so that validation can be resumed after it has been interrupted.
+
+    Progress is checked after each chunk of lines has been validated, so
+    checkpoints may be further apart than `every` records. The file is
+    replaced atomically, it contains a JSON document with the offset up to
+    which the input has been validated, the offsets of the outputs at that
+    point and the :class:`ValidationStats`.
+
+    .. versionadded:: 2.2.0
+    """
+    def __init__(self, path, every=10000, interval=60.0):
+        self.path = path
+        self.every = every
+        self.interval = interval
+        self._last_records = 0
+        self._last_time = default_timer()
+
+    def load(self):
+        """
+        Returns the state saved in the checkpoint file as a dictionary or
+        `None`, if there is no such file.
+        """
+        try:
+            with open(self.path, 'rb') as checkpoint_file:
+                return json.loads(checkpoint_file.read().decode('utf-8'))
+        except (IOError, OSError) as error:
+            if error.errno == errno.ENOENT:
+                return None
+            raise
+
+    def is_due(self, stats):
+        """
+        Returns `True`, if a checkpoint should be saved given the current
+        `stats`.
+        """
+        records = stats.valid + stats.invalid
+        return (
+            records - self._last_records >= self.every or
+            default_timer() - self._last_time >= self.interval
+        )
+
+    def save(self, state, stats):
+        """
+        Writes the `state` dictionary and `stats` to the checkpoint file.
+        """
+        state = dict(state, stats=stats.to_dict())
+        temporary_path = self.path + '.tmp'
+        with open(temporary_path, 'wb') as checkpoint_file:
+            checkpoint_file.write(json.dumps(
+                state, default=text_type, sort_keys=True
+            ).encode('utf-8'))
+            checkpoint_file.flush()
+            os.fsync(checkpoint_file.fileno())
+        _replace(temporary_path, self.path)
+        self._last_records = stats.valid + stats.invalid
+        self._last_time = default_timer()
+
+
+def _replace(source, destination):
+    try:
+        replace = os.replace
+    except AttributeError:
+        # Python 2, rename does not replace existing files on Windows
+        if os.name == 'nt' and os.path.exists(destination):
+            os.remove(destination)
+        replace = os.rename
+    replace(source, destination)
+
+
+def _truncate(stream):
+    if stream is None:
+        return
+    try:
+        stream.truncate(0)
+        stream.seek(0)
+    except (IOError, OSError, ValueError):
+        # not seekable, like pipes
+        pass
+
+
+def _tell(stream):
+    if stream is None:
+        return None
+    stream.flush()
+    try:
+        return stream.tell()
+    except (IOError, OSError, ValueError):
+        # not seekable, like pipes
+        return None
+
+
+def validate_file(schema_path, input, valid_output=None, error_output=None,
+                  processes=1, chunk_size=1000, checkpoint=None,
+                  resume=False, profile=False):
+    """
+    Validates each line of the binary `input` stream against the schema
+    imported from `schema_path`, see :func:`import_schema`.
+
+    Valid lines are written unchanged to the binary `valid_output` and
+    reports of the errors in invalid lines to `error_output` as JSON
+    documents, one per line, see :func:`validate_line`.
+
+    If a :class:`Checkpoint` is given, progress is saved periodically and
+    once validation is complete. If `resume` is `True` as well and a
+    checkpoint has been saved, validation continues where it left off: The
+    `input` is seeked to the saved offset, outputs are truncated to their
+    saved offsets and the stats are restored. This requires the `input` and
+    outputs to be seekable files. Outputs opened for appending work as well.
+    If no checkpoint has been saved, the outputs are truncated. If the
+    checkpoint has been saved for another schema, :exc:`CheckpointMismatch`
+    is raised.
+
+    If `profile` is `True`, the time spent in each validator is recorded in
+    :attr:`ValidationStats.profile`.
+
+    Returns a :class:`ValidationStats` object.
+
+    .. versionadded:: 2.2.0
+    """
+    stats = ValidationStats()
+    if checkpoint is not None and resume:
+        state = checkpoint.load()
+        if state is None:
+            # Nothing has been saved, so anything in the outputs has been
+            # written by a run, that has been interrupted before that.
+            for stream in [valid_output, error_output]:
+                _truncate(stream)
+        else:
+            if state[u'schema'] != schema_path:
+                raise CheckpointMismatch(
+                    "checkpoint has been created for schema %r" %
+                    state[u'schema']
+                )
+            stats = ValidationStats.from_dict(state[u'stats'])
+            input.seek(stats.bytes)
+            for stream, key in [
+                (valid_output, u'valid_output'),
+                (error_output, u'error_output')
+            ]:
+                if stream is not None and state[key] is not None:
+                    stream.truncate(state[key])
+                    stream.seek(state[key])
+    chunks = collections.deque()
+
+    def tasks():
+        first_line = stats.lines + 1
+        for chunk in read_chunks(input, chunk_size):
+            chunks.append(chunk)
+            yield schema_path, first_line, chunk, profile
+            first_line += len(chunk)
+
+    def save_checkpoint():
+        checkpoint.save({
+            u'schema': schema_path,
+            u'valid_output': _tell(valid_output),
+            u'error_output': _tell(error_output)
+        }, stats)
+
+    results = map_ordered(_validate_chunk, tasks(), processes)
+    for valid, reports, error_paths, timings in results:
+        chunk = chunks.popleft()
+        stats.lines += len(chunk)
+        stats.bytes += sum(len(line) for line in chunk)
+        stats.valid += len(valid)
+        stats.invalid += len(reports)
+        stats.error_paths.update(error_paths)
+        for name, seconds in iteritems(timings):
+            stats.profile[name] = stats.profile.get(name, 0.0) + seconds
+        if valid_output is not None:
+            for index in valid:
+                line = chunk[index]
+                valid_output.write(line)
+                if not line.endswith(b'\n'):
+                    valid_output.write(b'\n')
+        if error_output is not None:
+            for report in reports:
+                error_output.write(report)
+        if checkpoint is not None and checkpoint.is_due(stats):
+            save_checkpoint()
+    if checkpoint is not None:
+        save_checkpoint()
+    return stats
+
+
+def _open(path, mode, standard_stream):
+    if path == '-':
+        return getattr(standard_stream, 'buffer', standard_stream)
+    return open(path, mode)
+
+
+def _create_parser():
+    parser = argparse.ArgumentParser(prog='python -m relief.cli')
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+    validate = commands.add_parser(
+        'validate', help='validate newline-delimited JSON'
+    )
+    validate.add_argument(
+        '--schema', required=True,
+        help="the schema as 'module:attribute'"
+    )
+    validate.add_argument(
+        'input', help="the file to validate or '-' for stdin"
+    )
+    validate.add_argument(
+        '--valid-output', metavar='FILE',
+        help="write valid lines to FILE or '-' for stdout"
+    )
+    validate.add_argument(
+        '--error-output', metavar='FILE', default='-',
+        help="write error reports to FILE or '-' for stdout (default)"
+    )
+    validate.add_argument(
+        '-j', '--processes', type=int, default=1,
+        help='the number of processes, 0 for one per CPU (default: 1)'
+    )
+    validate.add_argument(
+        '--chunk-size', type=int, default=1000,
+        help='the number of lines validated at once (default: 1000)'
+    )
+    validate.add_argument(
+        '--checkpoint', metavar='FILE',
+        help='save the progress periodically to FILE'
+    )
+    validate.add_argument(
+        '--checkpoint-every', metavar='N', type=int, default=10000,
+        help='save the progress after N records (default: 10000)'
+    )
+    validate.add_argument(
+        '--checkpoint-interval', metavar='SECONDS', type=float, default=60.0,
+        help='save the progress after SECONDS (default: 60)'
+    )
+    validate.add_argument(
+        '--resume', action='store_true',
+        help='continue from the progress saved with --checkpoint'
+    )
+    validate.add_argument(
+        '--profile', action='store_true',
+        help='report the time spent in each validator'
+    )
+    return parser
+
+
+def main(argv=None):
+    """
+    Runs the command line interface with the given arguments, which default
+    to :data:`sys.argv`, and returns the exit status: ``0`` if all lines are
+    valid, ``1`` otherwise.
+
+    .. versionadded:: 2.2.0
+    """
+    parser = _create_parser()
+    arguments = parser.parse_args(argv)
+    try:
+        import_schema(arguments.schema)
+    except (ValueError, ImportError, AttributeError) as error:
+        parser.error('cannot import schema: %s' % error)
+    if arguments.chunk_size < 1:
+        parser.error('--chunk-size must be positive')
+    checkpoint = None
+    if arguments.checkpoint is not None:
+        checkpoint = Checkpoint(
+            arguments.checkpoint, arguments.checkpoint_every,
+            arguments.checkpoint_interval
+        )
+    if arguments.resume:
+        if checkpoint is None:
+            parser.error('--resume requires --checkpoint')
+        if arguments.input == '-':
+            parser.error('--resume requires an input file')
+    processes = arguments.processes or multiprocessing.cpu_count()
+    # Outputs are truncated to the saved offsets, when resuming.
+    output_mode = 'ab' if arguments.resume else 'wb'
+
+    input = _open(arguments.input, 'rb', sys.stdin)
+    valid_output = error_output = None
+    try:
+        if arguments.valid_output is not None:
+            valid_output = _open(
+                arguments.valid_output, output_mode, sys.stdout
+            )
+        error_output = _open(arguments.error_output, output_mode, sys.stdout)
+        try:
+            stats = validate_file(
+                arguments.schema, input, valid_output, error_output,
+                processes, arguments.chunk_size, checkpoint,
+                arguments.resume, arguments.profile
+            )
+        except CheckpointMismatch as error:
+            parser.error(str(error))
+    finally:
+        standard_streams = _standard_streams()
+        for stream in [input, valid_output, error_output]:
+            if stream is None:
+                continue
+            if stream in standard_streams:
+                stream.flush()
+            else:
+                stream.close()
+    print(stats.format(), file=sys.stderr)
+    for path, count in stats.error_paths.most_common(10):
+        print(u"%8d errors at %s" % (count, path), file=sys.stderr)
+    if arguments.profile:
+        for name, seconds in sorted(
+            iteritems(stats.profile), key=lambda item: -item[1]
+        ):
+            print(u"%8.3fs in %s" % (seconds, name), file=sys.stderr)
+    return 0 if stats.invalid == 0 else 1
+
+
+def _standard_streams():
+    return [
+        getattr(stream, 'buffer', stream)
+        for stream in [sys.stdin, sys.stdout, sys.stderr]
+    ]
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -28,6 +28,10 @@ class Unspecified(object):
     def __repr__(self):
         return self.__class__.__name__
 
+    def __reduce__(self):
+        # pickled by name, so that unpickling returns the singleton
+        return self.__class__.__name__
+
 
 @as_singleton
 @implements_bool
@@ -47,6 +51,10 @@ class NotUnserializable(object):
     def __repr__(self):
         return self.__class__.__name__
 
+    def __reduce__(self):
+        # pickled by name, so that unpickling returns the singleton
+        return self.__class__.__name__
+
 
 @as_singleton
 @implements_bool
@@ -66,3 +74,7 @@ class Unnamed(object):
 
     def __repr__(self):
         return self.__class__.__name__
+
+    def __reduce__(self):
+        # pickled by name, so that unpickling returns the singleton
+        return self.__class__.__name__
@@ -0,0 +1,10 @@
+# coding: utf-8
+"""
+    relief.ingest
+    ~~~~~~~~~~~~~
+
+    Pipelines that validate records from files against a schema.
+
+    :copyright: 2013 by Daniel Neuhäuser
+    :license: BSD, see LICENSE.rst for details
+"""
@@ -0,0 +1,183 @@
+# coding: utf-8
+"""
+    relief.ingest.csv
+    ~~~~~~~~~~~~~~~~~
+
+    Validates the rows of CSV files against a :class:`~relief.Form`, whose
+    fields correspond to the columns named in the header::
+
+        >>> import io
+        >>> from relief import Form, Integer, Unicode
+        >>> from relief.ingest.csv import validate_rows
+        >>> class Person(Form):
+        ...     name = Unicode
+        ...     age = Integer
+        >>> rows = validate_rows(Person, io.StringIO(u"name,age\\nAlice,42\\n"))
+        >>> [(number, value[u'age'], errors) for number, value, errors in rows]
+        [(1, 42, [])]
+
+    :copyright: 2013 by Daniel Neuhäuser
+    :license: BSD, see LICENSE.rst for details
+"""
+from __future__ import absolute_import
+import csv
+
+from relief.constants import Unspecified
+from relief.schema import traversal
+from relief.utils import map_ordered, read_chunks
+
+
+class RowLoader(object):
+    """
+    Sets and validates a single form of the given `schema` with rows of a
+    CSV file, that has the given `header`.
+
+    Which column corresponds to which field is determined once, when the
+    loader is created, and the values in each row are set directly to the
+    members of the form, without unserializing a dictionary and looking up
+    the fields in it. The form itself is reused for every row.
+
+    Columns that are not fields of the form are handled according to
+    :attr:`~relief.Form.schema_missing`: A :exc:`KeyError` is raised by
+    default, with ``'error'`` each row is not unserializable. Fields without
+    a column are :data:`~relief.Unspecified`.
+
+    .. versionadded:: 2.2.0
+    """
+    def __init__(self, schema, header):
+        self.schema = schema
+        self.header = list(header)
+        #: The form that is set to each row.
+        self.form = schema()
+
+        columns = {}
+        unknown = []
+        for index, column in enumerate(self.header):
+            if column in self.form:
+                # like csv.DictReader, the last of duplicate columns is used
+                columns[column] = index
+            else:
+                unknown.append((index, column))
+        if unknown and schema.schema_missing is None:
+            raise KeyError(unknown[0][1])
+        self._members = [
+            (index, self.form[name]) for name, index in columns.items()
+        ]
+        self._missing = [
+            element for name, element in self.form.items()
+            if name not in columns
+        ]
+        self._unknown = unknown
+        self._collect = schema.schema_missing == 'collect'
+        # Forms without any known columns are not unserializable and forms
+        # rejecting unknown columns neither, setting them as usual handles
+        # that.
+        self._generic = not columns or (
+            unknown and schema.schema_missing == 'error'
+        )
+
+    def set(self, row):
+        """
+        Sets the form to the list of strings `row` and returns it, as if
+        ``form.set_from_raw(dict(zip(header, row)))`` had been called.
+        """
+        form = self.form
+        # Results of validators are reused for unchanged values, the errors
+        # noted along with them belong to the previous row however.
+        form._validator_results = {}
+        if self._generic or len(row) != len(self.header):
+            form.set_from_raw(dict(zip(self.header, row)))
+            return form
+        for index, element in self._members:
+            element.set_from_raw(row[index])
+        for element in self._missing:
+            element.set_from_raw(Unspecified)
+        if self._collect:
+            form.unknown_items = dict(
+                (column, row[index]) for index, column in self._unknown
+            )
+        form.raw_value = dict(zip(self.header, row))
+        form._state = None
+        form.is_valid = None
+        return form
+
+    def load(self, row, context=None):
+        """
+        Sets the form to `row`, validates it with the given `context` and
+        returns a tuple of the value and a list of ``(path, errors)`` tuples,
+        see :func:`relief.schema.traversal.iter_errors`, which is empty, if
+        the row is valid.
+        """
+        form = self.set(row)
+        if form.validate(context):
+            return form.value, []
+        errors = []
+        for path, element_errors in traversal.iter_errors(form):
+            errors.append((path, list(element_errors)))
+            # the form is reused for the next row
+            del element_errors[:]
+        return form.value, errors
+
+
+#: Loaders used by :func:`_load_chunk` by schema and header.
+_loaders = {}
+
+
+def _load_chunk(task):
+    # Called in worker processes, each of which reuses a loader.
+    schema, header, first_row, rows, context = task
+    key = schema, tuple(header)
+    try:
+        loader = _loaders[key]
+    except KeyError:
+        loader = _loaders[key] = RowLoader(schema, header)
+    results = []
+    for row_number, row in enumerate(rows, first_row):
+        value, errors = loader.load(row, context)
+        results.append((row_number, value, errors))
+    return results
+
+
+def validate_rows(schema, csvfile, context=None, processes=1,
+                  chunk_size=1000, **fmtparams):
+    """
+    Yields a ``(row_number, value, errors)`` tuple for each row of the CSV
+    file `csvfile`, which is read with :func:`csv.reader` and the given
+    `fmtparams`. The first row is the header, see :class:`RowLoader`, the
+    following rows are numbered starting with 1.
+
+    Each row is set to a form of the given `schema` and validated with the
+    given `context`. `errors` is a list of ``(path, errors)`` tuples, see
+    :func:`relief.schema.traversal.iter_errors`, which is empty, if the row
+    is valid.
+
+    If `processes` is greater than one, chunks of `chunk_size` rows are
+    validated in a :class:`multiprocessing.Pool`, see
+    :func:`relief.utils.map_ordered`. In that case `schema` and `context`
+    have to be picklable, which means that the schema has to be defined at
+    the top level of a module.
+
+    .. versionadded:: 2.2.0
+    """
+    reader = csv.reader(csvfile, **fmtparams)
+    try:
+        header = next(reader)
+    except StopIteration:
+        return
+    # also checks the header, before any rows are read
+    loader = RowLoader(schema, header)
+    if processes == 1:
+        for row_number, row in enumerate(reader, 1):
+            value, errors = loader.load(row, context)
+            yield row_number, value, errors
+        return
+
+    def tasks():
+        first_row = 1
+        for chunk in read_chunks(reader, chunk_size):
+            yield schema, header, first_row, chunk, context
+            first_row += len(chunk)
+
+    for results in map_ordered(_load_chunk, tasks(), processes):
+        for result in results:
+            yield result
@@ -0,0 +1,269 @@
+# coding: utf-8
+"""
+    relief.schema.codegen
+    ~~~~~~~~~~~~~~~~~~~~~
+
+    Generates methods for :class:`~relief.Form` classes, which access the
+    members by their names instead of looping over the schema.
+
+    The methods are generated, when the prototype of a form class is created,
+    and the source can be inspected with :func:`get_source`. Methods that are
+    overridden by a subclass of :class:`~relief.Form` are not generated, in
+    that case the generic implementation is used.
+
+    :copyright: 2013 by Daniel Neuhäuser
+    :license: BSD, see LICENSE.rst for details
+"""
+import re
+import keyword
+import linecache
+import itertools
+
+from relief.constants import Unspecified
+from relief.schema.core import Container, _missing
+from relief.validation import ValidationContext
+from relief._compat import OrderedDict
+
+
+#: Maps the names of the generated methods to the names of the methods, that
+#: are replaced or used by them. If any of them is overridden, the method is
+#: not generated.
+generated_methods = OrderedDict([
+    ('_clone_members', ('_clone_members', )),
+    ('value', ('value', '_members', '_value_from_members')),
+    ('validate', ('validate', '_members')),
+    ('_set_members_from_raw', (
+        '_set_members_from_raw', '_pair_members', '_set_leaf_members'
+    )),
+    ('_set_value_from_native', ('_set_value_from_native', '_pair_members'))
+])
+
+#: The implementations of the generated methods by :class:`~relief.Form`.
+_generic_methods = {}
+
+_identifier_re = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+#: Numbers the filenames of the generated sources, classes created with
+#: :meth:`~relief.Form.of` or :meth:`~relief.Form.using` share their module and
+#: name.
+_filename_counter = itertools.count(1)
+
+
+def get_source(form_cls):
+    """
+    Returns the source of the methods generated for `form_cls` or `None`, if
+    no methods have been generated for it (yet).
+
+    .. versionadded:: 2.2.0
+    """
+    return form_cls.__dict__.get('_generated_source')
+
+
+def install(form_cls, generate=True):
+    """
+    Adds methods generated for the members of `form_cls` to it, unless
+    `generate` is `False`. Methods that are not generated use the generic
+    implementation of :class:`~relief.Form`.
+    """
+    generic = _get_generic_methods()
+    names = []
+    if generate and form_cls.generate_code:
+        names = [
+            name for name in generated_methods
+            if not _is_overridden(form_cls, name)
+        ]
+    source = None
+    generated = {}
+    if names:
+        source = generate_source(form_cls, names)
+        filename = '<generated %s.%s #%d>' % (
+            form_cls.__module__, form_cls.__name__, next(_filename_counter)
+        )
+        namespace = {
+            'OrderedDict': OrderedDict,
+            'Unspecified': Unspecified,
+            'ValidationContext': ValidationContext,
+            '_missing': _missing,
+            'generic': generic
+        }
+        exec(compile(source, filename, 'exec'), namespace)
+        # allows tracebacks and inspect to show the source
+        linecache.cache[filename] = (
+            len(source), None, source.splitlines(True), filename
+        )
+        for name in names:
+            function = namespace[name]
+            function._generated = True
+            if name == 'value':
+                function = property(function, Container._set_value)
+            generated[name] = function
+    for name in generated_methods:
+        if name in generated:
+            setattr(form_cls, name, generated[name])
+        elif _is_generated(_lookup(form_cls, name)):
+            # don't inherit methods generated for a base class
+            setattr(form_cls, name, generic[name])
+    form_cls._generated_source = source
+
+
+def _get_generic_methods():
+    if not _generic_methods:
+        from relief.schema.mappings import Form
+        for name in generated_methods:
+            _generic_methods[name] = _lookup(Form, name)
+    return _generic_methods
+
+
+def _lookup(cls, name):
+    for base in cls.__mro__:
+        if name in base.__dict__:
+            return base.__dict__[name]
+    return None
+
+
+def _is_generated(attribute):
+    if isinstance(attribute, property):
+        attribute = attribute.fget
+    return getattr(attribute, '_generated', False)
+
+
+def _is_overridden(form_cls, name):
+    from relief.schema.mappings import Form
+    for replaced in generated_methods[name]:
+        attribute = _lookup(form_cls, replaced)
+        if not (_is_generated(attribute) or
+                attribute is _lookup(Form, replaced)):
+            return True
+    return False
+
+
+def generate_source(form_cls, names):
+    """
+    Returns the source of a module defining the methods with the given
+    `names` for `form_cls`.
+    """
+    fields = list(form_cls.member_schema)
+    has_members = [
+        element_cls._has_members
+        for element_cls in form_cls.member_schema.values()
+    ]
+    lines = []
+    for name in names:
+        if lines:
+            lines.append(u"")
+        lines.extend(_generators[name](fields, has_members))
+    return u"\n".join(lines) + u"\n"
+
+
+def _literal(value):
+    return repr(value)
+
+
+def _generate_clone_members(fields, has_members):
+    yield u"def _clone_members(self, clone):"
+    yield u"    elements = self._elements"
+    for index, field in enumerate(fields):
+        yield u"    m%d = elements[%s]._clone_prototype()" % (
+            index, _literal(field)
+        )
+    yield u"    clone._elements = OrderedDict([%s])" % u", ".join(
+        u"(%s, m%d)" % (_literal(field), index)
+        for index, field in enumerate(fields)
+    )
+    for index, field in enumerate(fields):
+        if (
+            isinstance(field, str) and
+            _identifier_re.match(field) and
+            not keyword.iskeyword(field)
+        ):
+            yield u"    clone.%s = m%d" % (field, index)
+        else:
+            yield u"    setattr(clone, %s, m%d)" % (_literal(field), index)
+    yield u"    clone._bind_validate_methods()"
+    yield u"    clone._validator_results = {}"
+
+
+def _generate_value(fields, has_members):
+    yield u"def value(self):"
+    yield u"    if self._memoized_value is not _missing:"
+    yield u"        return self._memoized_value"
+    yield u"    elements = self._elements"
+    yield u"    return OrderedDict([%s])" % u", ".join(
+        u"(%s, elements[%s].value)" % (_literal(field), _literal(field))
+        for field in fields
+    )
+
+
+def _generate_validate(fields, has_members):
+    yield u"def validate(self, context=None):"
+    yield u"    if not isinstance(context, ValidationContext):"
+    yield u"        context = ValidationContext(context)"
+    yield u"    elements = self._elements"
+    yield u"    is_valid = True"
+    for field in fields:
+        yield u"    is_valid &= elements[%s].validate(context)" % (
+            _literal(field)
+        )
+        yield u"    if context.limited and context.should_stop():"
+        yield u"        return self._stop_validation(context)"
+    yield u"    return self._validate_shallow(is_valid, context)"
+
+
+def _generate_get_items(name, fields):
+    # Looks up the items for all fields in the mapping `value`, applying
+    # schema_missing if there are any other items. If those can't be found
+    # the generic method `name` is used.
+    yield u"    unknown = len(value)"
+    for index, field in enumerate(fields):
+        yield u"    i%d = get(%s, _missing)" % (index, _literal(field))
+        yield u"    if i%d is _missing:" % index
+        yield u"        i%d = Unspecified" % index
+        yield u"    else:"
+        yield u"        unknown -= 1"
+    yield u"    if unknown:"
+    yield u"        if not self._apply_schema_missing(value):"
+    yield u"            return generic[%s](self, value)" % _literal(name)
+    yield u"    elif self.schema_missing == 'collect':"
+    yield u"        self.unknown_items = {}"
+    yield u"    elements = self._elements"
+
+
+def _generate_set_members_from_raw(fields, has_members):
+    yield u"def _set_members_from_raw(self, value):"
+    yield u"    if value is Unspecified:"
+    yield u"        return generic['_set_members_from_raw'](self, value)"
+    yield u"    get = value.get"
+    for line in _generate_get_items('_set_members_from_raw', fields):
+        yield line
+    pending = []
+    for index, field in enumerate(fields):
+        if has_members[index]:
+            pending.append(u"(elements[%s], i%d)" % (_literal(field), index))
+        else:
+            yield u"    elements[%s].set_from_raw(i%d)" % (
+                _literal(field), index
+            )
+    yield u"    return [%s]" % u", ".join(pending)
+
+
+def _generate_set_value_from_native(fields, has_members):
+    yield u"def _set_value_from_native(self, value):"
+    yield u"    try:"
+    yield u"        get = value.get"
+    yield u"    except AttributeError:"
+    yield u"        return generic['_set_value_from_native'](self, value)"
+    for line in _generate_get_items('_set_value_from_native', fields):
+        yield line
+    for index, field in enumerate(fields):
+        yield u"    elements[%s].set_from_native(i%d)" % (
+            _literal(field), index
+        )
+
+
+_generators = {
+    '_clone_members': _generate_clone_members,
+    'value': _generate_value,
+    'validate': _generate_validate,
+    '_set_members_from_raw': _generate_set_members_from_raw,
+    '_set_value_from_native': _generate_set_value_from_native
+}
@@ -8,11 +8,18 @@
 """
 
 import gettext
+import threading
 
 from relief import Unspecified, NotUnserializable, Unnamed
 from relief.utils import class_cloner, InheritingDictDescriptor
 from relief._compat import iteritems, text_type
-from relief.validation import Converted
+from relief.validation import (
+    Converted, ValidatorOrder, ValidationContext, optimize_chain
+)
+
+
+#: Marks the absence of a memoized value, see :mod:`relief.schema.traversal`.
+_missing = object()
 
 
 class BaseElement(object):
@@ -30,6 +37,11 @@ class BaseElement(object):
     properties = InheritingDictDescriptor('properties')
     name = Unnamed
 
+    #: `True` for elements that contain other elements, their members are
+    #: set and validated without recursion by
+    #: :mod:`relief.schema.traversal`.
+    _has_members = False
+
     @class_cloner
     def using(cls, **kwargs):
         """
@@ -103,6 +115,60 @@ class BaseElement(object):
         self.value = self.unserialize(raw_value)
         self.is_valid = None
 
+    def reset(self):
+        """
+        Restores the element to the state it had right after it has been
+        created without a value, so that it can be reused instead of creating
+        a new element.
+
+        .. versionadded:: 2.2.0
+        """
+        self.set_from_raw(Unspecified)
+
+    @classmethod
+    def _get_prototype(cls):
+        """
+        Returns an instance of the class, that has been created without a
+        value and can be cloned with :meth:`_clone_prototype`.
+
+        The prototype is created lazily and only once per class.
+        """
+        prototype = cls.__dict__.get('_prototype')
+        if prototype is None:
+            prototype = cls._prototype = cls()
+        return prototype
+
+    @classmethod
+    def _from_raw_many(cls, raw_values):
+        """
+        Returns an iterable of elements, created from the given `raw_values`.
+
+        This is used by :class:`~relief.List` and may be overridden to
+        unserialize many raw values more efficiently, than one at a time.
+        """
+        return map(cls, raw_values)
+
+    def _clone_prototype(self):
+        """
+        Returns a new element that is in the same state as this element, which
+        is expected not to have been given a value.
+
+        This is used by :class:`~relief.Form` to create members more cheaply,
+        than by instantiating them.
+        """
+        clone = self._new_clone()
+        clone.__dict__.update(self.__dict__)
+        if 'properties' in self.__dict__:
+            clone.__dict__['properties'] = dict(self.__dict__['properties'])
+        self._clone_members(clone)
+        return clone
+
+    def _new_clone(self):
+        return object.__new__(self.__class__)
+
+    def _clone_members(self, clone):
+        pass
+
     def serialize(self, value):
         """
         Tries to serialize the given `value` and returns an object than can be
@@ -112,6 +178,50 @@ class BaseElement(object):
         """
         return value
 
+    def load(self, raw_value, context=None):
+        """
+        Sets the element with :meth:`set_from_raw` and validates it with
+        :meth:`validate` in a single traversal, returns whether the element
+        is valid. See :func:`relief.schema.traversal.load`.
+
+        .. versionadded:: 2.2.0
+        """
+        from relief.schema.traversal import load
+        return load(self, raw_value, context)
+
+    @classmethod
+    def from_json(cls, data):
+        """
+        Returns an element, that is set to the value represented by the JSON
+        document `data`, see :func:`relief.schema.serialization.from_json`.
+
+        .. versionadded:: 2.2.0
+        """
+        from relief.schema.serialization import from_json
+        return from_json(cls, data)
+
+    def dump_json(self, stream, default=None):
+        """
+        Writes the JSON representation of :attr:`value` to the binary
+        `stream`, without creating :attr:`value`, see
+        :func:`relief.schema.serialization.iter_json`.
+
+        .. versionadded:: 2.2.0
+        """
+        from relief.schema.serialization import dump_json
+        dump_json(self, stream, default)
+
+    def to_json_bytes(self, default=None):
+        """
+        Returns the JSON representation of :attr:`value` as a byte string,
+        without creating :attr:`value`, see
+        :func:`relief.schema.serialization.iter_json`.
+
+        .. versionadded:: 2.2.0
+        """
+        from relief.schema.serialization import to_json_bytes
+        return to_json_bytes(self, default)
+
     def unserialize(self, raw_value):
         """
         Tries to unserialize the given `raw_value` and returns an object whose
@@ -169,6 +279,34 @@ class ValidatedByMixin(object):
     """
     validators = []
 
+    #: Determines the order in which :attr:`validators` are called, may be one
+    #: of the following values:
+    #:
+    #: `None`
+    #:     Validators are called in the order in which they are defined.
+    #:
+    #: ``'cost'``
+    #:     Pure validators are ordered by their cost hint.
+    #:
+    #: ``'adaptive'``
+    #:     Pure validators are ordered by measured runtime and rejection rate,
+    #:     so that cheap validators that often fail are called first.
+    #:
+    #: See :class:`relief.validation.ValidatorOrder` for details.
+    #:
+    #: .. versionadded:: 2.2.0
+    validator_order = None
+
+    #: If `True` and :attr:`validator_order` is `None`, :attr:`validators`
+    #: are optimized with :func:`relief.validation.optimize_chain` the first
+    #: time an element is validated. This does not change the result or the
+    #: errors of the validation. Validators are not optimized, while they are
+    #: traced or profiled, so that only the validators you have defined are
+    #: reported.
+    #:
+    #: .. versionadded:: 2.2.0
+    optimize_validators = True
+
     @classmethod
     def validated_by(cls, validators):
         """
@@ -190,6 +328,15 @@ class ValidatedByMixin(object):
             errors.append(gettext.dgettext('relief', error))
         return errors
 
+    def reset(self):
+        super(ValidatedByMixin, self).reset()
+        del self.errors[:]
+
+    def _clone_prototype(self):
+        clone = super(ValidatedByMixin, self)._clone_prototype()
+        clone.errors = []
+        return clone
+
     def validate(self, context=None):
         """
         Returns `True` when the element is valid and `False` otherwise, and
@@ -203,17 +350,69 @@ class ValidatedByMixin(object):
         If no validators have been defined, the element will be considered
         invalid if :attr:`value` is :data:`~relief.Unspecified` or
         :data:`~relief.NotUnserializable`.
+
+        Validators are called until one of them fails, unless the `context`
+        contains ``'all_errors'`` with a true value. In that case all
+        validators are called in the order in which they are defined,
+        regardless of :attr:`validator_order`.
+
+        The `context` is passed to validators as
+        :class:`~relief.ValidationContext`, see there for other keys that
+        affect validation.
+
+        .. versionchanged:: 2.2.0
+           Added support for :attr:`validator_order` and ``'all_errors'``.
         """
-        if context is None:
-            context = {}
-        if self.validators:
+        if not isinstance(context, ValidationContext):
+            context = ValidationContext(context)
+        limited = context.limited
+        if limited:
+            known_errors = len(self.errors)
+        validators = self.validators
+        if not validators:
+            self.is_valid = Converted()(self, context)
+        elif context.all_errors:
+            self.is_valid = all([
+                validator(self, context) for validator in validators
+            ])
+        elif self.validator_order is None:
+            if self.optimize_validators and not context.instrumented:
+                validators = self._get_optimized_validators(validators)
             self.is_valid = all(
-                validator(self, context) for validator in self.validators
+                validator(self, context) for validator in validators
             )
         else:
-            self.is_valid = Converted()(self, context)
+            self.is_valid = self._get_validator_order(validators)(
+                self, context
+            )
+        if limited and not self.is_valid:
+            context.note_invalid(len(self.errors) - known_errors)
         return self.is_valid
 
+    def _get_optimized_validators(self, validators):
+        cls = self.__class__
+        if validators is not cls.validators:
+            # set on the instance, e.g. by Form, optimizing them would not pay
+            # off
+            return validators
+        cached = cls.__dict__.get('_optimized_validators_cache')
+        if cached is None or cached[0] is not validators:
+            cached = cls._optimized_validators_cache = (
+                validators, optimize_chain(validators)
+            )
+        return cached[1]
+
+    def _get_validator_order(self, validators):
+        cls = self.__class__
+        order = cls.__dict__.get('_validator_order_cache')
+        if order is None or order.validators is not validators:
+            order = ValidatorOrder(
+                validators, adaptive=self.validator_order == 'adaptive'
+            )
+            if validators is cls.validators:
+                cls._validator_order_cache = order
+        return order
+
 
 class DefaultMixin(object):
     """
@@ -237,6 +436,19 @@ class DefaultMixin(object):
         if value is Unspecified:
             self._set_default_value()
 
+    def reset(self):
+        super(DefaultMixin, self).reset()
+        self._set_default_value()
+
+    def _clone_prototype(self):
+        clone = super(DefaultMixin, self)._clone_prototype()
+        if (self.default is Unspecified and
+            self.default_factory is not Unspecified
+           ):
+            # defaults produced by a factory must not be shared
+            clone._set_default_value()
+        return clone
+
     def _set_default_value(self):
         if self.default is not Unspecified:
             value = self.default
@@ -256,8 +468,79 @@ class Element(DefaultMixin, ValidatedByMixin, NativeMixin, BaseElement):
     """
 
 
+class _UnserializationLimits(object):
+    def __init__(self, max_depth, max_total_elements):
+        self.max_depth = max_depth
+        self.max_total_elements = max_total_elements
+        self.depth = 0
+        self.total_elements = 0
+
+    def enter(self):
+        self.depth += 1
+        if self.max_depth is not None and self.depth > self.max_depth:
+            raise _LimitExceeded()
+
+    def leave(self):
+        self.depth -= 1
+
+    def add_elements(self, count):
+        self.total_elements += count
+        if (self.max_total_elements is not None and
+            self.total_elements > self.max_total_elements
+           ):
+            raise _LimitExceeded()
+
+
+class _LimitExceeded(Exception):
+    pass
+
+
+def _get_raw_value(element):
+    raw_value = element._raw_value
+    if raw_value is _missing:
+        raw_value = element._raw_value = element._compute_raw_value()
+    return raw_value
+
+
+def _set_raw_value(element, raw_value):
+    element._raw_value = raw_value
+
+
+#: The :attr:`raw_value` of elements with members. After the element has been
+#: set with :meth:`set_from_native`, it is only computed once it is accessed,
+#: as that requires the values of all members.
+_lazy_raw_value = property(_get_raw_value, _set_raw_value)
+
+
+#: Holds the limits of the outermost container, while :meth:`set_from_raw` is
+#: called.
+_active_limits = threading.local()
+
+
 class Container(Element):
     member_schema = None
+    _has_members = True
+    _memoized_value = _missing
+
+    raw_value = _lazy_raw_value
+    _raw_value = Unspecified
+
+    #: The maximum number of nested containers, including this one, a raw value
+    #: may describe. If the raw value is nested any deeper, :attr:`value` will
+    #: be :data:`~relief.NotUnserializable`.
+    #:
+    #: Only used if this container is not contained in another one, that
+    #: limits the depth or total number of elements.
+    #:
+    #: .. versionadded:: 2.2.0
+    max_depth = None
+
+    #: The maximum number of members this container and all containers within
+    #: it may have in total. Like :attr:`max_depth` this is checked while
+    #: unserializing and only used for the outermost container.
+    #:
+    #: .. versionadded:: 2.2.0
+    max_total_elements = None
 
     @class_cloner
     def of(cls, schema):
@@ -270,24 +553,151 @@ class Container(Element):
         if self.member_schema is None:
             raise TypeError("member_schema is unknown")
 
+    def _stop_validation(self, context):
+        # If validation has been interrupted we can't tell whether the element
+        # is valid, otherwise it stopped because a member is invalid.
+        self.is_valid = None if context.interrupted else False
+        return False
+
     def set_from_native(self, value):
         self._state = None
         if value is Unspecified:
             self._state = Unspecified
         self._set_value_from_native(value)
-        self.raw_value = self.serialize(self.value)
+        self._raw_value = _missing
         self.is_valid = None
 
+    def _compute_raw_value(self):
+        return self.serialize(self.value)
+
     def set_from_raw(self, raw_value):
+        limits = getattr(_active_limits, 'limits', None)
+        if limits is not None:
+            limits.enter()
+            try:
+                self._set_from_raw(raw_value, limits)
+            finally:
+                limits.leave()
+        elif self.max_depth is None and self.max_total_elements is None:
+            self._set_from_raw(raw_value, None)
+        else:
+            limits = _active_limits.limits = _UnserializationLimits(
+                self.max_depth, self.max_total_elements
+            )
+            try:
+                try:
+                    limits.enter()
+                    self._set_from_raw(raw_value, limits)
+                finally:
+                    del _active_limits.limits
+            except _LimitExceeded:
+                self._discard_members()
+
+    def _discard_members(self):
+        # discard the members created so far
+        self._set_value_from_raw(Unspecified)
+        self._state = NotUnserializable
+        self.is_valid = None
+
+    def _set_from_raw(self, raw_value, limits):
+        for element, member_raw_value in self._set_from_raw_shallow(
+            raw_value, limits
+        ):
+            element.set_from_raw(member_raw_value)
+
+    def _set_from_raw_shallow(self, raw_value, limits=None):
+        """
+        Sets :attr:`raw_value` like :meth:`set_from_raw` but only sets those
+        members that have no members themselves.
+
+        Returns a list of ``(element, raw_value)`` pairs for the members that
+        still have to be set.
+        """
         self.raw_value = raw_value
         self._state = None
         if raw_value is Unspecified:
             self._state = Unspecified
-            self._set_value_from_raw(raw_value)
+            pending = self._set_members_from_raw(raw_value)
         else:
             unserialized = self.unserialize(raw_value)
             if unserialized is NotUnserializable:
                 self._state = NotUnserializable
+                pending = []
             else:
-                self._set_value_from_raw(unserialized)
+                if limits is not None:
+                    limits.add_elements(len(unserialized))
+                pending = self._set_members_from_raw(unserialized)
         self.is_valid = None
+        return pending
+
+    def _set_value_from_raw(self, value):
+        for element, raw_value in self._set_members_from_raw(value):
+            element.set_from_raw(raw_value)
+
+    def _set_members_from_raw(self, value):
+        """
+        Creates or updates the members for the given unserialized `value`,
+        see :meth:`_set_from_raw_shallow`.
+        """
+        raise NotImplementedError()
+
+    def _set_leaf_members(self, pairs):
+        """
+        Sets the members in the given iterable of ``(element, raw_value)``
+        pairs, that have no members themselves, and returns a list of the
+        remaining pairs.
+        """
+        pending = []
+        for element, raw_value in pairs:
+            if element._has_members:
+                pending.append((element, raw_value))
+            else:
+                element.set_from_raw(raw_value)
+        return pending
+
+    def _members(self):
+        """
+        Returns an iterable over the members in the order in which they are
+        validated and passed to :meth:`_value_from_members`.
+        """
+        raise NotImplementedError()
+
+    def _value_from_members(self, values):
+        """
+        Returns :attr:`value` given a list of the values of the members.
+        """
+        raise NotImplementedError()
+
+    def _get_value(self):
+        if self._memoized_value is not _missing:
+            return self._memoized_value
+        # The values of the members are collected without a generator, which
+        # would add to the frames needed per level of nesting.
+        values = []
+        for member in self._members():
+            values.append(member.value)
+        return self._value_from_members(values)
+
+    def _set_value(self, new_value):
+        if new_value is not Unspecified:
+            raise AttributeError("can't set attribute")
+
+    value = property(_get_value, _set_value)
+
+    def validate(self, context=None):
+        if not isinstance(context, ValidationContext):
+            context = ValidationContext(context)
+        is_valid = True
+        for element in self._members():
+            is_valid &= element.validate(context)
+            if context.limited and context.should_stop():
+                return self._stop_validation(context)
+        return self._validate_shallow(is_valid, context)
+
+    def _validate_shallow(self, members_valid, context):
+        """
+        Validates the element itself, after the members have been validated,
+        `members_valid` is `True` if all of them are valid.
+        """
+        self.is_valid = members_valid & super(Container, self).validate(context)
+        return self.is_valid
@@ -8,37 +8,58 @@
 """
 import collections
 
-from relief import Unspecified, NotUnserializable, Unnamed, Element, _compat
+from relief import Unspecified, NotUnserializable, Unnamed, _compat
 from relief.utils import class_cloner
-from relief.schema.core import Container
+from relief.schema.core import BaseElement, Container
+from relief.schema import codegen
 from relief._compat import (
     add_native_itermethods, Prepareable, itervalues, iteritems, with_metaclass, text_type
 )
 
 
+def _unserialize_mapping(native_type, raw_value, max_keys):
+    """
+    Returns `raw_value` as `native_type` or :data:`~relief.NotUnserializable`,
+    if it has more than `max_keys` keys. An iterable of pairs is only consumed
+    until the limit is exceeded.
+
+    Raises :exc:`TypeError` or :exc:`ValueError`, if `raw_value` cannot be
+    converted.
+    """
+    if raw_value.__class__ is native_type:
+        # The unserialized value is only iterated over, so there is no need
+        # for a copy.
+        if max_keys is not None and len(raw_value) > max_keys:
+            return NotUnserializable
+        return raw_value
+    if max_keys is None:
+        return native_type(raw_value)
+    if hasattr(raw_value, 'keys'):
+        if len(raw_value) > max_keys:
+            return NotUnserializable
+        return native_type(raw_value)
+    result = native_type()
+    for key, value in raw_value:
+        result[key] = value
+        if len(result) > max_keys:
+            return NotUnserializable
+    return result
+
+
 @add_native_itermethods
 class Mapping(Container):
+    #: The maximum number of keys a raw value may contain. Raw values with
+    #: more keys are rejected, without consuming them completely and
+    #: :attr:`value` will be :data:`~relief.NotUnserializable`.
+    #:
+    #: .. versionadded:: 2.2.0
+    max_keys = None
+
     @class_cloner
     def of(cls, key_schema, value_schema):
         cls.member_schema = (key_schema, value_schema)
         return cls
 
-    @property
-    def value(self):
-        if self._state is not None:
-            return self._state
-        result = self.native_type()
-        for key, value in iteritems(self):
-            if key.value is NotUnserializable or value.value is NotUnserializable:
-                return NotUnserializable
-            result[key.value] = value.value
-        return result
-
-    @value.setter
-    def value(self, new_value):
-        if new_value is not Unspecified:
-            raise AttributeError("can't set attribute")
-
     def _get_key_element(self, value):
         return self.member_schema[0].using(name=text_type(self.name) + '_key')(value)
 
@@ -47,28 +68,91 @@ class Mapping(Container):
 
     def _set_value_from_native(self, value):
         super(Mapping, self).clear()
+        self._index = {}
         if value is not Unspecified:
             for key in value:
-                super(Mapping, self).__setitem__(
+                self._add_item(
                     self._get_key_element(key),
                     self._get_value_element(value[key])
                 )
 
-    def _set_value_from_raw(self, value):
+    def _set_members_from_raw(self, value):
         super(Mapping, self).clear()
+        self._index = {}
+        pending = []
         if value is not Unspecified:
+            defer = self.member_schema[1]._has_members
             for key in value:
-                super(Mapping, self).__setitem__(
-                    self._get_key_element(key),
-                    self._get_value_element(value[key])
-                )
+                if defer:
+                    element = self._get_value_element(Unspecified)
+                    pending.append((element, value[key]))
+                else:
+                    element = self._get_value_element(value[key])
+                self._add_item(self._get_key_element(key), element)
+        return pending
+
+    def _members(self):
+        for key, value in iteritems(self):
+            yield key
+            yield value
+
+    def _value_from_members(self, values):
+        if self._state is not None:
+            return self._state
+        result = self.native_type()
+        values = iter(values)
+        for key in values:
+            value = next(values)
+            if key is NotUnserializable or value is NotUnserializable:
+                return NotUnserializable
+            result[key] = value
+        return result
+
+    def _add_item(self, key, value):
+        super(Mapping, self).__setitem__(key, value)
+        try:
+            self._index[key.value] = (key, value)
+        except TypeError:
+            # unhashable values can't be looked up by value
+            pass
+
+    def get_by_value(self, key, default=None):
+        """
+        Returns the value element whose key element has the given `key` as
+        :attr:`value` or `default`, if there is no such element.
+
+        Unlike :meth:`get` this does not require you to have the key element.
+
+        .. versionadded:: 2.2.0
+        """
+        try:
+            return self._index[key][1]
+        except (KeyError, TypeError):
+            return default
+
+    def contains_value(self, key):
+        """
+        Returns `True` if there is a key element whose :attr:`value` is the
+        given `key`.
+
+        .. versionadded:: 2.2.0
+        """
+        try:
+            return key in self._index
+        except TypeError:
+            return False
+
+    def _clone_prototype(self):
+        return self.__class__()
 
     def unserialize(self, raw_value):
         raw_value = super(Mapping, self).unserialize(raw_value)
         if raw_value is NotUnserializable:
             return raw_value
         try:
-            return self.native_type(raw_value)
+            return _unserialize_mapping(
+                self.native_type, raw_value, self.max_keys
+            )
         except (TypeError, ValueError):
             return NotUnserializable
 
@@ -98,23 +182,23 @@ class Mapping(Container):
     def items(self):
         return ((key, self[key]) for key in self)
 
-    def validate(self, context=None):
-        if context is None:
-            context = {}
-        self.is_valid = len(list(self.keys())) > 0
-        for key, value in iteritems(self):
-            self.is_valid &= key.validate(context)
-            self.is_valid &= value.validate(context)
-        self.is_valid &= super(Mapping, self).validate(context)
-        return self.is_valid
+    def _validate_shallow(self, members_valid, context):
+        return super(Mapping, self)._validate_shallow(
+            members_valid & (len(self) > 0), context
+        )
+
+    #: Methods of the native type, which are hidden because they would
+    #: change the element.
+    _mutating_methods = frozenset([
+        'setdefault', 'popitem', 'pop', 'update', 'clear'
+    ])
 
     def __getattribute__(self, name):
-        mutating_methods = set([
-            'setdefault', 'popitem', 'pop', 'update', 'clear'
-        ])
-        if name in mutating_methods:
+        if name in Mapping._mutating_methods:
             raise AttributeError(name)
-        return super(Mapping, self).__getattribute__(name)
+        # Neither the native type nor any base class overrides this, calling
+        # it directly is considerably faster than using super.
+        return object.__getattribute__(self, name)
 
 
 class Dict(Mapping, dict):
@@ -175,7 +259,9 @@ class FormMeta(collections.Mapping.__class__, with_metaclass(Prepareable, type))
         for base in reversed(bases):
             member_schema.update(getattr(base, "member_schema", {}) or {})
         for name, attribute in iteritems(attributes):
-            if isinstance(attribute, type) and issubclass(attribute, Element):
+            if (isinstance(attribute, type) and
+                issubclass(attribute, BaseElement)
+               ):
                 if attribute.name != Unnamed and attribute.name not in member_schema:
                     name = attribute.name
                 else:
@@ -251,29 +337,120 @@ class Form(with_metaclass(FormMeta, collections.Mapping, Container)):
        Added the ability to validate values with `validate_{key}` methods.
     """
     native_type = dict
+
+    #: Determines how items, whose keys are not part of the form, are
+    #: handled, when setting a value. May be one of the following values:
+    #:
+    #: `None`
+    #:     A :exc:`KeyError` is raised.
+    #:
+    #: ``'ignore'``
+    #:     The items are ignored.
+    #:
+    #: ``'error'``
+    #:     Raw values containing such items are not unserializable, native
+    #:     values cause a :exc:`KeyError`.
+    #:
+    #: ``'collect'``
+    #:     The items are ignored but stored in :attr:`unknown_items`.
+    #:
+    #: .. versionchanged:: 2.2.0
+    #:    Added ``'error'`` and ``'collect'``.
     schema_missing = None
 
+    #: A dictionary of the items, that have been ignored, when the form was
+    #: last set, if :attr:`schema_missing` is ``'collect'``.
+    #:
+    #: .. versionadded:: 2.2.0
+    unknown_items = {}
+
+    #: The maximum number of keys a raw value may contain, including keys
+    #: that are not part of the form.
+    #:
+    #: .. versionadded:: 2.2.0
+    max_keys = None
+
+    #: If `True` methods specialized for the members of the form are
+    #: generated, when the form is first instantiated, see
+    #: :mod:`relief.schema.codegen`. Forms whose :attr:`member_schema` is
+    #: replaced or changed after that use the generic implementation.
+    #:
+    #: .. versionadded:: 2.2.0
+    generate_code = True
+
     @class_cloner
     def of(cls, schema):
         cls.member_schema = _compat.OrderedDict(schema)
         return cls
 
     def __new__(cls, *args, **kwargs):
-        self = super(Form, cls).__new__(cls)
+        return cls._get_prototype()._clone_prototype()
+
+    def __init__(self, value=Unspecified):
+        # __new__ returns a clone of the prototype, which already is in the
+        # default state, so we only have to deal with a given value.
+        if value is not Unspecified:
+            self.set_from_raw(value)
+
+    @classmethod
+    def _get_prototype(cls):
+        """
+        Returns an instance of the form, that has been created without a value
+        and is used as a template for all other instances.
+
+        The prototype is created lazily and only once per class, unless the
+        :attr:`member_schema` is replaced or changed.
+        """
+        prototype = cls.__dict__.get('_prototype')
+        # The contents are compared, as the schema may be changed in place.
+        schema = tuple(iteritems(cls.member_schema))
+        if (prototype is None or
+            cls.__dict__['_prototype_schema'] != schema
+           ):
+            codegen.install(cls, generate=prototype is None)
+            cls._prototype_schema = schema
+            prototype = super(Form, cls).__new__(cls)
+            prototype._create_elements()
+            Container.__init__(prototype)
+            cls._prototype = prototype
+        return prototype
+
+    def _create_elements(self):
+        self._validated_members = []
         for attribute_name in dir(self):
             if not attribute_name.startswith('validate_'):
                 continue
-            attribute = getattr(self, attribute_name)
             member_name = attribute_name[len('validate_'):]
-            member = self.member_schema[member_name]
-            self.member_schema[member_name] = member.validated_by([attribute])
+            if member_name not in self.member_schema:
+                raise KeyError(member_name)
+            self._validated_members.append((member_name, attribute_name))
 
         self._elements = _compat.OrderedDict()
         for name, element_cls in iteritems(self.member_schema):
             self._elements[name] = element = element_cls.using(name=name)()
             setattr(self, name, element)
-
-        return self
+        # Clones share the names of the members with the prototype, which
+        # remain correct, even if the member_schema is changed later on.
+        self._field_names = frozenset(self._elements)
+        self._bind_validate_methods()
+        self._validator_results = {}
+
+    def _bind_validate_methods(self):
+        # validate_{key} methods are bound to this form, so they have to be
+        # added to the validators of the member instead of its class.
+        for member_name, attribute_name in self._validated_members:
+            element = self._elements[member_name]
+            element.validators = element.__class__.validators + [
+                getattr(self, attribute_name)
+            ]
+
+    def _clone_members(self, clone):
+        clone._elements = _compat.OrderedDict()
+        for name, element in iteritems(self._elements):
+            clone._elements[name] = member = element._clone_prototype()
+            setattr(clone, name, member)
+        clone._bind_validate_methods()
+        clone._validator_results = {}
 
     def _set_default_value(self):
         if self.default is not Unspecified:
@@ -285,6 +462,25 @@ class Form(with_metaclass(FormMeta, collections.Mapping, Container)):
             for key, value in iteritems(self):
                 value._set_default_value()
 
+    def reset(self):
+        # Resetting the members leaves them in the state, in which setting
+        # the form to Unspecified would leave them, so only the form itself
+        # is reset afterwards instead of setting the members again.
+        for element in itervalues(self._elements):
+            element.reset()
+        self._validator_results = {}
+        if self.schema_missing == 'collect':
+            self.unknown_items = {}
+        self.raw_value = Unspecified
+        self.is_valid = None
+        del self.errors[:]
+        if (self.default is Unspecified and
+            self.default_factory is Unspecified
+           ):
+            self._state = None
+        else:
+            self._set_default_value()
+
     def __getitem__(self, key):
         return self._elements[key]
 
@@ -294,65 +490,174 @@ class Form(with_metaclass(FormMeta, collections.Mapping, Container)):
     def __iter__(self):
         return iter(self._elements)
 
-    @property
-    def value(self):
-        # if self._state is not None:
-        #     return self._state
-        result = _compat.OrderedDict()
-        for key, element in iteritems(self):
-            # if element.value is Unspecified:
-            #     return NotUnserializable
-            result[key] = element.value
-        return result
-
-    @value.setter
-    def value(self, new_value):
-        if new_value is not Unspecified:
-            raise AttributeError("can't set attribute")
+    def _members(self):
+        return itervalues(self._elements)
+
+    def _value_from_members(self, values):
+        # Unlike other containers a form always has a value, even if it could
+        # not be unserialized.
+        return _compat.OrderedDict(zip(self._elements, values))
+
+    def _pair_members(self, value):
+        """
+        Returns a list of ``(element, item)`` pairs for the items of the
+        mapping `value` and ``(element, Unspecified)`` pairs for the members
+        missing from it, applying :attr:`schema_missing` to unknown items.
+        """
+        elements = self._elements
+        schema_missing = self.schema_missing
+        unknown_items = {}
+        pairs = []
+        for key, item in iteritems(value):
+            try:
+                element = elements[key]
+            except KeyError:
+                if schema_missing == 'ignore':
+                    continue
+                elif schema_missing == 'collect':
+                    unknown_items[key] = item
+                    continue
+                raise
+            pairs.append((element, item))
+        if len(pairs) < len(elements):
+            for name, element in iteritems(elements):
+                if name not in value:
+                    pairs.append((element, Unspecified))
+        if schema_missing == 'collect':
+            self.unknown_items = unknown_items
+        return pairs
+
+    def _apply_schema_missing(self, value):
+        """
+        Applies :attr:`schema_missing` to the items of the mapping `value`,
+        whose keys are not part of the form. Returns `False` without applying
+        it, if there are no such items.
+        """
+        names = self._field_names
+        unknown_items = dict(
+            (key, item) for key, item in iteritems(value) if key not in names
+        )
+        if not unknown_items:
+            return False
+        if self.schema_missing == 'collect':
+            self.unknown_items = unknown_items
+        elif self.schema_missing != 'ignore':
+            raise KeyError(next(iter(unknown_items)))
+        return True
 
     def _set_value_from_native(self, value):
         if value is Unspecified:
-            for element in itervalues(self):
+            if self.schema_missing == 'collect':
+                self.unknown_items = {}
+            for element in itervalues(self._elements):
                 element.set_from_native(value)
         else:
-            for key, lvalue in iteritems(value):
-                if key not in self and self.schema_missing == 'ignore':
-                    continue
-                self[key].set_from_native(lvalue)
-            for key in set(self).difference(set(value)):
-                self[key].set_from_native(Unspecified)
+            for element, item in self._pair_members(value):
+                element.set_from_native(item)
 
-    def _set_value_from_raw(self, value):
+    def _set_members_from_raw(self, value):
         if value is Unspecified:
-            for element in itervalues(self):
-                element.set_from_raw(value)
-        else:
-            for key, lvalue in iteritems(value):
-                if key not in self and self.schema_missing == 'ignore':
-                    continue
-                self[key].set_from_raw(lvalue)
-            for key in set(self).difference(set(value)):
-                self[key].set_from_raw(Unspecified)
+            if self.schema_missing == 'collect':
+                self.unknown_items = {}
+            return self._set_leaf_members(
+                (element, value) for element in itervalues(self._elements)
+            )
+        return self._set_leaf_members(self._pair_members(value))
 
     def unserialize(self, raw_value):
         raw_value = super(Form, self).unserialize(raw_value)
         if raw_value is NotUnserializable:
             return raw_value
-        if not isinstance(raw_value, dict):
+        if not isinstance(raw_value, dict) or self.max_keys is not None:
             try:
-                raw_value = dict(raw_value)
+                raw_value = _unserialize_mapping(dict, raw_value, self.max_keys)
             except (TypeError, ValueError):
                 return NotUnserializable
-        if not set(raw_value).intersection(set(self.member_schema)):
+            if raw_value is NotUnserializable:
+                return raw_value
+        names = self._field_names
+        if self.schema_missing == 'error':
+            if not raw_value or not names.issuperset(raw_value):
+                return NotUnserializable
+        elif names.isdisjoint(raw_value):
             return NotUnserializable
         return raw_value
 
-    def validate(self, context=None):
-        if context is None:
-            context = {}
-        self.is_valid = True
-        for key in self:
-            element = self[key]
-            self.is_valid &= element.validate(context=context)
-        self.is_valid &= super(Form, self).validate(context=context)
-        return self.is_valid
+    @classmethod
+    def _get_validator_dependencies(cls):
+        """
+        Returns a list of ``(validator, member_names)`` tuples for the
+        validators of the form, `member_names` is `None` if the validator does
+        not declare which members it depends on.
+        """
+        cached = cls.__dict__.get('_validator_dependencies')
+        if cached is not None and cached[0] is cls.validators:
+            return cached[1]
+        dependencies = []
+        for validator in cls.validators:
+            member_names = getattr(validator, 'depends_on', None)
+            if member_names is not None:
+                member_names = tuple(member_names)
+                if not set(member_names).issubset(cls.member_schema):
+                    member_names = None
+            dependencies.append((validator, member_names))
+        cls._validator_dependencies = (cls.validators, dependencies)
+        return dependencies
+
+    def _validate_dependent(self, dependencies, context):
+        results = self._validator_results
+        all_errors = context.all_errors
+        errors = self.errors
+        errors_noted = 0
+        is_valid = True
+        for validator, member_names in dependencies:
+            if member_names is None:
+                known_errors = len(errors)
+                result = validator(self, context)
+                errors_noted += len(errors) - known_errors
+                is_valid = is_valid and result
+                if not (result or all_errors):
+                    break
+                continue
+            members = [self._elements[name] for name in member_names]
+            if not all(member.is_valid for member in members):
+                # The form is already invalid, because of the member, running
+                # the validator would only add noise.
+                continue
+            values = tuple(member.value for member in members)
+            try:
+                last_values, result, noted = results[validator]
+            except KeyError:
+                last_values = result = noted = None
+            if last_values is None or last_values != values:
+                known_errors = len(errors)
+                result = validator(self, context)
+                noted = errors[known_errors:]
+                results[validator] = (values, result, noted)
+            else:
+                # The errors may have been cleared since the validator has
+                # been called, note them again without repeating them.
+                for error in noted:
+                    if error not in errors:
+                        errors.append(error)
+            # Reused results count like fresh ones, so that validation stops
+            # at the same point, when the form is validated again.
+            errors_noted += len(noted)
+            is_valid = is_valid and result
+            if not (result or all_errors):
+                break
+        if context.limited and not is_valid:
+            context.note_invalid(errors_noted)
+        return bool(is_valid)
+
+    def _validate_shallow(self, members_valid, context):
+        dependencies = self._get_validator_dependencies()
+        if self.validators is self.__class__.validators and any(
+            member_names is not None for _, member_names in dependencies
+        ):
+            self.is_valid = members_valid & self._validate_dependent(
+                dependencies, context
+            )
+            return self.is_valid
+        return super(Form, self)._validate_shallow(members_valid, context)
+
@@ -7,8 +7,28 @@
     :license: BSD, see LICENSE.rst for details
 """
 from relief.utils import class_cloner
-from relief.constants import Unspecified
-from relief.schema.core import BaseElement
+from relief.constants import Unspecified, NotUnserializable
+from relief.schema.core import (
+    BaseElement, ValidatedByMixin, _missing, _lazy_raw_value
+)
+from relief.validation import ValidationContext
+from relief._compat import string_types
+
+
+def _import_string(import_name):
+    """
+    Imports an object given a string like ``'package.module:name'`` or
+    ``'package.module.name'``.
+    """
+    if ':' in import_name:
+        module_name, name = import_name.split(':', 1)
+    else:
+        module_name, name = import_name.rsplit('.', 1)
+    module = __import__(module_name, None, None, [name])
+    try:
+        return getattr(module, name)
+    except AttributeError:
+        raise ImportError('cannot import name %s' % name)
 
 
 class Maybe(BaseElement):
@@ -26,6 +46,11 @@ class Maybe(BaseElement):
     .. versionadded:: 2.1.0
     """
     member_schema = None
+    _has_members = True
+    _memoized_value = _missing
+
+    raw_value = _lazy_raw_value
+    _raw_value = Unspecified
 
     @class_cloner
     def of(cls, schema):
@@ -40,7 +65,10 @@ class Maybe(BaseElement):
 
     @property
     def value(self):
-        return None if self.member.value is Unspecified else self.member.value
+        if self._memoized_value is not _missing:
+            return self._memoized_value
+        value = self.member.value
+        return None if value is Unspecified else value
 
     @value.setter
     def value(self, new_value):
@@ -57,21 +85,247 @@ class Maybe(BaseElement):
         return None if value is Unspecified else value
 
     def set_from_raw(self, raw_value):
+        for element, member_raw_value in self._set_from_raw_shallow(raw_value):
+            element.set_from_raw(member_raw_value)
+
+    def _set_from_raw_shallow(self, raw_value, limits=None):
         self.raw_value = raw_value
-        value = self.unserialize(raw_value)
-        if value is None:
-            self.member.set_from_raw(Unspecified)
-        else:
-            self.member.set_from_raw(raw_value)
+        if self.unserialize(raw_value) is None:
+            raw_value = Unspecified
         self.is_valid = None
+        if self.member._has_members:
+            return [(self.member, raw_value)]
+        self.member.set_from_raw(raw_value)
+        return []
+
+    def _members(self):
+        return [self.member]
+
+    def _value_from_members(self, values):
+        value, = values
+        return None if value is Unspecified else value
+
+    def _clone_members(self, clone):
+        clone.member = self.member._clone_prototype()
+
+    def reset(self):
+        self.member.reset()
+        super(Maybe, self).reset()
+
+    def _set_default_value(self):
+        # Called by containers applying their default value to their members,
+        # like a newly created element this one has no default.
+        self.set_from_raw(Unspecified)
 
     def set_from_native(self, value):
         self.member.set_from_native(value)
-        self.raw_value = self.member.raw_value
+        self._raw_value = _missing
         self.is_valid = None
 
+    def _compute_raw_value(self):
+        return self.member.raw_value
+
     def validate(self, context=None):
-        if context is None:
-            context = {}
-        self.is_valid = self.member.validate() or self.value is None
+        if not isinstance(context, ValidationContext):
+            context = ValidationContext(context)
+        return self._validate_shallow(self.member.validate(context), context)
+
+    def _stop_validation(self, context):
+        self.is_valid = None if context.interrupted else False
+        return False
+
+    def _validate_shallow(self, members_valid, context):
+        self.is_valid = members_valid or self.value is None
+        return self.is_valid
+
+
+class OneOf(ValidatedByMixin, BaseElement):
+    """
+    A meta element that represents one of several elements, the so called
+    branches. Which branch is used is determined by the value of a
+    discriminator in the raw (or native) mapping:
+
+    .. doctest::
+
+       >>> from relief import Form, Unicode, Integer
+       >>> class Click(Form):
+       ...     type = Unicode
+       ...     x = Integer
+       >>> class KeyPress(Form):
+       ...     type = Unicode
+       ...     key = Unicode
+       >>> Event = OneOf.by('type', {u'click': Click, u'key': KeyPress})
+       >>> element = Event({u'type': u'click', u'x': u'1'})
+       >>> isinstance(element.member, Click)
+       True
+       >>> element.value
+       OrderedDict([('type', u'click'), ('x', 1)])
+
+    The branch is looked up in a dictionary and only the matching branch is
+    instantiated, the other branches are never tried. If the discriminator is
+    missing or has an unknown value, :attr:`value` is
+    :data:`~relief.NotUnserializable`.
+
+    Instead of a schema, a branch can be given as import string such as
+    ``'myapp.events:Click'``. It is imported, the first time the branch is
+    needed, so that large unions don't have to be imported up front.
+
+    .. versionadded:: 2.2.0
+    """
+    #: The key under which the tag of the branch is found.
+    discriminator = None
+
+    #: A dictionary mapping tags to schemas or import strings.
+    branches = None
+
+    raw_value = _lazy_raw_value
+    _raw_value = Unspecified
+
+    _has_members = True
+    _memoized_value = _missing
+
+    @class_cloner
+    def by(cls, discriminator, branches):
+        """
+        Returns a new :class:`OneOf` class, that chooses from the given
+        `branches` by the value of the `discriminator` key.
+        """
+        cls.discriminator = discriminator
+        cls.branches = dict(branches)
+        return cls
+
+    @classmethod
+    def get_branch(cls, tag):
+        """
+        Returns the schema of the branch for the given `tag` or `None`, if
+        there is no such branch.
+        """
+        resolved = cls.__dict__.get('_resolved_branches')
+        if resolved is None:
+            resolved = cls._resolved_branches = {}
+        try:
+            return resolved[tag]
+        except KeyError:
+            pass
+        except TypeError:
+            # unhashable tags can't be in branches
+            return None
+        schema = cls.branches.get(tag)
+        if schema is None:
+            # tags come from the input, caching unknown ones would let the
+            # cache grow without bound
+            return None
+        if isinstance(schema, string_types):
+            schema = _import_string(schema)
+        resolved[tag] = schema
+        return schema
+
+    def __init__(self, value=Unspecified):
+        if self.branches is None:
+            raise TypeError('branches are unknown')
+        #: The element of the branch that has been chosen or `None`.
+        self.member = None
+        self._state = Unspecified
+        super(OneOf, self).__init__(value)
+
+    @property
+    def value(self):
+        if self._memoized_value is not _missing:
+            return self._memoized_value
+        if self.member is None:
+            return self._state
+        return self.member.value
+
+    @value.setter
+    def value(self, new_value):
+        if new_value is not Unspecified:
+            raise AttributeError("can't set attribute")
+
+    def _choose_member(self, value):
+        try:
+            tag = value[self.discriminator]
+        except (KeyError, IndexError, TypeError):
+            schema = None
+        else:
+            schema = self.get_branch(tag)
+        if schema is None:
+            self.member = None
+            self._state = NotUnserializable
+        else:
+            if self.member.__class__ is not schema:
+                self.member = schema._get_prototype()._clone_prototype()
+            self._state = None
+        return self.member
+
+    def serialize(self, value):
+        if self.member is None:
+            return value
+        return self.member.serialize(value)
+
+    def set_from_raw(self, raw_value):
+        for element, member_raw_value in self._set_from_raw_shallow(raw_value):
+            element.set_from_raw(member_raw_value)
+
+    def _set_from_raw_shallow(self, raw_value, limits=None):
+        self.raw_value = raw_value
+        self.is_valid = None
+        if raw_value is Unspecified:
+            self.member = None
+            self._state = Unspecified
+            return []
+        member = self._choose_member(raw_value)
+        if member is None:
+            return []
+        if member._has_members:
+            return [(member, raw_value)]
+        member.set_from_raw(raw_value)
+        return []
+
+    def set_from_native(self, value):
+        self.is_valid = None
+        if value is Unspecified:
+            self.member = None
+            self._state = Unspecified
+            self.raw_value = Unspecified
+        elif self._choose_member(value) is None:
+            self.raw_value = value
+        else:
+            self.member.set_from_native(value)
+            self._raw_value = _missing
+
+    def _set_default_value(self):
+        # like Maybe, there is no default and no branch is chosen
+        self.set_from_native(Unspecified)
+
+    def _compute_raw_value(self):
+        return self.member.raw_value
+
+    def _clone_members(self, clone):
+        if self.member is not None:
+            clone.member = self.member._clone_prototype()
+
+    def _members(self):
+        if self.member is None:
+            return []
+        return [self.member]
+
+    def _value_from_members(self, values):
+        if self.member is None:
+            return self._state
+        return values[0]
+
+    def validate(self, context=None):
+        if not isinstance(context, ValidationContext):
+            context = ValidationContext(context)
+        members_valid = True
+        if self.member is not None:
+            members_valid = self.member.validate(context)
+        return self._validate_shallow(members_valid, context)
+
+    def _stop_validation(self, context):
+        self.is_valid = None if context.interrupted else False
+        return False
+
+    def _validate_shallow(self, members_valid, context):
+        self.is_valid = members_valid & super(OneOf, self).validate(context)
         return self.is_valid
@@ -6,10 +6,16 @@
     :copyright: 2013 by Daniel Neuhäuser
     :license: BSD, see LICENSE.rst for details
 """
+import re
 import sys
+import uuid
+import decimal
+import datetime
 
 from relief import Unspecified, NotUnserializable, Element
-from relief._compat import text_type
+from relief.schema.core import _missing
+from relief.utils import class_cloner, LRUCache
+from relief._compat import text_type, iteritems, PY2
 
 
 class Boolean(Element):
@@ -119,22 +125,40 @@ class Unicode(Element):
     #: depending on whether you use 2.x or 3.x.
     encoding = None
 
+    #: The maximum number of characters a raw value may have, longer values
+    #: are not unserializable. Byte strings that are certainly too long are
+    #: rejected before they are decoded.
+    #:
+    #: .. versionadded:: 2.2.0
+    max_length = None
+
     def unserialize(self, raw_value):
         raw_value = super(Unicode, self).unserialize(raw_value)
         if raw_value is Unspecified or raw_value is NotUnserializable:
             return raw_value
         if isinstance(raw_value, text_type):
-            return raw_value
+            value = raw_value
         elif isinstance(raw_value, bytes):
+            # No common encoding needs more than 4 bytes per character, plus a
+            # byte order mark.
+            if (
+                self.max_length is not None and
+                len(raw_value) > self.max_length * 4 + 4
+            ):
+                return NotUnserializable
             if self.encoding is None:
                 encoding = sys.getdefaultencoding()
             else:
                 encoding  = self.encoding
             try:
-                return raw_value.decode(encoding)
+                value = raw_value.decode(encoding)
             except UnicodeDecodeError:
                 return NotUnserializable
-        return text_type(raw_value)
+        else:
+            value = text_type(raw_value)
+        if self.max_length is not None and len(value) > self.max_length:
+            return NotUnserializable
+        return value
 
 
 class Bytes(Element):
@@ -154,18 +178,404 @@ class Bytes(Element):
     """
     native_type = bytes
 
+    #: The maximum number of bytes a raw value may have, longer values are not
+    #: unserializable.
+    #:
+    #: .. versionadded:: 2.2.0
+    max_length = None
+
     def unserialize(self, raw_value):
         raw_value = super(Bytes, self).unserialize(raw_value)
         if raw_value is Unspecified or raw_value is NotUnserializable:
             return raw_value
         if isinstance(raw_value, bytes):
-            return raw_value
+            value = raw_value
         elif isinstance(raw_value, text_type):
+            if (
+                self.max_length is not None and
+                len(raw_value) > self.max_length
+            ):
+                return NotUnserializable
             try:
-                return raw_value.encode(sys.getdefaultencoding())
+                value = raw_value.encode(sys.getdefaultencoding())
             except UnicodeEncodeError:
                 return NotUnserializable
+        else:
+            if (
+                self.max_length is not None and
+                not PY2 and
+                isinstance(raw_value, int) and
+                raw_value > self.max_length
+            ):
+                # bytes(n) allocates n null bytes, so the length has to be
+                # checked before converting.
+                return NotUnserializable
+            try:
+                value = bytes(raw_value)
+            except (TypeError, ValueError, OverflowError):
+                return NotUnserializable
+        if self.max_length is not None and len(value) > self.max_length:
+            return NotUnserializable
+        return value
+
+
+def _lookup_key(value):
+    """
+    Returns the key under which `value` is found in the lookup dictionary of
+    a :class:`Choice`. Booleans and floats are keyed by their type as well,
+    otherwise `True` and ``1.0`` would be found under ``1``.
+    """
+    if value.__class__ is bool or value.__class__ is float:
+        return (value.__class__, value)
+    return value
+
+
+def _add_lookup_keys(lookup, key, target):
+    """
+    Adds `target` to the `lookup` dictionary under `key` and the forms in
+    which `key` is likely to appear in raw values, keys that are already
+    present are not overwritten.
+    """
+    try:
+        lookup.setdefault(_lookup_key(key), target)
+    except TypeError:
+        return
+    if isinstance(key, bool):
+        return
+    if isinstance(key, int):
+        key = text_type(key)
+        lookup.setdefault(key, target)
+    if isinstance(key, text_type):
+        lookup.setdefault(key.encode('utf-8'), target)
+    elif isinstance(key, bytes):
+        try:
+            lookup.setdefault(key.decode('utf-8'), target)
+        except UnicodeDecodeError:
+            pass
+
+
+class Choice(Element):
+    """
+    Base class for elements, whose values are one of a fixed set of values,
+    raw values are unserialized with a single lookup in a dictionary, that is
+    created once per class.
+
+    .. versionadded:: 2.2.0
+    """
+    _lookup = None
+
+    def __init__(self, value=Unspecified):
+        if self._lookup is None:
+            raise TypeError(
+                "You need to create a %s type with .of()" %
+                self.__class__.__name__
+            )
+        super(Choice, self).__init__(value)
+
+    def unserialize(self, raw_value):
+        raw_value = super(Choice, self).unserialize(raw_value)
+        if raw_value is Unspecified or raw_value is NotUnserializable:
+            return raw_value
+        try:
+            return self._lookup[_lookup_key(raw_value)]
+        except (KeyError, TypeError):
+            return NotUnserializable
+
+
+class Enum(Choice):
+    """
+    Represents a member of an :class:`enum.Enum`.
+
+    In order to use :class:`Enum` you have to derive a schema for a specific
+    enumeration with :meth:`of`::
+
+        >>> import enum
+        >>> from relief import Enum
+        >>> class Color(enum.Enum):
+        ...     red = 1
+        ...     green = 2
+        >>> element = Enum.of(Color)(u"1")
+        >>> element.value
+        <Color.red: 1>
+
+    Raw values may be members, their values or their names. Integer values
+    are also accepted as unicode or byte strings and unicode values as UTF-8
+    encoded byte strings. If a name is also the value of another member, the
+    value takes precedence.
+
+    .. versionadded:: 2.2.0
+    """
+    @class_cloner
+    def of(cls, enum):
+        """
+        Returns a new :class:`Enum` class for the given `enum`.
+        """
+        cls.native_type = enum
+        lookup = {}
+        members = list(enum)
+        for member in members:
+            lookup[member] = member
+        for member in members:
+            _add_lookup_keys(lookup, member.value, member)
+        names = getattr(enum, '__members__', None)
+        if names is None:
+            names = dict((member.name, member) for member in members)
+        for name, member in iteritems(names):
+            _add_lookup_keys(lookup, name, member)
+        cls._lookup = lookup
+        return cls
+
+
+class Literal(Choice):
+    """
+    Represents one of a fixed set of values.
+
+    In order to use :class:`Literal` you have to derive a schema from it,
+    that knows about the values with :meth:`of`::
+
+        >>> from relief import Literal
+        >>> element = Literal.of(u"asc", u"desc", 10)(u"10")
+        >>> element.value
+        10
+
+    Like with :class:`Enum` raw values may also be unicode or byte strings
+    representing integer values and byte strings representing unicode values.
+    Booleans and floats only match values of the same type, so `True` is not
+    accepted for ``1``.
+
+    .. versionadded:: 2.2.0
+    """
+    #: The values passed to :meth:`of`.
+    values = ()
+
+    native_type = object
+
+    @class_cloner
+    def of(cls, *values):
+        """
+        Returns a new :class:`Literal` class for the given `values`.
+        """
+        cls.values = values
+        lookup = {}
+        for value in values:
+            lookup[_lookup_key(value)] = value
+        for value in values:
+            _add_lookup_keys(lookup, value, value)
+        cls._lookup = lookup
+        return cls
+
+
+class Parsed(Element):
+    """
+    Base class for elements, whose raw values are strings that are parsed
+    with :meth:`parse`.
+
+    Like :class:`Integer` this respects :attr:`strict`,
+    :attr:`empty_string_as` and :attr:`default`. Raw values that are already
+    instances of :attr:`native_type` are used as they are and byte strings
+    are decoded using the default encoding.
+
+    When used as member of a :class:`~relief.List`, each distinct raw value is
+    parsed only once per list.
+
+    .. versionadded:: 2.2.0
+    """
+    #: The maximum number of parsed raw values, that are kept in a cache
+    #: shared by all elements of the class, so that values which are set
+    #: repeatedly are parsed only once. The cache is disabled if this is
+    #: `None`, which is the default.
+    parse_cache_size = None
+
+    @classmethod
+    def _get_parse_cache(cls):
+        cache = cls.__dict__.get('_parse_cache')
+        if cache is None:
+            cache = cls._parse_cache = LRUCache(maxsize=cls.parse_cache_size)
+        return cache
+
+    @classmethod
+    def _from_raw_many(cls, raw_values):
+        prototype = cls._get_prototype()
+        parsed = {}
+        elements = []
+        for raw_value in raw_values:
+            try:
+                key = (raw_value.__class__, raw_value)
+                value = parsed.get(key, _missing)
+            except TypeError:
+                key = value = _missing
+            if value is _missing:
+                value = prototype.unserialize(raw_value)
+                if key is not _missing:
+                    parsed[key] = value
+            element = prototype._clone_prototype()
+            element.raw_value = raw_value
+            element.value = value
+            elements.append(element)
+        return elements
+
+    def parse(self, string):
+        """
+        Returns the value represented by the given unicode `string`, raises
+        :exc:`ValueError` or :exc:`TypeError`, if the string is invalid.
+        """
+        raise NotImplementedError()
+
+    def unserialize(self, raw_value):
+        raw_value = super(Parsed, self).unserialize(raw_value)
+        if raw_value is NotUnserializable:
+            return raw_value
+        if raw_value is Unspecified:
+            if self.default is not Unspecified:
+                return self.default
+            if self.default_factory is not Unspecified and callable(self.default_factory):
+                return self.default_factory()
+            return raw_value
+        if isinstance(raw_value, self.native_type):
+            return raw_value
+        if isinstance(raw_value, bytes):
+            try:
+                raw_value = raw_value.decode(sys.getdefaultencoding())
+            except UnicodeDecodeError:
+                return NotUnserializable
+        elif not isinstance(raw_value, text_type):
+            return NotUnserializable
+        if self.parse_cache_size is None:
+            return self._parse(raw_value)
+        cache = self._get_parse_cache()
+        value = cache.get(raw_value, _missing)
+        if value is _missing:
+            value = self._parse(raw_value)
+            cache.set(raw_value, value)
+        return value
+
+    def _parse(self, string):
         try:
-            return bytes(raw_value)
-        except TypeError:
+            return self.parse(string)
+        except (ValueError, TypeError):
             return NotUnserializable
+
+
+_datetime_fromisoformat = getattr(datetime.datetime, 'fromisoformat', None)
+_date_fromisoformat = getattr(datetime.date, 'fromisoformat', None)
+
+# Used on Python versions without fromisoformat
+_iso_datetime_re = re.compile(
+    r"(\d{4})-(\d{2})-(\d{2})"
+    r"(?:[T ](\d{2}):(\d{2})(?::(\d{2})(?:\.(\d{1,6}))?)?)?$"
+)
+_iso_date_re = re.compile(r"(\d{4})-(\d{2})-(\d{2})$")
+
+
+class DateTime(Parsed):
+    """
+    Represents a :class:`datetime.datetime`.
+
+    Unserializes unicode and byte strings in ISO 8601 format, as produced by
+    :meth:`datetime.datetime.isoformat`::
+
+        >>> from relief import DateTime
+        >>> element = DateTime(u"2013-08-12T13:37:00")
+        >>> element.value
+        datetime.datetime(2013, 8, 12, 13, 37)
+
+    A trailing ``Z`` is accepted in place of a UTC offset of ``+00:00``.
+    Strings are parsed with :meth:`datetime.datetime.fromisoformat`, where
+    available, and a regular expression otherwise. On Python versions before
+    3.7 strings with an UTC offset are not unserializable.
+
+    .. versionadded:: 2.2.0
+    """
+    native_type = datetime.datetime
+
+    def parse(self, string):
+        if string[-1:] in (u"Z", u"z"):
+            string = string[:-1] + u"+00:00"
+        if _datetime_fromisoformat is not None:
+            try:
+                return _datetime_fromisoformat(string)
+            except ValueError:
+                # Before 3.11 fractions of seconds need exactly 3 or 6 digits
+                pass
+        match = _iso_datetime_re.match(string)
+        if match is None:
+            raise ValueError("invalid datetime: %r" % string)
+        parts = list(match.groups())
+        if parts[6] is not None:
+            parts[6] = parts[6].ljust(6, u"0")
+        return datetime.datetime(*[int(part) for part in parts if part])
+
+
+class Date(Parsed):
+    """
+    Represents a :class:`datetime.date`.
+
+    Unserializes unicode and byte strings in the format ``YYYY-MM-DD``, as
+    produced by :meth:`datetime.date.isoformat`. Instances of
+    :class:`datetime.datetime` are not unserializable.
+
+    .. versionadded:: 2.2.0
+    """
+    native_type = datetime.date
+
+    def parse(self, string):
+        if _date_fromisoformat is not None:
+            return _date_fromisoformat(string)
+        match = _iso_date_re.match(string)
+        if match is None:
+            raise ValueError("invalid date: %r" % string)
+        return datetime.date(*[int(part) for part in match.groups()])
+
+    def unserialize(self, raw_value):
+        if isinstance(raw_value, datetime.datetime):
+            return NotUnserializable
+        return super(Date, self).unserialize(raw_value)
+
+
+class Decimal(Parsed):
+    """
+    Represents a :class:`decimal.Decimal`.
+
+    Unserializes unicode and byte strings, as well as integers and floats.
+    Floats are converted using their shortest representation, so ``0.1``
+    becomes ``Decimal('0.1')``. Infinity and NaN are not unserializable.
+
+    .. versionadded:: 2.2.0
+    """
+    native_type = decimal.Decimal
+
+    def parse(self, string):
+        value = decimal.Decimal(string)
+        if not value.is_finite():
+            raise ValueError("not a finite decimal: %r" % string)
+        return value
+
+    def unserialize(self, raw_value):
+        if isinstance(raw_value, bool):
+            return NotUnserializable
+        if not self.strict and isinstance(raw_value, (int, float)):
+            raw_value = repr(raw_value)
+            if not isinstance(raw_value, text_type):
+                raw_value = raw_value.decode('ascii')
+        return super(Decimal, self).unserialize(raw_value)
+
+    def _parse(self, string):
+        try:
+            return self.parse(string)
+        except (ValueError, TypeError, decimal.InvalidOperation):
+            return NotUnserializable
+
+
+class UUID(Parsed):
+    """
+    Represents a :class:`uuid.UUID`.
+
+    Unserializes unicode and byte strings in any of the formats accepted by
+    :class:`uuid.UUID`, such as ``12345678-1234-5678-1234-567812345678``.
+
+    .. versionadded:: 2.2.0
+    """
+    native_type = uuid.UUID
+
+    def parse(self, string):
+        return uuid.UUID(string)
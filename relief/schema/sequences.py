@@ -6,32 +6,98 @@
     :copyright: 2013 by Daniel Neuhäuser
     :license: BSD, see LICENSE.rst for details
 """
+from bisect import bisect_left
+from itertools import islice
+
 from relief import Unspecified, NotUnserializable
 from relief.utils import class_cloner
 from relief.schema.core import Container
 
 
 class Sequence(Container):
+    #: When `True` a mapping of values to the positions at which they occur is
+    #: created, the first time :meth:`__contains__`, :meth:`index` or
+    #: :meth:`count` is called after a value has been set. This makes
+    #: repeated lookups considerably cheaper, if the values are hashable.
+    #:
+    #: The mapping is not updated, if members are changed directly.
+    #:
+    #: .. versionadded:: 2.2.0
+    indexed = False
+
+    def set_from_native(self, value):
+        self._positions = None
+        super(Sequence, self).set_from_native(value)
+
+    def _set_from_raw_shallow(self, raw_value, limits=None):
+        self._positions = None
+        return super(Sequence, self)._set_from_raw_shallow(raw_value, limits)
+
+    def _members(self):
+        return self
+
+    def _get_positions(self):
+        """
+        Returns a dictionary mapping values to a list of positions or `None`,
+        if :attr:`indexed` is `False` or the values are not hashable.
+        """
+        if not self.indexed or self._positions is False:
+            return None
+        if self._positions is None:
+            positions = {}
+            try:
+                for i, element in enumerate(self):
+                    positions.setdefault(element.value, []).append(i)
+            except TypeError:
+                positions = False
+            self._positions = positions
+        return self._positions or None
+
     def __contains__(self, value):
+        positions = self._get_positions()
+        if positions is not None:
+            try:
+                return value in positions
+            except TypeError:
+                pass
         return any(element.value == value for element in self)
 
     def index(self, value, start=None, stop=None):
-        for i, element in enumerate(self[start:stop], start or 0):
+        start, stop, _ = slice(start, stop).indices(len(self))
+        positions = self._get_positions()
+        if positions is not None:
+            try:
+                candidates = positions.get(value, [])
+            except TypeError:
+                pass
+            else:
+                i = bisect_left(candidates, start)
+                if i < len(candidates) and candidates[i] < stop:
+                    return candidates[i]
+                raise ValueError(
+                    "%r not in %s" % (value, self.__class__.__name__)
+                )
+        for i, element in enumerate(islice(self, start, stop), start):
             if element.value == value:
                 return i
         raise ValueError("%r not in %s" % (value, self.__class__.__name__))
 
     def count(self, value):
+        positions = self._get_positions()
+        if positions is not None:
+            try:
+                return len(positions.get(value, []))
+            except TypeError:
+                pass
         return sum(element.value == value for element in self)
 
-    def validate(self, context=None):
-        if context is None:
-            context = {}
-        self.is_valid = True
-        for element in self:
-            self.is_valid &= element.validate(context)
-        self.is_valid &= super(Sequence, self).validate(context)
-        return self.is_valid
+    def _value_from_members(self, values):
+        if self._state is not None:
+            return self._state
+        for value in values:
+            if value is NotUnserializable:
+                return NotUnserializable
+        return self.native_type(values)
 
 
 class Tuple(Sequence, tuple):
@@ -104,22 +170,23 @@ class Tuple(Sequence, tuple):
             (schema() for schema in cls.member_schema)
         )
 
-    @property
-    def value(self):
-        if self._state is not None:
-            return self._state
-        result = []
-        for element in self:
-            if element.value is NotUnserializable:
-                return NotUnserializable
-            result.append(element.value)
-        return tuple(result)
-
-    @value.setter
-    def value(self, new_value):
+    def _set_value(self, new_value):
         if new_value is not Unspecified:
             raise ValueError("can't set attribute")
 
+    value = property(Container._get_value, _set_value)
+
+    def reset(self):
+        for element in self:
+            element.reset()
+        super(Tuple, self).reset()
+
+    def _new_clone(self):
+        return tuple.__new__(
+            self.__class__,
+            [element._clone_prototype() for element in self]
+        )
+
     def _set_value_from_native(self, value):
         if value is Unspecified:
             for element in self:
@@ -128,20 +195,25 @@ class Tuple(Sequence, tuple):
             for element, value in zip(self, value):
                 element.set_from_native(value)
 
-    def _set_value_from_raw(self, value):
+    def _set_members_from_raw(self, value):
         if value is Unspecified:
-            for element in self:
-                element.set_from_raw(value)
-        else:
-            for element, raw_value in zip(self, value):
-                element.set_from_raw(raw_value)
+            return self._set_leaf_members(
+                (element, Unspecified) for element in self
+            )
+        return self._set_leaf_members(zip(self, value))
 
     def unserialize(self, raw_value):
         raw_value = super(Tuple, self).unserialize(raw_value)
         if raw_value is NotUnserializable:
             return raw_value
+        if raw_value.__class__ is tuple:
+            if len(raw_value) != len(self.member_schema):
+                return NotUnserializable
+            return raw_value
         try:
-            raw_value = tuple(raw_value)
+            # Consuming one item more than we need is enough to tell, that the
+            # raw value is too long.
+            raw_value = tuple(islice(raw_value, len(self.member_schema) + 1))
         except TypeError:
             return NotUnserializable
         if len(raw_value) != len(self.member_schema):
@@ -149,7 +221,6 @@ class Tuple(Sequence, tuple):
         return raw_value
 
 
-
 class List(Sequence, list):
     """
     Represents a :func:`list`.
@@ -182,40 +253,60 @@ class List(Sequence, list):
     """
     native_type = list
 
-    @property
-    def value(self):
-        if self._state is not None:
-            return self._state
-        result = []
-        for element in self:
-            if element.value is NotUnserializable:
-                return NotUnserializable
-            result.append(element.value)
-        return result
-
-    @value.setter
-    def value(self, new_value):
-        if new_value is not Unspecified:
-            raise AttributeError("can't set attribute")
+    #: The maximum number of items a raw value may contain. Raw values with
+    #: more items are rejected without consuming them completely and
+    #: :attr:`value` will be :data:`~relief.NotUnserializable`.
+    #:
+    #: .. versionadded:: 2.2.0
+    max_items = None
 
     def _set_value_from_native(self, value):
         super(List, self).__delitem__(slice(None, None, None)) # del self[:]
         if value is not Unspecified:
-            super(List, self).extend(map(self.member_schema, value))
+            super(List, self).extend(self.member_schema._from_raw_many(value))
 
-    def _set_value_from_raw(self, value):
+    def _set_members_from_raw(self, value):
         super(List, self).__delitem__(slice(None, None, None)) # del self[:]
-        if value is not Unspecified:
-            super(List, self).extend(map(self.member_schema, value))
+        if value is Unspecified or not value:
+            return []
+        if not self.member_schema._has_members:
+            super(List, self).extend(self.member_schema._from_raw_many(value))
+            return []
+        # Members are created without a value, so that their own members can
+        # be set without recursion. Cloning a prototype is considerably
+        # cheaper than instantiating the schema.
+        prototype = self.member_schema._get_prototype()
+        elements = [prototype._clone_prototype() for _ in value]
+        super(List, self).extend(elements)
+        return list(zip(elements, value))
+
+    def _new_clone(self):
+        clone = list.__new__(self.__class__)
+        list.extend(clone, [element._clone_prototype() for element in self])
+        return clone
 
     def unserialize(self, raw_value):
         raw_value = super(List, self).unserialize(raw_value)
         if raw_value is NotUnserializable:
             return raw_value
+        if raw_value.__class__ is list:
+            # The unserialized value is only iterated over, so lists, like
+            # those returned by json.loads, need not be copied.
+            if self.max_items is not None and len(raw_value) > self.max_items:
+                return NotUnserializable
+            return raw_value
+        if self.max_items is None:
+            try:
+                return list(raw_value)
+            except TypeError:
+                return NotUnserializable
         try:
-            return list(raw_value)
+            items = list(islice(raw_value, self.max_items + 1))
         except TypeError:
             return NotUnserializable
+        if len(items) > self.max_items:
+            return NotUnserializable
+        return items
 
     def __setitem__(self, index):
         raise TypeError(
@@ -237,10 +328,15 @@ class List(Sequence, list):
             '%r object does not support slice deletion' % self.__class__.__name__
         )
 
+    #: Methods of the native type, which are hidden because they would
+    #: change the element.
+    _mutating_methods = frozenset([
+        'append', 'extend', 'insert', 'pop', 'remove'
+    ])
+
     def __getattribute__(self, name):
-        mutating_methods = set([
-            'append', 'extend', 'insert', 'pop', 'remove'
-        ])
-        if name in mutating_methods:
+        if name in List._mutating_methods:
             raise AttributeError(name)
-        return super(List, self).__getattribute__(name)
+        # Neither the native type nor any base class overrides this, calling
+        # it directly is considerably faster than using super.
+        return object.__getattribute__(self, name)
@@ -0,0 +1,254 @@
+# coding: utf-8
+"""
+    relief.schema.serialization
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Writes JSON directly from elements, without creating their :attr:`value`
+    first, and creates elements from JSON. Elements are traversed with an
+    explicit stack and the output is produced in chunks, so that neither the
+    depth of nesting nor the number of members is limited by the recursion
+    limit or memory used for an intermediate representation.
+
+    :copyright: 2013 by Daniel Neuhäuser
+    :license: BSD, see LICENSE.rst for details
+"""
+import json
+import uuid
+import decimal
+import numbers
+import datetime
+from json.encoder import encode_basestring_ascii
+try:
+    import enum
+except ImportError:
+    enum = None
+
+from relief import Unspecified, NotUnserializable
+from relief.schema.meta import Maybe, OneOf
+from relief.schema.mappings import Mapping, Form
+from relief.schema.sequences import Sequence
+from relief.schema import traversal
+from relief._compat import text_type, iteritems
+
+
+#: The number of characters that are written at once by :func:`dump_json`
+#: and the approximate size of the chunks returned by :func:`iter_json`.
+chunk_size = 64 * 1024
+
+
+def iter_json(element, default=None):
+    """
+    Returns an iterator over byte strings, that together form the JSON
+    representation of the value of `element`.
+
+    Values are encoded as :func:`json.dumps` would encode them, without any
+    whitespace and with non-ASCII characters escaped. In addition
+    :class:`datetime.datetime` and :class:`datetime.date` are encoded as ISO
+    8601 strings, :class:`uuid.UUID` as strings, :class:`decimal.Decimal` as
+    numbers, members of an :class:`enum.Enum` by their value and byte strings
+    are decoded as UTF-8. Any other value is passed to `default`, which
+    should return an object that can be encoded or raise :exc:`TypeError`.
+
+    :exc:`ValueError` is raised, if an element has no value, that is if its
+    value is :data:`~relief.Unspecified` or
+    :data:`~relief.NotUnserializable`, unless the element is the member of a
+    :class:`~relief.Maybe`. As the JSON representation is produced
+    incrementally, chunks may have been returned before that happens.
+
+    .. versionadded:: 2.2.0
+    """
+    chunk = []
+    size = 0
+    for string in _encode(element, default, max(1, chunk_size // 16)):
+        chunk.append(string)
+        size += len(string)
+        if size >= chunk_size:
+            yield u"".join(chunk).encode('ascii')
+            chunk = []
+            size = 0
+    if chunk:
+        yield u"".join(chunk).encode('ascii')
+
+
+def dump_json(element, stream, default=None):
+    """
+    Writes the JSON representation of the value of `element` to the binary
+    `stream`, see :func:`iter_json`.
+
+    .. versionadded:: 2.2.0
+    """
+    for chunk in iter_json(element, default):
+        stream.write(chunk)
+
+
+def to_json_bytes(element, default=None):
+    """
+    Returns the JSON representation of the value of `element` as a byte
+    string, see :func:`iter_json`.
+
+    .. versionadded:: 2.2.0
+    """
+    return b"".join(iter_json(element, default))
+
+
+def from_json(schema, data):
+    """
+    Returns an element of the given `schema`, that is set to the value
+    represented by the JSON document `data`, a unicode or UTF-8 encoded byte
+    string.
+
+    The document is decoded with :func:`json.loads`, the element is set to
+    the result with :func:`relief.schema.traversal.set_from_raw`. Lists and
+    dictionaries in the decoded value are not copied while unserializing.
+
+    Raises :exc:`ValueError`, if `data` is not a valid JSON document.
+
+    .. versionadded:: 2.2.0
+    """
+    if isinstance(data, bytes):
+        data = data.decode('utf-8')
+    element = schema()
+    traversal.set_from_raw(element, json.loads(data))
+    return element
+
+
+def _encode(element, default, batch_size):
+    """
+    Yields strings forming the JSON representation of `element`, each of
+    which is joined from `batch_size` or fewer parts.
+    """
+    parts = []
+    append = parts.append
+    # The stack holds the containers, whose members are being encoded, as
+    # lists of an iterator over ``(key, member)`` pairs, the string closing
+    # the container and the string preceding the next member.
+    stack = []
+    frame = None
+    while True:
+        if isinstance(element, _meta_types):
+            element = _resolve(element)
+        if element is None:
+            append(u"null")
+        elif element._has_members:
+            opening, closing, items = _open_container(element)
+            append(opening)
+            frame = [items, closing, u""]
+            stack.append(frame)
+        else:
+            value = element.value
+            if value.__class__ is text_type:
+                append(encode_basestring_ascii(value))
+            elif value.__class__ is int:
+                append(text_type(value))
+            elif value is Unspecified or value is NotUnserializable:
+                raise ValueError("%r has no value" % element)
+            else:
+                append(_encode_value(value, default))
+        if len(parts) >= batch_size:
+            yield u"".join(parts)
+            del parts[:]
+        while stack:
+            try:
+                key, element = next(frame[0])
+            except StopIteration:
+                stack.pop()
+                append(frame[1])
+                if stack:
+                    frame = stack[-1]
+                continue
+            break
+        else:
+            yield u"".join(parts)
+            return
+        if key is None:
+            append(frame[2])
+        else:
+            append(frame[2] + key + u":")
+        frame[2] = u","
+
+
+_meta_types = (Maybe, OneOf)
+
+
+def _resolve(element):
+    """
+    Returns the element whose value is the value of `element` or `None`, if
+    the value is `None`.
+    """
+    while True:
+        if isinstance(element, Maybe):
+            member = element.member
+            if member._has_members:
+                if getattr(member, '_state', None) is Unspecified:
+                    return None
+            elif member.value is Unspecified:
+                return None
+            element = member
+        elif isinstance(element, OneOf):
+            if element.member is None:
+                raise ValueError("%r has no value" % element)
+            element = element.member
+        else:
+            return element
+
+
+def _open_container(element):
+    if isinstance(element, Form):
+        return u"{", u"}", (
+            (encode_basestring_ascii(key), member)
+            for key, member in iteritems(element._elements)
+        )
+    if element._state is not None:
+        raise ValueError("%r has no value" % element)
+    if isinstance(element, Mapping):
+        return u"{", u"}", (
+            (_encode_key(key), member) for key, member in iteritems(element)
+        )
+    if isinstance(element, Sequence):
+        return u"[", u"]", ((None, member) for member in element)
+    raise TypeError("%r can't be encoded as JSON" % element)
+
+
+def _encode_key(element):
+    value = element.value
+    if value is Unspecified or value is NotUnserializable:
+        raise ValueError("%r has no value" % element)
+    encoded = _encode_value(value, None)
+    if encoded.startswith(u'"'):
+        return encoded
+    # like json.dumps, keys that aren't strings are converted to strings
+    return u'"' + encoded + u'"'
+
+
+def _encode_value(value, default):
+    while True:
+        if value is None:
+            return u"null"
+        elif value is True:
+            return u"true"
+        elif value is False:
+            return u"false"
+        elif isinstance(value, text_type):
+            return encode_basestring_ascii(value)
+        elif enum is not None and isinstance(value, enum.Enum):
+            value = value.value
+        elif isinstance(value, numbers.Integral):
+            return text_type(int(value))
+        elif isinstance(value, float):
+            if value != value or value in (float('inf'), float('-inf')):
+                raise ValueError("%r can't be encoded as JSON" % value)
+            return text_type(repr(value))
+        elif isinstance(value, decimal.Decimal):
+            if not value.is_finite():
+                raise ValueError("%r can't be encoded as JSON" % value)
+            return text_type(value)
+        elif isinstance(value, bytes):
+            value = value.decode('utf-8')
+        elif isinstance(value, (datetime.datetime, datetime.date)):
+            return u'"' + value.isoformat() + u'"'
+        elif isinstance(value, uuid.UUID):
+            return u'"' + text_type(value) + u'"'
+        elif default is not None:
+            value, default = default(value), None
+        else:
+            raise TypeError("%r is not JSON serializable" % (value, ))
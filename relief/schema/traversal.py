@@ -0,0 +1,290 @@
+# coding: utf-8
+"""
+    relief.schema.traversal
+    ~~~~~~~~~~~~~~~~~~~~~~~
+
+    Sets, validates and extracts values of elements using an explicit stack
+    instead of recursion, so that arbitrarily deeply nested elements can be
+    handled without reaching the recursion limit.
+
+    :copyright: 2013 by Daniel Neuhäuser
+    :license: BSD, see LICENSE.rst for details
+"""
+from relief.schema.core import (
+    Container, _UnserializationLimits, _LimitExceeded, _missing
+)
+from relief.validation import ValidationContext
+from relief._compat import iteritems
+
+
+def set_from_raw(element, raw_value):
+    """
+    Equivalent to ``element.set_from_raw(raw_value)``.
+
+    :attr:`~relief.schema.core.Container.max_depth` and
+    :attr:`~relief.schema.core.Container.max_total_elements` of `element` are
+    respected, those of its members are ignored.
+
+    .. versionadded:: 2.2.0
+    """
+    if not element._has_members:
+        element.set_from_raw(raw_value)
+        return
+    limits = None
+    if isinstance(element, Container) and (
+        element.max_depth is not None or
+        element.max_total_elements is not None
+    ):
+        limits = _UnserializationLimits(
+            element.max_depth, element.max_total_elements
+        )
+    try:
+        _set_from_raw([(element, raw_value, 0)], limits)
+    except _LimitExceeded:
+        element._discard_members()
+
+
+def _set_from_raw(stack, limits):
+    # Each item on the stack is an element, the raw value it is set to and the
+    # number of containers it is contained in.
+    while stack:
+        current, current_raw_value, depth = stack.pop()
+        if isinstance(current, Container):
+            depth += 1
+            if (limits is not None and
+                limits.max_depth is not None and
+                depth > limits.max_depth
+               ):
+                raise _LimitExceeded()
+        pending = current._set_from_raw_shallow(current_raw_value, limits)
+        for member, member_raw_value in reversed(pending):
+            stack.append((member, member_raw_value, depth))
+
+
+def validate(element, context=None):
+    """
+    Equivalent to ``element.validate(context)``.
+
+    While the validators of an element with members are called, its
+    :attr:`value` is computed only once, instead of every time it is accessed.
+
+    .. versionadded:: 2.2.0
+    """
+    if not isinstance(context, ValidationContext):
+        context = ValidationContext(context)
+    if not element._has_members:
+        return element.validate(context)
+    limited = context.limited
+    # The stack holds the elements whose members are being validated, along
+    # with an iterator over the members that remain to be validated, whether
+    # the members validated so far are valid and their values.
+    stack = []
+    current, members, members_valid, values = (
+        element, iter(element._members()), True, []
+    )
+    while True:
+        for member in members:
+            if member._has_members:
+                stack.append((current, members, members_valid, values))
+                current, members, members_valid, values = (
+                    member, iter(member._members()), True, []
+                )
+                break
+            members_valid &= member.validate(context)
+            values.append(member.value)
+            if limited and context.should_stop():
+                return _stop_validation(current, stack, context)
+        else:
+            value = current._value_from_members(values)
+            current._memoized_value = value
+            try:
+                is_valid = current._validate_shallow(members_valid, context)
+            finally:
+                del current._memoized_value
+            if not stack:
+                return is_valid
+            current, members, members_valid, values = stack.pop()
+            members_valid &= is_valid
+            values.append(value)
+            if limited and context.should_stop():
+                return _stop_validation(current, stack, context)
+
+
+def load(element, raw_value, context=None):
+    """
+    Equivalent to ``element.set_from_raw(raw_value)`` followed by
+    ``element.validate(context)``, returns whether `element` is valid.
+
+    Each element is validated right after its members have been set and
+    validated, so that the elements are traversed only once. If validation
+    is stopped early, the remaining members are still set.
+
+    If `element` limits its :attr:`~relief.schema.core.Container.max_depth`
+    or :attr:`~relief.schema.core.Container.max_total_elements`, it is set
+    completely, before it is validated.
+
+    .. versionadded:: 2.2.0
+    """
+    if not isinstance(context, ValidationContext):
+        context = ValidationContext(context)
+    if not element._has_members:
+        element.set_from_raw(raw_value)
+        return element.validate(context)
+    if isinstance(element, Container) and (
+        element.max_depth is not None or
+        element.max_total_elements is not None
+    ):
+        # Exceeding a limit discards everything that has been set and
+        # validated so far.
+        set_from_raw(element, raw_value)
+        return validate(element, context)
+    limited = context.limited
+    # Like in validate, with the addition of a reversed list of the
+    # ``(member, raw_value)`` pairs for the members, that have members
+    # themselves and have not been set yet.
+    stack = []
+    current, members, members_valid, values, pending = _load_shallow(
+        element, raw_value
+    )
+    while True:
+        for member in members:
+            if member._has_members:
+                stack.append(
+                    (current, members, members_valid, values, pending)
+                )
+                current, members, members_valid, values, pending = (
+                    _load_shallow(member, _pop_raw_value(pending, member))
+                )
+                break
+            members_valid &= member.validate(context)
+            values.append(member.value)
+            if limited and context.should_stop():
+                return _stop_loading(current, pending, stack, context)
+        else:
+            value = current._value_from_members(values)
+            current._memoized_value = value
+            try:
+                is_valid = current._validate_shallow(members_valid, context)
+            finally:
+                del current._memoized_value
+            if not stack:
+                return is_valid
+            current, members, members_valid, values, pending = stack.pop()
+            members_valid &= is_valid
+            values.append(value)
+            if limited and context.should_stop():
+                return _stop_loading(current, pending, stack, context)
+
+
+def _load_shallow(element, raw_value):
+    if raw_value is _missing:
+        # The element has been set by its container already, like the keys
+        # of mappings.
+        pending = []
+    else:
+        pending = element._set_from_raw_shallow(raw_value)
+        pending.reverse()
+    return element, iter(element._members()), True, [], pending
+
+
+def _pop_raw_value(pending, member):
+    """
+    Removes `member` from the reversed list of pending ``(member, raw_value)``
+    pairs and returns the raw value or `_missing`, if `member` is not
+    pending.
+    """
+    # Members are usually pending in the order in which they are validated,
+    # except for forms.
+    if pending and pending[-1][0] is member:
+        return pending.pop()[1]
+    for index in range(len(pending) - 1, -1, -1):
+        if pending[index][0] is member:
+            return pending.pop(index)[1]
+    return _missing
+
+
+def _stop_loading(current, pending, stack, context):
+    for member, member_raw_value in pending:
+        _set_from_raw([(member, member_raw_value, 0)], None)
+    for frame in stack:
+        for member, member_raw_value in frame[4]:
+            _set_from_raw([(member, member_raw_value, 0)], None)
+    return _stop_validation(current, stack, context)
+
+
+def _stop_validation(current, stack, context):
+    current._stop_validation(context)
+    for frame in reversed(stack):
+        frame[0]._stop_validation(context)
+    return False
+
+
+def get_value(element):
+    """
+    Equivalent to ``element.value``.
+
+    .. versionadded:: 2.2.0
+    """
+    if not element._has_members:
+        return element.value
+    stack = []
+    current, members, values = element, iter(element._members()), []
+    while True:
+        for member in members:
+            if member._has_members:
+                stack.append((current, members, values))
+                current, members, values = (
+                    member, iter(member._members()), []
+                )
+                break
+            values.append(member.value)
+        else:
+            value = current._value_from_members(values)
+            if not stack:
+                return value
+            current, members, values = stack.pop()
+            values.append(value)
+
+
+def iter_errors(element):
+    """
+    Yields a ``(path, errors)`` tuple for `element` and each of its members,
+    that has :attr:`~relief.Element.errors`, in the order in which they are
+    validated.
+
+    `path` is a tuple of the keys of forms and mappings and the indices of
+    sequences leading to the member. Errors of a key in a mapping are reported
+    under the same path as the errors of the corresponding value.
+
+    .. versionadded:: 2.2.0
+    """
+    from relief.schema.mappings import Mapping, Form
+    from relief.schema.sequences import Sequence
+    stack = [((), element)]
+    while stack:
+        path, current = stack.pop()
+        errors = getattr(current, 'errors', None)
+        if errors:
+            yield path, errors
+        if not current._has_members:
+            continue
+        if isinstance(current, Form):
+            members = [
+                (path + (name, ), member)
+                for name, member in iteritems(current._elements)
+            ]
+        elif isinstance(current, Mapping):
+            members = []
+            for key, value in iteritems(current):
+                key_path = path + (key.value, )
+                members.append((key_path, key))
+                members.append((key_path, value))
+        elif isinstance(current, Sequence):
+            members = [
+                (path + (index, ), member)
+                for index, member in enumerate(current)
+            ]
+        else:
+            members = [(path, member) for member in current._members()]
+        members.reverse()
+        stack.extend(members)
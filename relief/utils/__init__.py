@@ -9,6 +9,9 @@
 import sys
 
 from relief.utils.idd import InheritingDictDescriptor
+from relief.utils.pool import ElementPool
+from relief.utils.cache import LRUCache
+from relief.utils.parallel import map_ordered, read_chunks
 
 
 class class_cloner(classmethod):
@@ -29,4 +32,7 @@ def as_singleton(cls):
     return cls()
 
 
-__all__ = ['InheritingDictDescriptor', 'class_cloner', 'as_singleton']
+__all__ = [
+    'InheritingDictDescriptor', 'ElementPool', 'LRUCache', 'map_ordered',
+    'read_chunks', 'class_cloner', 'as_singleton'
+]
@@ -0,0 +1,80 @@
+# coding: utf-8
+"""
+    relief.utils.cache
+    ~~~~~~~~~~~~~~~~~~
+
+    :copyright: 2013 by Daniel Neuhäuser
+    :license: BSD, see LICENSE.rst for details
+"""
+from threading import Lock
+
+from relief._compat import OrderedDict
+
+
+class LRUCache(object):
+    """
+    A thread-safe mapping that holds at most `maxsize` items, discarding the
+    least recently used item, if more items are added.
+
+    The number of successful and unsuccessful lookups with :meth:`get` are
+    counted in :attr:`hits` and :attr:`misses`.
+
+    .. versionadded:: 2.2.0
+    """
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key, default=None):
+        """
+        Returns the item for the given `key` or `default`, if there is no
+        such item.
+
+        Raises :exc:`TypeError` if `key` is not hashable.
+        """
+        with self._lock:
+            try:
+                value = self._items.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self._items[key] = value
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """
+        Sets the item for the given `key` to `value`.
+        """
+        with self._lock:
+            self._items.pop(key, None)
+            self._items[key] = value
+            if len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        """
+        Removes all items and resets :attr:`hits` and :attr:`misses`.
+        """
+        with self._lock:
+            self._items.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def statistics(self):
+        """
+        Returns a dictionary containing the number of `hits`, `misses`, the
+        current `size` and the `maxsize` of the cache.
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._items),
+            'maxsize': self.maxsize
+        }
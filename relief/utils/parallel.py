@@ -0,0 +1,60 @@
+# coding: utf-8
+"""
+    relief.utils.parallel
+    ~~~~~~~~~~~~~~~~~~~~~
+
+    :copyright: 2013 by Daniel Neuhäuser
+    :license: BSD, see LICENSE.rst for details
+"""
+import collections
+import multiprocessing
+
+
+def read_chunks(items, chunk_size):
+    """
+    Yields lists of at most `chunk_size` items of the iterable `items`, such
+    as the lines of a file, which can be passed to :func:`map_ordered` as
+    tasks.
+
+    .. versionadded:: 2.2.0
+    """
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def map_ordered(function, tasks, processes=1):
+    """
+    Yields the results of calling `function` with each item of the iterable
+    `tasks` in order, using a :class:`multiprocessing.Pool` of `processes`,
+    if there is more than one.
+
+    Unlike :meth:`multiprocessing.pool.Pool.imap`, at most twice as many
+    tasks as there are processes are read from `tasks` ahead of the results,
+    so that large inputs are never kept in memory as a whole. `function` and
+    the tasks have to be picklable.
+
+    .. versionadded:: 2.2.0
+    """
+    if processes == 1:
+        for task in tasks:
+            yield function(task)
+        return
+    pool = multiprocessing.Pool(processes)
+    try:
+        pending = collections.deque()
+        for task in tasks:
+            pending.append(pool.apply_async(function, (task, )))
+            if len(pending) >= 2 * processes:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
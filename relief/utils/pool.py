@@ -0,0 +1,72 @@
+# coding: utf-8
+"""
+    relief.utils.pool
+    ~~~~~~~~~~~~~~~~~
+
+    :copyright: 2013 by Daniel Neuhäuser
+    :license: BSD, see LICENSE.rst for details
+"""
+from contextlib import contextmanager
+
+
+class ElementPool(object):
+    """
+    A pool of elements of the given `schema` that are reused instead of being
+    created anew, every time an element is needed.
+
+    Elements are handed out with :meth:`element`, which is a context manager
+    that returns the element to the pool when the block is left::
+
+        >>> from relief import Form, Integer
+        >>> from relief.utils import ElementPool
+        >>> class Something(Form):
+        ...     foo = Integer
+        >>> pool = ElementPool(Something)
+        >>> with pool.element() as element:
+        ...     element.set_from_raw({u'foo': u'1'})
+        ...     element.validate()
+        True
+
+    Elements are :meth:`~relief.schema.core.BaseElement.reset` before they are
+    returned to the pool, at most `maxsize` elements are kept around.
+
+    .. versionadded:: 2.2.0
+    """
+    def __init__(self, schema, maxsize=None):
+        self.schema = schema
+        self.maxsize = maxsize
+        self._elements = []
+
+    def __len__(self):
+        return len(self._elements)
+
+    def acquire(self):
+        """
+        Returns an element from the pool or a new element, if the pool is
+        empty.
+        """
+        try:
+            return self._elements.pop()
+        except IndexError:
+            return self.schema()
+
+    def release(self, element):
+        """
+        Resets the given `element` and returns it to the pool.
+        """
+        if self.maxsize is not None and len(self._elements) >= self.maxsize:
+            return
+        element.reset()
+        self._elements.append(element)
+
+    @contextmanager
+    def element(self):
+        """
+        A context manager that acquires an element and releases it, when the
+        block is left.
+        """
+        element = self.acquire()
+        try:
+            yield element
+        finally:
+            self.release(element)
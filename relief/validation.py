@@ -7,14 +7,235 @@
     :license: BSD, see LICENSE.rst for details
 """
 import re
+from timeit import default_timer
+from collections import MutableMapping
 
-from ._compat import urlparse
+from ._compat import urlparse, text_type
 from relief import Unspecified, NotUnserializable
+from relief.utils import LRUCache
 
 N_ = lambda totranslate: totranslate
 
 
+class ValidationContext(MutableMapping):
+    """
+    The context passed to validators, which behaves like the mapping it wraps.
+    A new context can be created from a mapping, keyword arguments or both::
+
+        >>> context = ValidationContext({u'user': None}, fail_fast=True)
+
+    Keys that affect the validation are turned into attributes on creation and
+    when they are set through the context, so that they can be checked
+    cheaply. The following keys are recognized:
+
+    ``'trace'``
+        A callable that is called with each validator, the validated element
+        and the result, after the validator has been called.
+
+    ``'profile'``
+        A mutable mapping, in which the time spent in each validator is
+        accumulated, using the validator as key.
+
+    ``'all_errors'``
+        If `True` all validators of an element are called, even if one has
+        already failed.
+
+    ``'fail_fast'``
+        If `True` validation stops, as soon as an element is invalid.
+
+    ``'error_budget'``
+        The number of errors after which validation stops.
+
+    ``'timeout'``
+        The number of seconds, after the creation of the context, after which
+        validation stops.
+
+    If validation stops early, :attr:`stopped` is `True` and elements that
+    have not been validated yet remain in their previous state. Whether
+    validation should stop is checked, whenever the validation of a member of
+    a container finishes.
+
+    If validation is stopped because of the timeout or :meth:`cancel`,
+    :attr:`interrupted` is `True` and the containers whose validation has been
+    interrupted have an :attr:`~relief.Element.is_valid` of `None`. Their
+    :meth:`~relief.Element.validate` method returns `False`.
+
+    .. versionadded:: 2.2.0
+    """
+    def __init__(self, values=None, **kwargs):
+        if values is None:
+            values = {}
+        if kwargs:
+            values = dict(values, **kwargs)
+        self._values = values
+
+        #: The number of errors noted by invalid elements, only counted if an
+        #: error budget or fail fast is used.
+        self.errors_noted = 0
+
+        #: `True` if validation has been stopped early.
+        self.stopped = False
+
+        #: `True` if validation has been stopped because of the timeout or
+        #: because it has been cancelled.
+        self.interrupted = False
+
+        #: The :func:`timeit.default_timer` value after which validation
+        #: stops or `None`.
+        self.deadline = None
+
+        self._cancelled = False
+        self._timeout = None
+        self._update_flags()
+
+    @classmethod
+    def coerce(cls, context):
+        """
+        Returns the given `context`, if it is a :class:`ValidationContext`,
+        otherwise a :class:`ValidationContext` wrapping `context` is returned.
+        """
+        if isinstance(context, cls):
+            return context
+        return cls(context)
+
+    def _update_flags(self):
+        values = self._values
+        trace = values.get('trace')
+        self.trace = trace if callable(trace) else None
+        self.profile = values.get('profile')
+        self.all_errors = bool(values.get('all_errors', False))
+        self.fail_fast = bool(values.get('fail_fast', False))
+        self.error_budget = values.get('error_budget')
+        timeout = values.get('timeout')
+        if timeout != self._timeout:
+            self._timeout = timeout
+            if timeout is None:
+                self.deadline = None
+            else:
+                self.deadline = default_timer() + timeout
+
+        #: `True` if validators have to be traced or profiled.
+        self.instrumented = self.trace is not None or self.profile is not None
+
+        #: `True` if validation may stop early. In that case invalid elements
+        #: have to be reported with :meth:`note_invalid` and containers have
+        #: to call :meth:`should_stop`.
+        self.limited = (
+            self.fail_fast or
+            self.error_budget is not None or
+            self.deadline is not None or
+            self._cancelled
+        )
+
+    def note_invalid(self, errors):
+        """
+        Called with the number of noted `errors`, when an element turns out to
+        be invalid, if :attr:`limited` is `True`.
+        """
+        self.errors_noted += errors
+        if self.fail_fast or (
+            self.error_budget is not None and
+            self.errors_noted >= self.error_budget
+        ):
+            self.stopped = True
+
+    def cancel(self):
+        """
+        Stops validation, the next time :meth:`should_stop` is called. This
+        can be called from another thread.
+        """
+        self._cancelled = True
+        self.limited = True
+
+    def should_stop(self):
+        """
+        Returns `True` if validation should stop.
+        """
+        if not self.stopped and (
+            self._cancelled or
+            self.deadline is not None and default_timer() >= self.deadline
+        ):
+            self.stopped = self.interrupted = True
+        return self.stopped
+
+    def __getitem__(self, key):
+        return self._values[key]
+
+    def get(self, key, default=None):
+        return self._values.get(key, default)
+
+    def __contains__(self, key):
+        return key in self._values
+
+    def __setitem__(self, key, value):
+        self._values[key] = value
+        self._update_flags()
+
+    def __delitem__(self, key):
+        del self._values[key]
+        self._update_flags()
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, self._values)
+
+
+#: The cache shared by all validators, that use memoization. The number of
+#: hits and misses can be retrieved with
+#: :meth:`~relief.utils.LRUCache.statistics`.
+#:
+#: .. versionadded:: 2.2.0
+memoization_cache = LRUCache(maxsize=4096)
+
+
 class Validator(object):
+    #: An iterable of the names of the members of a :class:`~relief.Form`, this
+    #: validator reads, if it is used to validate a form. `None` means that
+    #: this is unknown.
+    #:
+    #: A :class:`~relief.Form` only calls a validator that declares what it
+    #: depends on, if all those members are valid and at least one of them has
+    #: changed since the validator has last been called.
+    #:
+    #: .. versionadded:: 2.2.0
+    depends_on = None
+
+    #: `True` if the result of the validator only depends on the value of the
+    #: element and noting errors is its only side effect. Pure validators may
+    #: be reordered, see :attr:`~relief.schema.core.ValidatedByMixin.validator_order`.
+    #:
+    #: .. versionadded:: 2.2.0
+    pure = False
+
+    #: A hint how expensive calling the validator is, relative to simple
+    #: comparisons, which have a cost of `1`.
+    #:
+    #: .. versionadded:: 2.2.0
+    cost = 1
+
+    #: If `True` and the validator is :attr:`pure`, the results and errors of
+    #: the validator are stored in :attr:`cache`, keyed by the validator and
+    #: the value of the element. If the same validator is called with an equal
+    #: value again, the result is returned and the errors are added to the
+    #: element, without calling :meth:`validate`.
+    #:
+    #: Subclasses that override :meth:`validate` don't inherit this, as their
+    #: results may depend on more than the value. They have to set it
+    #: themselves.
+    #:
+    #: .. versionadded:: 2.2.0
+    memoize = False
+
+    #: The :class:`~relief.utils.LRUCache` used, if :attr:`memoize` is `True`.
+    #: Defaults to :data:`memoization_cache`.
+    #:
+    #: .. versionadded:: 2.2.0
+    cache = memoization_cache
 
     @property
     def valid(self):
@@ -33,16 +254,78 @@ class Validator(object):
         element.errors.append(error.format(**substitutions))
 
     def is_unusable(self, element):
+        value = element.value
+        return value is Unspecified or value is NotUnserializable
+
+    @classmethod
+    def _memoizes_validate(cls):
+        """
+        Returns `True`, if :attr:`memoize` has been set by the class defining
+        :meth:`validate` or a subclass of it.
+        """
+        cached = cls.__dict__.get('_memoizes_validate_cache')
+        if cached is None:
+            cached = False
+            for base in cls.__mro__:
+                if 'memoize' in base.__dict__:
+                    cached = True
+                    break
+                if 'validate' in base.__dict__:
+                    break
+            cls._memoizes_validate_cache = cached
+        return cached
+
+    def _should_memoize(self):
         return (
-            element.value is Unspecified or
-            element.value is NotUnserializable
+            self.memoize and self.pure and self.cache is not None and
+            ('memoize' in self.__dict__ or self._memoizes_validate())
         )
 
-    def __call__(self, element, context):
+    def _validate_memoized(self, element, context):
+        value = element.value
+        # The type is part of the key, because 1, 1.0 and True are equal.
+        key = (self, value.__class__, value)
+        try:
+            cached = self.cache.get(key)
+        except TypeError:
+            # unhashable value
+            return self.validate(element, context)
+        if cached is not None:
+            result, errors = cached
+            element.errors.extend(errors)
+            return result
+        errors = element.errors
+        known_errors = len(errors)
         result = self.validate(element, context)
-        trace = context.get('trace', None)
-        if callable(trace):
-            trace(self, element, result)
+        self.cache.set(key, (result, tuple(errors[known_errors:])))
+        return result
+
+    def _call_instrumented(self, element, context):
+        profile = context.profile
+        if profile is not None:
+            start = default_timer()
+        if self._should_memoize():
+            result = self._validate_memoized(element, context)
+        else:
+            result = self.validate(element, context)
+        if profile is not None:
+            profile[self] = profile.get(self, 0.0) + default_timer() - start
+        if context.trace is not None:
+            context.trace(self, element, result)
+        return result
+
+    def __call__(self, element, context):
+        try:
+            instrumented = context.instrumented
+        except AttributeError:
+            context = ValidationContext(context)
+            instrumented = context.instrumented
+        if instrumented:
+            return self._call_instrumented(element, context)
+        if self._should_memoize():
+            result = self._validate_memoized(element, context)
+        else:
+            result = self.validate(element, context)
         # if result:
         #     print('validate: {}[{}] ({}) by {} with {}'.format(element.__class__.__name__, getattr(element, 'name', 'unnamed'), element.raw_value, self.__class__.__name__, result))
         # else:
@@ -57,6 +340,8 @@ class Present(Validator):
     #: Message that is stored in :attr:`Element.errors`.
     message = N_(u"May not be blank.")
 
+    pure = True
+
     def validate(self, element, context):
         if element.value is Unspecified:
             self.note_error(element, self.message, context)
@@ -72,6 +357,8 @@ class Converted(Validator):
     #: Message that is stored in :attr:`Element.errors`.
     message = N_(u"Not a valid value.")
 
+    pure = True
+
     def validate(self, element, context):
         if self.is_unusable(element):
             self.note_error(element, self.message, context)
@@ -86,6 +373,8 @@ class IsTrue(Validator):
     #: Message that is stored in :attr:`Element.errors`.
     message = N_(u"Must be true.")
 
+    pure = True
+
     def validate(self, element, context):
         if self.is_unusable(element) or not element.value:
             self.note_error(element, self.message, context)
@@ -100,6 +389,8 @@ class IsFalse(Validator):
     #: Message that is stored in :attr:`Element.errors`.
     message = N_(u"Must be false.")
 
+    pure = True
+
     def validate(self, element, context):
         if self.is_unusable(element) or element.value:
             self.note_error(element, self.message, context)
@@ -107,7 +398,42 @@ class IsFalse(Validator):
         return self.valid
 
 
-class ShorterThan(Validator):
+class BoundValidator(Validator):
+    """
+    Base class for validators that compare the value or the length of the value
+    with one or two bounds.
+
+    .. versionadded:: 2.2.0
+    """
+    pure = True
+
+    #: If `True` the length of the value is compared with the bounds.
+    measures_length = False
+
+    def accepts(self, measure):
+        """
+        Returns `True` if the given value or length of the value is within the
+        bounds.
+        """
+        raise NotImplementedError()
+
+    def note_failure(self, element, context):
+        """
+        Notes :attr:`message` as error, with the substitutions appropriate for
+        this validator.
+        """
+        raise NotImplementedError()
+
+    def validate(self, element, context):
+        if not self.is_unusable(element):
+            value = element.value
+            if self.accepts(len(value) if self.measures_length else value):
+                return self.valid
+        self.note_failure(element, context)
+        return self.invalid
+
+
+class ShorterThan(BoundValidator):
     """
     Validator that fails with :attr:`message` if the length of the value is
     equal to or longer than the given `upperbound`.
@@ -116,22 +442,24 @@ class ShorterThan(Validator):
     #: the message is substituted with the given `upperbound`.
     message = N_(u"Must be shorter than {upperbound}.")
 
+    measures_length = True
+
     def __init__(self, upperbound):
         self.upperbound = upperbound
 
-    def validate(self, element, context):
-        if self.is_unusable(element) or len(element.value) >= self.upperbound:
-            self.note_error(
-                element,
-                self.message,
-                context,
-                substitutions={"upperbound": self.upperbound}
-            )
-            return self.invalid
-        return self.valid
+    def accepts(self, length):
+        return length < self.upperbound
+
+    def note_failure(self, element, context):
+        self.note_error(
+            element,
+            self.message,
+            context,
+            substitutions={"upperbound": self.upperbound}
+        )
 
 
-class LongerThan(Validator):
+class LongerThan(BoundValidator):
     """
     Validator that fails with :attr:`message` if the length of the value is
     equal to or shorter than the given `lowerbound`.
@@ -140,22 +468,24 @@ class LongerThan(Validator):
     #: the message is substituted with the given `lowerbound`.
     message = N_(u"Must be longer than {lowerbound}.")
 
+    measures_length = True
+
     def __init__(self, lowerbound):
         self.lowerbound = lowerbound
 
-    def validate(self, element, context):
-        if self.is_unusable(element) or len(element.value) <= self.lowerbound:
-            self.note_error(
-                element,
-                self.message,
-                context,
-                substitutions={"lowerbound": self.lowerbound}
-            )
-            return self.invalid
-        return self.valid
+    def accepts(self, length):
+        return length > self.lowerbound
+
+    def note_failure(self, element, context):
+        self.note_error(
+            element,
+            self.message,
+            context,
+            substitutions={"lowerbound": self.lowerbound}
+        )
 
 
-class LengthWithinRange(Validator):
+class LengthWithinRange(BoundValidator):
     """
     Validator that fails with :attr:`message` if the length of the value is
     less than or equal to `start` or greater than or equal to `end`.
@@ -164,43 +494,69 @@ class LengthWithinRange(Validator):
     #: ``{end}`` is substituted with the given `start` and `end`.
     message = N_(u"Must be longer than {start} and shorter than {end}.")
 
+    measures_length = True
+
     def __init__(self, start, end):
         self.start = start
         self.end = end
 
-    def validate(self, element, context):
-        if (not self.is_unusable(element) and
-            self.start < len(element.value) < self.end
-           ):
-            return self.valid
+    def accepts(self, length):
+        return self.start < length < self.end
+
+    def note_failure(self, element, context):
         self.note_error(
             element,
             self.message,
             context,
             substitutions={"start": self.start, "end": self.end}
         )
-        return self.invalid
 
 
 class ContainedIn(Validator):
     """
     A validator that fails with ``"Not a valid value."`` if the value is not
     contained in `options`.
+
+    If `options` is a :class:`list`, :class:`tuple` or :class:`set` of
+    hashable objects, it is turned into a :class:`frozenset`, so that the
+    membership test does not depend on the number of options.
+
+    .. versionchanged:: 2.2.0
+       Hashable options are stored as :class:`frozenset`.
     """
     #: Message that is stored in :attr:`Element.errors`.
     message = N_(u"Not a valid value.")
 
+    pure = True
+    memoize = True
+
     def __init__(self, options):
+        self._original_options = options
+        if isinstance(options, (list, tuple, set)):
+            try:
+                options = frozenset(options)
+            except TypeError:
+                # unhashable options have to be compared one by one
+                pass
         self.options = options
 
+    def _contains(self, value):
+        try:
+            return value in self.options
+        except TypeError:
+            # unhashable values can't be looked up in a frozenset
+            if self.options is self._original_options:
+                raise
+            return any(value == option for option in self._original_options)
+
     def validate(self, element, context):
-        if element.value not in self.options:
+        if not self._contains(element.value):
             self.note_error(element, u"Not a valid value.", context)
             return self.invalid
         return self.valid
 
 
-class LessThan(Validator):
+class LessThan(BoundValidator):
     """
     Validator that fails with :attr:`message` if the value is greater than or
     equal to `upperbound`.
@@ -212,19 +568,19 @@ class LessThan(Validator):
     def __init__(self, upperbound):
         self.upperbound = upperbound
 
-    def validate(self, element, context):
-        if self.is_unusable(element) or element.value >= self.upperbound:
-            self.note_error(
-                element,
-                self.message,
-                context,
-                substitutions={"upperbound": self.upperbound}
-            )
-            return self.invalid
-        return self.valid
+    def accepts(self, value):
+        return value < self.upperbound
+
+    def note_failure(self, element, context):
+        self.note_error(
+            element,
+            self.message,
+            context,
+            substitutions={"upperbound": self.upperbound}
+        )
 
 
-class GreaterThan(Validator):
+class GreaterThan(BoundValidator):
     """
     Validator that fails with :attr:`message` if the value is less than or
     equal to `lowerbound`.
@@ -236,19 +592,19 @@ class GreaterThan(Validator):
     def __init__(self, lowerbound):
         self.lowerbound = lowerbound
 
-    def validate(self, element, context):
-        if self.is_unusable(element) or element.value <= self.lowerbound:
-            self.note_error(
-                element,
-                self.message,
-                context,
-                substitutions={"lowerbound": self.lowerbound}
-            )
-            return self.invalid
-        return self.valid
+    def accepts(self, value):
+        return value > self.lowerbound
 
+    def note_failure(self, element, context):
+        self.note_error(
+            element,
+            self.message,
+            context,
+            substitutions={"lowerbound": self.lowerbound}
+        )
 
-class WithinRange(Validator):
+
+class WithinRange(BoundValidator):
     """
     Validator that fails with :attr:`message` if the value is less than or
     equal to `start` or greater than or equal to `end.`
@@ -261,16 +617,16 @@ class WithinRange(Validator):
         self.start = start
         self.end = end
 
-    def validate(self, element, context):
-        if not self.is_unusable(element) and self.start < element.value < self.end:
-            return self.valid
+    def accepts(self, value):
+        return self.start < value < self.end
+
+    def note_failure(self, element, context):
         self.note_error(
             element,
             self.message,
             context,
             substitutions={"start": self.start, "end": self.end}
         )
-        return self.invalid
 
 
 class ItemsEqual(Validator):
@@ -286,10 +642,16 @@ class ItemsEqual(Validator):
     #: are substituted with the labels in the given `a` and `b`.
     message = N_(u"{a} and {b} must be equal.")
 
+    pure = True
+
     def __init__(self, a, b):
         self.a = a
         self.b = b
 
+    @property
+    def depends_on(self):
+        return (self.a[1], self.b[1])
+
     def validate(self, element, context):
         if (not self.is_unusable(element) and
             element.value[self.a[1]] == element.value[self.b[1]]
@@ -322,6 +684,10 @@ class AttributesEqual(Validator):
         self.a = a
         self.b = b
 
+    @property
+    def depends_on(self):
+        return (self.a[1], self.b[1])
+
     def validate(self, element, context):
         if (not self.is_unusable(element) and
             getattr(element, self.a[1]).value == getattr(element, self.b[1]).value
@@ -353,6 +719,10 @@ class ProbablyAnEmailAddress(Validator):
     #: Message that is stored in the :attr:`Element.errors`.
     message = N_(u"Must be a valid e-mail address.")
 
+    pure = True
+    memoize = True
+    cost = 5
+
     def validate(self, element, context):
         if not self.is_unusable(element) and u"@" in element.value:
             host = element.value.split(u"@", 1)[1]
@@ -381,6 +751,10 @@ class MatchesRegex(Validator):
     #: Message that is stored in :attr:`Element.errors`.
     message = N_(u'Must be a valid value.')
 
+    pure = True
+    memoize = True
+    cost = 10
+
     def __init__(self, regex=None):
         if regex is None:
             regex = self.regex
@@ -403,6 +777,10 @@ class IsURL(Validator):
     #: Message that is stored in :attr:`Element.errors`.
     message = N_(u'Must be a URL.')
 
+    pure = True
+    memoize = True
+    cost = 10
+
     def validate(self, element, context):
         if not self.is_unusable(element):
             parsed = urlparse(element.value)
@@ -410,3 +788,308 @@ class IsURL(Validator):
                 return self.valid
         self.note_error(element, self.message, context)
         return self.invalid
+
+
+def _find_duplicates(keys, limit):
+    """
+    Returns the positions of up to `limit` items in the list `keys`, which are
+    equal to an item at an earlier position.
+    """
+    duplicates = []
+    seen = set()
+    try:
+        for i, key in enumerate(keys):
+            if key in seen:
+                duplicates.append(i)
+                if len(duplicates) == limit:
+                    break
+            else:
+                seen.add(key)
+        return duplicates
+    except TypeError:
+        # at least one key is unhashable
+        pass
+    try:
+        return _find_sorted_duplicates(keys, limit)
+    except TypeError:
+        # the keys are not totally ordered
+        pass
+    duplicates = []
+    for i, key in enumerate(keys):
+        if any(key == keys[j] for j in range(i)):
+            duplicates.append(i)
+            if len(duplicates) == limit:
+                break
+    return duplicates
+
+
+def _find_sorted_duplicates(keys, limit):
+    """
+    Like :func:`_find_duplicates` but sorts the keys, raises :exc:`TypeError`
+    if they are not totally ordered.
+    """
+    # sorted() is stable, so within a run of equal keys the first position is
+    # the original and all following ones are duplicates.
+    order = sorted(range(len(keys)), key=keys.__getitem__)
+    duplicates = []
+    for previous, current in zip(order, order[1:]):
+        if keys[previous] == keys[current]:
+            duplicates.append(current)
+        elif not keys[previous] < keys[current]:
+            # partially ordered, like sets, equal keys may not be adjacent
+            raise TypeError()
+    duplicates.sort()
+    return duplicates[:limit]
+
+
+class UniqueItems(Validator):
+    """
+    Validator that fails with :attr:`message` if the value contains an item
+    more than once.
+
+    Duplicates are found in linear time, if the items are hashable, otherwise
+    the items are sorted. Only the positions of the first `max_reported`
+    duplicates are reported.
+
+    .. versionadded:: 2.2.0
+    """
+    #: Message that is stored in :attr:`Element.errors`, if the value is
+    #: unspecified or not unserializable.
+    message = N_(u"Must not contain duplicates.")
+
+    pure = True
+    cost = 10
+
+    #: Message that is stored in :attr:`Element.errors`, if duplicates have
+    #: been found. ``{positions}`` is substituted with a comma separated list
+    #: of positions at which duplicates have been found.
+    duplicates_message = N_(u"Must not contain duplicates, found at {positions}.")
+
+    def __init__(self, max_reported=10):
+        self.max_reported = max_reported
+
+    def get_keys(self, value):
+        """
+        Returns a list of the keys, whose uniqueness is validated.
+        """
+        return list(value)
+
+    def validate(self, element, context):
+        # List.value creates a new list on each access, so we only access it
+        # once.
+        value = element.value
+        if value is Unspecified or value is NotUnserializable:
+            self.note_error(element, self.message, context)
+            return self.invalid
+        duplicates = _find_duplicates(self.get_keys(value), self.max_reported)
+        if duplicates:
+            self.note_error(
+                element,
+                self.duplicates_message,
+                context,
+                substitutions={
+                    "positions": u", ".join(map(text_type, duplicates))
+                }
+            )
+            return self.invalid
+        return self.valid
+
+
+class UniqueBy(UniqueItems):
+    """
+    Like :class:`UniqueItems` but compares the result of calling `key` with
+    each item, instead of the item itself::
+
+        UniqueBy(lambda user: user[u'id'])
+
+    .. versionadded:: 2.2.0
+    """
+    def __init__(self, key, max_reported=10):
+        super(UniqueBy, self).__init__(max_reported=max_reported)
+        self.key = key
+
+    def get_keys(self, value):
+        return [self.key(item) for item in value]
+
+
+def _reorder_pure(validators, key):
+    """
+    Returns a list of the given `validators`, in which each run of consecutive
+    pure validators is sorted by `key`. Impure validators keep their position.
+    """
+    result = []
+    run = []
+    for validator in validators:
+        if getattr(validator, 'pure', False):
+            run.append(validator)
+        else:
+            result.extend(sorted(run, key=key))
+            run = []
+            result.append(validator)
+    result.extend(sorted(run, key=key))
+    return result
+
+
+class ValidatorOrder(object):
+    """
+    Determines the order in which the given `validators` are called, to reject
+    invalid values as cheaply as possible. Only pure validators are reordered.
+
+    If `adaptive` is `False`, validators are ordered by their :attr:`cost`
+    hint. Otherwise the runtime and rejection rate of each validator is
+    measured and every `reorder_interval` runs validators are ordered, so that
+    validators that are cheap and reject many values are called first.
+
+    .. versionadded:: 2.2.0
+    """
+    def __init__(self, validators, adaptive=False, reorder_interval=100):
+        self.validators = validators
+        self.adaptive = adaptive
+        self.reorder_interval = reorder_interval
+        self.order = _reorder_pure(
+            validators, lambda validator: getattr(validator, 'cost', 1)
+        )
+        #: A list of ``[calls, rejections, runtime]`` lists, corresponding
+        #: to :attr:`validators`.
+        self.statistics = [[0, 0, 0.0] for _ in validators]
+        self._statistics_by_id = dict(
+            (id(validator), statistics)
+            for validator, statistics in zip(validators, self.statistics)
+        )
+        self._runs = 0
+
+    def _expected_cost(self, validator):
+        calls, rejections, runtime = self._statistics_by_id[id(validator)]
+        if not calls:
+            # unmeasured validators go first, so that they get measured
+            return 0.0
+        # smoothed, so that validators that never rejected have a cost
+        rejection_rate = (rejections + 1.0) / (calls + 2.0)
+        return (runtime / calls) / rejection_rate
+
+    def reorder(self):
+        """
+        Orders the validators based on the collected statistics.
+        """
+        self.order = _reorder_pure(self.validators, self._expected_cost)
+
+    def __call__(self, element, context):
+        if not self.adaptive:
+            return all(validator(element, context) for validator in self.order)
+        result = True
+        statistics = self._statistics_by_id
+        for validator in self.order:
+            start = default_timer()
+            result = validator(element, context)
+            validator_statistics = statistics[id(validator)]
+            validator_statistics[0] += 1
+            validator_statistics[2] += default_timer() - start
+            if not result:
+                validator_statistics[1] += 1
+                break
+        self._runs += 1
+        if self._runs % self.reorder_interval == 0:
+            self.reorder()
+        return bool(result)
+
+
+class FusedBounds(Validator):
+    """
+    Calls :meth:`~BoundValidator.accepts` of the given bound `validators` in
+    order, checking only once whether the value is usable and computing the
+    length of the value at most once. Fails the same way the first failing
+    validator would.
+
+    Created by :func:`optimize_chain`.
+
+    .. versionadded:: 2.2.0
+    """
+    pure = True
+
+    def __init__(self, validators):
+        self.validators = validators
+        self.measures_length = validators[0].measures_length
+
+    def validate(self, element, context):
+        value = element.value
+        if value is Unspecified or value is NotUnserializable:
+            self.validators[0].note_failure(element, context)
+            return self.invalid
+        measure = len(value) if self.measures_length else value
+        for validator in self.validators:
+            if not validator.accepts(measure):
+                validator.note_failure(element, context)
+                return self.invalid
+        return self.valid
+
+
+_fusable_validators = frozenset([
+    ShorterThan, LongerThan, LengthWithinRange, LessThan, GreaterThan,
+    WithinRange
+])
+
+
+def _is_same_validator(a, b):
+    if a is b:
+        return True
+    return (
+        isinstance(a, Validator) and
+        a.__class__ is b.__class__ and
+        a.__dict__ == b.__dict__
+    )
+
+
+def _fuse(validators):
+    if len(validators) == 1:
+        return validators[0]
+    return FusedBounds(validators)
+
+
+def _optimize_pure_run(validators):
+    unique = []
+    for validator in validators:
+        # A pure validator called with the same value as an equal validator
+        # before it, can only succeed.
+        if not any(_is_same_validator(validator, seen) for seen in unique):
+            unique.append(validator)
+    result = []
+    group = []
+    for validator in unique:
+        fusable = validator.__class__ in _fusable_validators
+        if group and not (
+            fusable and group[0].measures_length == validator.measures_length
+        ):
+            result.append(_fuse(group))
+            group = []
+        if fusable:
+            group.append(validator)
+        else:
+            result.append(validator)
+    if group:
+        result.append(_fuse(group))
+    return result
+
+
+def optimize_chain(validators):
+    """
+    Returns a list of validators, that behaves like the given list of
+    `validators`, if the validators are called until one of them fails.
+
+    Within each run of consecutive pure validators, validators equal to a
+    previous one are removed and consecutive bound validators like
+    :class:`ShorterThan` and :class:`LongerThan` are fused into a
+    :class:`FusedBounds` validator.
+
+    .. versionadded:: 2.2.0
+    """
+    result = []
+    run = []
+    for validator in validators:
+        if getattr(validator, 'pure', False):
+            run.append(validator)
+        else:
+            result.extend(_optimize_pure_run(run))
+            run = []
+            result.append(validator)
+    result.extend(_optimize_pure_run(run))
+    return result
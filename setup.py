@@ -34,7 +34,7 @@ setup(
     description="datastructure validation",
     long_description=open(os.path.join(PROJECT_PATH, "README.rst")).read(),
     include_package_data=True,
-    packages=['relief', 'relief.schema', 'relief.utils'],
+    packages=['relief', 'relief.schema', 'relief.utils', 'relief.ingest'],
     install_requires=install_requires,
     classifiers=[
         "License :: OSI Approved :: BSD License",
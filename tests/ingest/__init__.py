@@ -0,0 +1,8 @@
+# coding: utf-8
+"""
+    tests.ingest
+    ~~~~~~~~~~~~
+
+    :copyright: 2013 by Daniel Neuhäuser
+    :license: BSD, see LICENSE.rst for details
+"""
@@ -0,0 +1,107 @@
+# coding: utf-8
+"""
+    tests.ingest.test_csv
+    ~~~~~~~~~~~~~~~~~~~~~
+
+    :copyright: 2013 by Daniel Neuhäuser
+    :license: BSD, see LICENSE.rst for details
+"""
+import io
+
+import pytest
+
+from relief import Form, Integer, Unicode, Unspecified, NotUnserializable
+from relief.validation import AttributesEqual
+from relief.ingest.csv import RowLoader, validate_rows
+
+
+class Person(Form):
+    name = Unicode
+    age = Integer
+    email = Unicode
+
+
+CSV = u"age,name,email\n42,Alice,alice@example.com\nfoo,Bob,\n7,Carol\n"
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_validate_rows(processes):
+    results = list(validate_rows(
+        Person, io.StringIO(CSV), processes=processes, chunk_size=1
+    ))
+    assert [row_number for row_number, _, _ in results] == [1, 2, 3]
+    assert results[0][1] == {
+        u"name": u"Alice", u"age": 42, u"email": u"alice@example.com"
+    }
+    assert results[0][2] == []
+    assert results[1][1][u"age"] is NotUnserializable
+    assert [path for path, _ in results[1][2]] == [(u"age", ), (u"email", )]
+    # short rows are set like csv.DictReader would
+    assert results[2][1] == {
+        u"name": u"Carol", u"age": 7, u"email": Unspecified
+    }
+    assert [path for path, _ in results[2][2]] == [(u"email", )]
+
+
+def test_validate_rows_empty():
+    assert list(validate_rows(Person, io.StringIO(u""))) == []
+
+
+@pytest.mark.parametrize("row", [
+    [u"42", u"Alice", u"alice@example.com"],
+    [u"foo", u"Bob", u""],
+    [u"7", u"Carol"]
+])
+def test_row_loader_equivalent_to_set_from_raw(row):
+    header = [u"age", u"name", u"email"]
+    loader = RowLoader(Person, header)
+    form = loader.set(row)
+    expected = Person(dict(zip(header, row)))
+    assert form.value == expected.value
+    assert form.raw_value == expected.raw_value
+    assert form.validate() == expected.validate()
+
+
+def test_row_loader_reuses_form():
+    loader = RowLoader(Person, [u"age", u"name"])
+    form = loader.form
+    assert loader.load([u"foo", u"Bob"])[1]
+    assert loader.set([u"1", u"Bob"]) is form
+    assert form.value == {u"name": u"Bob", u"age": 1, u"email": Unspecified}
+    assert form.age.errors == []
+    assert loader.load([u"1", u"Bob"])[1] == [
+        ((u"email", ), [u"Not a valid value."])
+    ]
+
+
+def test_row_loader_unknown_columns():
+    with pytest.raises(KeyError):
+        RowLoader(Person, [u"name", u"age", u"phone"])
+
+    loader = RowLoader(
+        Person.using(schema_missing='ignore'), [u"name", u"phone"]
+    )
+    assert loader.set([u"Alice", u"123"]).value[u"name"] == u"Alice"
+
+    loader = RowLoader(
+        Person.using(schema_missing='collect'), [u"name", u"phone"]
+    )
+    assert loader.set([u"Alice", u"123"]).unknown_items == {u"phone": u"123"}
+
+    loader = RowLoader(
+        Person.using(schema_missing='error'), [u"name", u"phone"]
+    )
+    assert loader.load([u"Alice", u"123"])[1]
+
+
+def test_validate_rows_dependent_validators():
+    class Pair(Form):
+        a = Integer
+        b = Integer
+        validators = [AttributesEqual((u"A", "a"), (u"B", "b"))]
+
+    results = list(validate_rows(Pair, io.StringIO(u"a,b\n1,2\n1,2\n")))
+    assert [errors for _, _, errors in results] == [
+        [((), [u"A and B must be equal."])],
+        [((), [u"A and B must be equal."])]
+    ]
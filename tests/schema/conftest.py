@@ -6,6 +6,7 @@
     :copyright: 2013 by Daniel Neuhäuser
     :license: BSD, see LICENSE.rst for details
 """
+from relief import Unspecified
 from relief.validation import Present, Converted
 
 
@@ -26,6 +27,15 @@ class BaseElementTest(object):
         element.set_from_raw(possible_value)
         assert element.is_valid is None
 
+    def test_reset(self, element_cls, possible_value):
+        element = element_cls()
+        element.set_from_raw(possible_value)
+        element.validate()
+        element.reset()
+        assert element.is_valid is None
+        assert element.raw_value == element_cls().raw_value
+        assert element.value == element_cls().value
+
     def test_with_properties(self, element_cls):
         a = element_cls.with_properties(foo=1)
         assert a.properties == {'foo': 1}
@@ -76,6 +86,13 @@ class ValidatedByTestMixin(object):
         assert not element.validate()
         assert element.errors == [u"May not be blank."]
 
+    def test_reset_clears_errors(self, element_cls, possible_value):
+        element = element_cls.validated_by([Present()])()
+        assert not element.validate()
+        assert element.errors
+        element.reset()
+        assert element.errors == []
+
 
 class DefaultTestMixin(object):
     def test_default(self, element_cls, possible_value):
@@ -83,6 +100,13 @@ class DefaultTestMixin(object):
         assert element.raw_value == possible_value
         assert element.value == possible_value
 
+    def test_reset_default(self, element_cls, possible_value):
+        element = element_cls.using(default=possible_value)()
+        element.set_from_raw(Unspecified)
+        element.reset()
+        assert element.raw_value == possible_value
+        assert element.value == possible_value
+
     def test_default_factory(self, element_cls, possible_value):
         element = element_cls.using(default_factory=lambda e: possible_value)()
         assert element.raw_value == possible_value
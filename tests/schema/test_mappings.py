@@ -6,13 +6,18 @@
     :copyright: 2013 by Daniel Neuhäuser
     :license: BSD, see LICENSE.rst for details
 """
+import linecache
+
 import pytest
 
 from relief import (
     Dict, OrderedDict, Unicode, Integer, NotUnserializable, Form, Element,
-    Unspecified, _compat
+    Unspecified, List, Maybe, ValidationContext, _compat
 )
 
+from relief.validation import AttributesEqual
+from relief.schema import codegen
+
 from tests.conftest import python2_only
 from tests.schema.conftest import ElementTest
 
@@ -27,6 +32,24 @@ class MappingTest(ElementTest):
         assert element.value.get(u"foo") == 1
         assert element.value.get(u"bar") is None
 
+    def test_get_by_value(self, element_cls):
+        element = element_cls({u"foo": u"1"})
+        assert element.get_by_value(u"foo").value == 1
+        assert element.get_by_value(u"bar") is None
+        assert element.get_by_value(u"bar", 2) == 2
+        assert element.get_by_value([]) is None
+        element.set_from_native({u"bar": 2})
+        assert element.get_by_value(u"foo") is None
+        assert element.get_by_value(u"bar").value == 2
+
+    def test_contains_value(self, element_cls):
+        element = element_cls({u"foo": 1})
+        assert element.contains_value(u"foo")
+        assert not element.contains_value(u"bar")
+        assert not element.contains_value([])
+        element.set_from_raw(Unspecified)
+        assert not element.contains_value(u"foo")
+
     def test_iter(self, element_cls):
         keys = list(element_cls({u"foo": 1}))
         assert len(keys) == 1
@@ -201,6 +224,20 @@ class TestDict(MutableMappingTest):
         ]
         assert element_cls(value).value == _compat.OrderedDict(value)
 
+    @pytest.mark.parametrize(("raw_value", "unserializable"), [
+        ({u"foo": 1}, False),
+        ({u"foo": 1, u"bar": 2}, True),
+        ([(u"foo", 1), (u"foo", 2)], False),
+        ([(u"foo", 1), (u"bar", 2)], True)
+    ])
+    def test_max_keys(self, element_cls, raw_value, unserializable):
+        element = element_cls.using(max_keys=1)(raw_value)
+        assert (element.value is NotUnserializable) == unserializable
+
+    def test_unserialize_dict_not_copied(self, element_cls):
+        raw_value = {u"foo": u"1"}
+        assert element_cls().unserialize(raw_value) is raw_value
+
 
 class TestOrderedDict(MutableMappingTest):
     @pytest.fixture
@@ -354,6 +391,58 @@ class TestForm(object):
         assert foo.raw_value == 1
         assert foo.value == {'spam': Unspecified}
 
+    def test_max_keys(self):
+        Foo = Form.of({"spam": Integer}).using(max_keys=1)
+        assert Foo({"spam": 1}).value == {"spam": 1}
+        foo = Foo({"spam": 1, "eggs": 2})
+        assert foo.value == {"spam": Unspecified}
+        assert not foo.validate()
+
+    def test_schema_missing_default(self):
+        Foo = Form.of({"spam": Integer})
+        with pytest.raises(KeyError):
+            Foo({"spam": 1, "eggs": 2})
+        with pytest.raises(KeyError):
+            Foo().set_from_native({"spam": 1, "eggs": 2})
+
+    def test_schema_missing_ignore(self):
+        Foo = Form.of({"spam": Integer, "eggs": Integer}).using(
+            schema_missing='ignore'
+        )
+        foo = Foo({"spam": 1, "bacon": 2})
+        assert foo.value == {"spam": 1, "eggs": Unspecified}
+        foo.set_from_native({"eggs": 1, "bacon": 2})
+        assert foo.value == {"spam": Unspecified, "eggs": 1}
+        assert foo.unknown_items == {}
+
+    def test_schema_missing_error(self):
+        Foo = Form.of({"spam": Integer}).using(schema_missing='error')
+        assert Foo({"spam": 1}).value == {"spam": 1}
+        foo = Foo({"spam": 1, "eggs": 2})
+        assert foo.value == {"spam": Unspecified}
+        assert not foo.validate()
+        with pytest.raises(KeyError):
+            Foo().set_from_native({"spam": 1, "eggs": 2})
+
+    def test_schema_missing_collect(self):
+        Foo = Form.of({"spam": Integer}).using(schema_missing='collect')
+        foo = Foo({"spam": 1, "eggs": 2})
+        assert foo.value == {"spam": 1}
+        assert foo.unknown_items == {"eggs": 2}
+        assert Foo().unknown_items == {}
+        foo.set_from_native({"bacon": 3})
+        assert foo.value == {"spam": Unspecified}
+        assert foo.unknown_items == {"bacon": 3}
+        foo.set_from_raw(Unspecified)
+        assert foo.unknown_items == {}
+
+    def test_fields_follow_member_schema(self):
+        Foo = Form.of({"spam": Integer}).using(schema_missing='error')
+        assert Foo({"spam": 1}).validate()
+        Bar = Foo.of({"eggs": Integer})
+        assert Bar({"eggs": 1}).validate()
+        assert not Bar({"spam": 1}).validate()
+
     def test_set_strict(self):
         value = {"spam": 1}
         form = Form.of({"spam": Integer}).using(strict=True)(value)
@@ -423,3 +512,257 @@ class TestForm(object):
         form = Foo()
         assert form.value == {'spam': u'eggs'}
         assert form.spam.value == u'eggs'
+
+    def test_reset(self):
+        class Foo(Form):
+            spam = Unicode.using(default=u'eggs')
+            eggs = Integer
+
+        form = Foo({'spam': u'foo', 'eggs': u'bar'})
+        assert not form.validate()
+        form.reset()
+        assert form.is_valid is None
+        assert form.value == {'spam': u'eggs', 'eggs': Unspecified}
+        assert form.eggs.errors == []
+        assert form.eggs.is_valid is None
+
+    def test_reset_sets_members_once(self):
+        calls = []
+
+        class Counted(Integer):
+            def set_from_raw(self, raw_value):
+                calls.append(raw_value)
+                super(Counted, self).set_from_raw(raw_value)
+
+        Foo = Form.of({'spam': Counted}).using(default={'spam': 1})
+        form = Form.of({'spam': Counted})({'spam': u'1'})
+        del calls[:]
+        form.reset()
+        assert calls == [Unspecified]
+        assert form.raw_value is Unspecified
+        assert form.value == {'spam': Unspecified}
+
+        form = Foo({'spam': u'2'})
+        form.reset()
+        assert form.value == {'spam': 1}
+        assert form.raw_value == Foo().raw_value
+
+    def test_validate_methods_bound_to_instance(self):
+        class Foo(Form):
+            password = Unicode
+            confirmation = Unicode
+
+            def validate_confirmation(self, element, context):
+                return element.value == self.password.value
+
+        assert Foo({'password': u'a', 'confirmation': u'a'}).validate()
+        assert not Foo({'password': u'a', 'confirmation': u'b'}).validate()
+        assert Foo({'password': u'b', 'confirmation': u'b'}).validate()
+        assert len(Foo.member_schema['confirmation'].validators) == 0
+
+    def test_instances_are_independent(self):
+        class Foo(Form):
+            spam = Integer
+            eggs = Form.of({'bar': Integer})
+
+        a = Foo()
+        b = Foo({'spam': 1, 'eggs': {'bar': 2}})
+        assert a.value == {'spam': Unspecified, 'eggs': {'bar': Unspecified}}
+        assert b.value == {'spam': 1, 'eggs': {'bar': 2}}
+        assert a.spam is not b.spam
+        assert a.eggs.bar is not b.eggs.bar
+        b.validate()
+        assert a.is_valid is None
+        assert a.spam.errors == []
+
+    def test_member_default_factory_is_reevaluated(self):
+        class Foo(Form):
+            spam = List.of(Integer).using(default_factory=lambda e: [1])
+            eggs = Integer.using(default_factory=lambda e: object())
+
+        a = Foo()
+        b = Foo()
+        assert a.value['spam'] == b.value['spam'] == [1]
+        assert a.spam[0] is not b.spam[0]
+        assert a.eggs.value is not b.eggs.value
+
+    def test_maybe_member(self):
+        Foo = Form.of({'spam': Maybe.of(Integer), 'eggs': Integer})
+
+        foo = Foo({'spam': 1, 'eggs': 2})
+        assert foo.value == {'spam': 1, 'eggs': 2}
+        assert foo.validate()
+
+        foo = Foo()
+        assert foo.value == {'spam': None, 'eggs': Unspecified}
+        assert foo['spam'].raw_value is Unspecified
+
+    def test_dependent_validators(self):
+        calls = []
+
+        class Equal(AttributesEqual):
+            def validate(self, element, context):
+                calls.append(element.value)
+                return super(Equal, self).validate(element, context)
+
+        Foo = Form.of([('spam', Integer), ('eggs', Integer)]).validated_by([
+            Equal((u'Spam', 'spam'), (u'Eggs', 'eggs'))
+        ])
+        form = Foo({'spam': 1, 'eggs': 2})
+        assert not form.validate()
+        assert form.errors == [u'Spam and Eggs must be equal.']
+        assert len(calls) == 1
+
+        # unchanged inputs reuse the previous result and don't add errors
+        form.set_from_raw({'spam': 1, 'eggs': 2})
+        assert not form.validate()
+        assert form.errors == [u'Spam and Eggs must be equal.']
+        assert len(calls) == 1
+
+        # cleared errors are noted again, if the previous result is reused
+        del form.errors[:]
+        assert not form.validate()
+        assert form.errors == [u'Spam and Eggs must be equal.']
+        assert len(calls) == 1
+
+        form.set_from_raw({'spam': 2, 'eggs': 2})
+        assert form.validate()
+        assert len(calls) == 2
+
+        # invalid inputs skip the validator
+        form.set_from_raw({'spam': 'foo', 'eggs': 2})
+        assert not form.validate()
+        assert len(calls) == 2
+
+    @pytest.mark.parametrize("context", [
+        {"fail_fast": True}, {"error_budget": 1}
+    ])
+    def test_dependent_validators_limited(self, context):
+        Pair = Form.of([('spam', Integer), ('eggs', Integer)]).validated_by([
+            AttributesEqual((u'Spam', 'spam'), (u'Eggs', 'eggs'))
+        ])
+        Foo = Form.of([('pair', Pair), ('bacon', Integer)])
+        foo = Foo({'pair': {'spam': 1, 'eggs': 2}, 'bacon': 1})
+        for _ in range(2):
+            # the second time the result of the validator is reused
+            validation_context = ValidationContext(context)
+            assert not foo.validate(validation_context)
+            assert validation_context.stopped
+            assert validation_context.errors_noted == 1
+            assert foo['bacon'].is_valid is None
+
+    def test_validators_without_dependencies(self):
+        calls = []
+
+        def validator(element, context):
+            calls.append(element.value)
+            return True
+
+        form = Form.of({'spam': Integer}).validated_by([validator])({'spam': 1})
+        assert form.validate()
+        assert form.validate()
+        assert len(calls) == 2
+
+    def test_generated_source(self):
+        class Foo(Form):
+            spam = Integer
+            eggs = List.of(Integer)
+
+        assert codegen.get_source(Foo) is None
+        Foo()
+        source = codegen.get_source(Foo)
+        assert "clone.spam = m0" in source
+        assert "elements['eggs'].value" in source
+        for name in codegen.generated_methods:
+            assert Foo.__dict__[name] is not Form.__dict__.get(name)
+
+    def test_generated_source_in_linecache(self):
+        Foo = Form.of({"spam": Integer})
+        Bar = Form.of({"eggs": Integer})
+        Foo()
+        Bar()
+        filenames = set()
+        for form_cls in [Foo, Bar]:
+            filename = form_cls.__dict__["validate"].__code__.co_filename
+            filenames.add(filename)
+            assert u"".join(linecache.getlines(filename)) == (
+                codegen.get_source(form_cls)
+            )
+        assert len(filenames) == 2
+
+    @pytest.mark.parametrize("generate_code", [True, False])
+    def test_generated_equivalent(self, generate_code):
+        Foo = Form.of([
+            ("spam", Integer), ("class", List.of(Integer)), ("with space", Integer)
+        ]).using(generate_code=generate_code)
+
+        foo = Foo({"spam": u"1", "class": [u"2"]})
+        assert (codegen.get_source(Foo) is None) != generate_code
+        assert foo.value == _compat.OrderedDict([
+            ("spam", 1), ("class", [2]), ("with space", Unspecified)
+        ])
+        assert getattr(foo, "class") is foo["class"]
+        assert getattr(foo, "with space") is foo["with space"]
+        assert not foo.validate()
+        assert foo.is_valid is False
+        assert foo["spam"].is_valid
+        foo.set_from_native({"spam": 1, "class": [2], "with space": 3})
+        assert foo.validate()
+        with pytest.raises(KeyError):
+            foo.set_from_native({"spam": 1, "bacon": 2})
+        Foo().set_from_native(Unspecified)
+
+    def test_generated_respects_overrides(self):
+        class Foo(Form):
+            spam = Integer
+
+            def validate(self, context=None):
+                return "overridden"
+
+        foo = Foo({"spam": 1})
+        assert foo.validate() == "overridden"
+        assert "def validate" not in codegen.get_source(Foo)
+
+        class Bar(Foo):
+            pass
+
+        bar = Bar({"spam": 1})
+        assert bar.validate() == "overridden"
+        assert bar.value == {"spam": 1}
+
+    def test_replaced_member_schema(self):
+        class Foo(Form):
+            spam = Integer
+
+        Foo()
+        Foo.member_schema = _compat.OrderedDict([("eggs", Integer)])
+        foo = Foo({"eggs": 1})
+        assert foo.value == {"eggs": 1}
+        assert foo.validate()
+        assert codegen.get_source(Foo) is None
+
+    def test_changed_member_schema(self):
+        class Foo(Form):
+            spam = Integer
+
+        old = Foo()
+        Foo.member_schema["eggs"] = Integer
+        foo = Foo({"spam": 1, "eggs": 2})
+        assert foo.value == {"spam": 1, "eggs": 2}
+        assert foo.validate()
+        assert codegen.get_source(Foo) is None
+        with pytest.raises(KeyError):
+            old.set_from_raw({"spam": 1, "eggs": 2})
+
+    def test_generated_falls_back_to_generic(self):
+        class Mapping(dict):
+            # disagrees with the items, like a stale generated method would
+            def get(self, key, default=None):
+                return default
+
+        Foo = Form.of({"spam": Integer})
+        foo = Foo()
+        foo.set_from_raw(Mapping(spam=1))
+        assert foo.value == {"spam": 1}
+        foo.set_from_native(Mapping(spam=2))
+        assert foo.value == {"spam": 2}
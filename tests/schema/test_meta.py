@@ -8,7 +8,11 @@
 """
 import pytest
 
-from relief import Maybe, Unicode, Unspecified
+from relief import (
+    Maybe, OneOf, Form, List, Dict, Unicode, Integer, Unspecified,
+    NotUnserializable
+)
+from relief.schema import traversal
 
 from tests.schema.conftest import BaseElementTest
 
@@ -45,6 +49,21 @@ class TestMaybe(BaseElementTest):
         assert element.value is None
         assert element.raw_value is None
 
+    def test_set_from_native_raw_value_lazy(self):
+        serialized = []
+
+        class Integers(List.of(Integer)):
+            def serialize(self, value):
+                serialized.append(value)
+                return value
+
+        element = Maybe.of(Integers)()
+        element.set_from_native([1, 2])
+        assert serialized == []
+        assert element.raw_value == [1, 2]
+        assert element.raw_value == [1, 2]
+        assert serialized == [[1, 2]]
+
     def test_validate(self, element_cls):
         element = element_cls()
         element.set_from_raw(u'foo')
@@ -77,3 +96,153 @@ class TestMaybe(BaseElementTest):
         assert not element.validate()
         assert element.value == u'bar'
         assert element.raw_value == u'bar'
+
+
+class Click(Form):
+    type = Unicode
+    x = Integer
+
+
+class KeyPress(Form):
+    type = Unicode
+    key = Unicode
+
+
+class TestOneOf(object):
+    @pytest.fixture
+    def element_cls(self):
+        return OneOf.by('type', {
+            u'click': Click,
+            u'key': 'tests.schema.test_meta:KeyPress',
+            u'scroll': 'tests.schema.does_not_exist:Scroll'
+        })
+
+    def test_requires_branches(self):
+        with pytest.raises(TypeError):
+            OneOf()
+
+    def test_set_from_raw(self, element_cls):
+        element = element_cls({u'type': u'click', u'x': u'1'})
+        assert isinstance(element.member, Click)
+        assert element.raw_value == {u'type': u'click', u'x': u'1'}
+        assert element.value == {u'type': u'click', u'x': 1}
+
+        element.set_from_raw({u'type': u'key', u'key': u'a'})
+        assert isinstance(element.member, KeyPress)
+        assert element.value == {u'type': u'key', u'key': u'a'}
+
+    def test_set_from_raw_unspecified(self, element_cls):
+        element = element_cls()
+        assert element.member is None
+        assert element.value is Unspecified
+        assert not element.validate()
+
+    @pytest.mark.parametrize('raw_value', [
+        {u'type': u'drag'},
+        {u'x': u'1'},
+        {u'type': [u'click']},
+        u'click'
+    ])
+    def test_set_from_raw_unknown_branch(self, element_cls, raw_value):
+        element = element_cls(raw_value)
+        assert element.member is None
+        assert element.value is NotUnserializable
+        assert not element.validate()
+        assert element.errors == [u'Not a valid value.']
+
+    def test_branches_are_resolved_lazily(self, element_cls):
+        element = element_cls({u'type': u'click', u'x': u'1'})
+        assert element.validate()
+        assert element_cls.get_branch(u'key') is KeyPress
+        with pytest.raises(ImportError):
+            element_cls.get_branch(u'scroll')
+
+    def test_unknown_branches_are_not_cached(self, element_cls):
+        element_cls = element_cls.using()
+        for index in range(10):
+            element_cls({u'type': u'bogus%d' % index})
+        assert element_cls.get_branch(u'bogus0') is None
+        assert element_cls.__dict__.get('_resolved_branches', {}) == {}
+
+    def test_reuses_member(self, element_cls):
+        element = element_cls({u'type': u'click', u'x': u'1'})
+        member = element.member
+        element.set_from_raw({u'type': u'click', u'x': u'2'})
+        assert element.member is member
+        assert element.value == {u'type': u'click', u'x': 2}
+
+    def test_set_from_native(self, element_cls):
+        element = element_cls()
+        element.set_from_native({u'type': u'click', u'x': 1})
+        assert isinstance(element.member, Click)
+        assert element.value == {u'type': u'click', u'x': 1}
+        assert element.raw_value == {u'type': u'click', u'x': 1}
+
+    def test_validate(self, element_cls):
+        element = element_cls({u'type': u'click', u'x': u'1'})
+        assert element.validate()
+        assert element.is_valid
+
+        element = element_cls({u'type': u'click', u'x': u'foo'})
+        assert not element.validate()
+        assert not element.is_valid
+        assert element.member['x'].errors
+
+    def test_traversal(self, element_cls):
+        element = List.of(element_cls)()
+        traversal.set_from_raw(element, [
+            {u'type': u'click', u'x': u'1'},
+            {u'type': u'key', u'key': u'a'}
+        ])
+        assert traversal.validate(element)
+        assert traversal.get_value(element) == [
+            {u'type': u'click', u'x': 1},
+            {u'type': u'key', u'key': u'a'}
+        ]
+
+    def test_form_member(self, element_cls):
+        class Foo(Form):
+            event = element_cls
+            spam = Integer
+
+        assert list(Foo.member_schema) == ['event', 'spam']
+        a = Foo()
+        assert a.value == {'event': Unspecified, 'spam': Unspecified}
+        b = Foo({'event': {u'type': u'click', u'x': u'1'}, 'spam': u'2'})
+        assert b.value == {'event': {u'type': u'click', u'x': 1}, 'spam': 2}
+        assert b.validate()
+        assert a.event.member is None
+
+        foo = Form.of({'event': element_cls})({'event': {u'type': u'drag'}})
+        assert foo.value == {'event': NotUnserializable}
+        assert not foo.validate()
+
+    def test_list_member(self, element_cls):
+        element = List.of(element_cls)([
+            {u'type': u'click', u'x': u'1'}, {u'type': u'drag'}
+        ])
+        assert element.value is NotUnserializable
+        assert element[0].value == {u'type': u'click', u'x': 1}
+        assert element[1].value is NotUnserializable
+        assert not element.validate()
+        assert element[0].is_valid
+
+    def test_dict_member(self, element_cls):
+        element = Dict.of(Unicode, element_cls)({
+            u'a': {u'type': u'click', u'x': u'1'},
+            u'b': {u'type': u'key', u'key': u'b'}
+        })
+        assert element.value == {
+            u'a': {u'type': u'click', u'x': 1},
+            u'b': {u'type': u'key', u'key': u'b'}
+        }
+        assert element.validate()
+        assert isinstance(element.get_by_value(u'b').member, KeyPress)
+
+    def test_reset(self, element_cls):
+        element = element_cls({u'type': u'click', u'x': u'foo'})
+        element.validate()
+        element.reset()
+        assert element.member is None
+        assert element.value is Unspecified
+        assert element.errors == []
@@ -7,12 +7,15 @@
     :license: BSD, see LICENSE.rst for details
 """
 import sys
+import uuid
+import decimal
+import datetime
 
 import pytest
 
 from relief import (
-    Boolean, Integer, Float, Complex, Unicode, Bytes, Unspecified, 
-    NotUnserializable
+    Boolean, Integer, Float, Complex, Unicode, Bytes, Enum, Literal, DateTime,
+    Date, Decimal, UUID, List, Unspecified, NotUnserializable
 )
 
 from tests.schema.conftest import ElementTest
@@ -244,6 +247,17 @@ class TestUnicode(ScalarTest):
         assert unicode.raw_value == 1
         assert unicode.value == u"1"
 
+    @pytest.mark.parametrize(("raw_value", "value"), [
+        (u"foo", u"foo"),
+        (b"foo", u"foo"),
+        (u"foobar", NotUnserializable),
+        (b"foobar" * 10, NotUnserializable),
+        (1234, NotUnserializable)
+    ])
+    def test_max_length(self, raw_value, value):
+        element = Unicode.using(max_length=3)(raw_value)
+        assert element.value == value
+
 
 class TestBytes(ScalarTest):
     @pytest.fixture
@@ -283,3 +297,285 @@ class TestBytes(ScalarTest):
             bytes = Bytes(1)
             assert bytes.raw_value == 1
             assert bytes.value == b"1"
+
+    @pytest.mark.parametrize(("raw_value", "value"), [
+        (b"foo", b"foo"),
+        (u"foo", b"foo"),
+        (b"foobar", NotUnserializable),
+        (u"foobar", NotUnserializable)
+    ])
+    def test_max_length(self, raw_value, value):
+        element = Bytes.using(max_length=3)(raw_value)
+        assert element.value == value
+
+    @pytest.mark.parametrize("raw_value", [4, 10 ** 15, 10 ** 30])
+    def test_max_length_integer(self, raw_value):
+        element = Bytes.using(max_length=3)(raw_value)
+        assert element.value is NotUnserializable
+
+    if sys.version_info >= (3, 0):
+        def test_value_negative_integer(self):
+            assert Bytes(-1).value is NotUnserializable
+
+
+try:
+    import enum
+except ImportError: # < 3.4 without enum34
+    enum = None
+else:
+    class Color(enum.Enum):
+        red = 1
+        green = u"g"
+        blue = 3
+
+
+@pytest.mark.skipif(enum is None, reason="requires enum")
+class TestEnum(ScalarTest):
+    @pytest.fixture
+    def element_cls(self):
+        return Enum.of(Color)
+
+    @pytest.fixture
+    def possible_value(self):
+        return Color.red
+
+    @pytest.fixture
+    def possible_raw_value(self):
+        return u"1"
+
+    @pytest.fixture
+    def invalid_value(self):
+        return u"purple"
+
+    def test_requires_of(self):
+        with pytest.raises(TypeError):
+            Enum()
+
+    @pytest.mark.parametrize(("raw_value", "value"), [
+        (1, "red"),
+        (u"1", "red"),
+        (b"1", "red"),
+        (u"g", "green"),
+        (b"g", "green"),
+        (u"blue", "blue"),
+        (b"blue", "blue"),
+        (2, None),
+        ([1], None),
+        (True, None),
+        (1.0, None)
+    ])
+    def test_value_raw(self, element_cls, raw_value, value):
+        element = element_cls(raw_value)
+        if value is None:
+            assert element.value is NotUnserializable
+        else:
+            assert element.value is Color[value]
+
+
+class TestLiteral(ElementTest):
+    @pytest.fixture
+    def element_cls(self):
+        return Literal.of(u"asc", u"desc", 10)
+
+    @pytest.fixture
+    def possible_value(self):
+        return u"asc"
+
+    def test_requires_of(self):
+        with pytest.raises(TypeError):
+            Literal()
+
+    @pytest.mark.parametrize(("raw_value", "value"), [
+        (u"asc", u"asc"),
+        (b"desc", u"desc"),
+        (10, 10),
+        (u"10", 10),
+        (b"10", 10),
+        (u"foo", NotUnserializable),
+        ({}, NotUnserializable),
+        (True, NotUnserializable),
+        (10.0, NotUnserializable)
+    ])
+    def test_value_raw(self, element_cls, raw_value, value):
+        element = element_cls(raw_value)
+        assert element.value == value
+        assert type(element.value) is type(value)
+
+    @pytest.mark.parametrize(("raw_value", "value"), [
+        (True, True),
+        (1, 1),
+        (1.0, 1.0),
+        (False, NotUnserializable),
+        (0, NotUnserializable)
+    ])
+    def test_value_raw_exact_type(self, raw_value, value):
+        element = Literal.of(1, True, 1.0)(raw_value)
+        assert element.value == value
+        assert type(element.value) is type(value)
+
+
+class TestDateTime(ScalarTest):
+    @pytest.fixture
+    def element_cls(self):
+        return DateTime
+
+    @pytest.fixture
+    def possible_value(self):
+        return datetime.datetime(2013, 8, 12, 13, 37, 0, 500000)
+
+    @pytest.fixture
+    def possible_raw_value(self):
+        return u"2013-08-12T13:37:00.5"
+
+    @pytest.fixture
+    def invalid_value(self):
+        return u"2013-08-32"
+
+    @pytest.mark.parametrize(("raw_value", "value"), [
+        (u"2013-08-12T13:37:00.5", datetime.datetime(2013, 8, 12, 13, 37, 0, 500000)),
+        (b"2013-08-12 13:37", datetime.datetime(2013, 8, 12, 13, 37)),
+        (u"2013-08-12", datetime.datetime(2013, 8, 12)),
+        (u"", Unspecified),
+        (u"foo", NotUnserializable),
+        (1, NotUnserializable)
+    ])
+    def test_value_raw(self, raw_value, value):
+        assert DateTime(raw_value).value == value
+
+    @pytest.mark.skipif(
+        sys.version_info < (3, 7), reason="requires datetime.fromisoformat"
+    )
+    def test_value_utc(self):
+        element = DateTime(u"2013-08-12T13:37:00Z")
+        assert element.value == datetime.datetime(
+            2013, 8, 12, 13, 37, tzinfo=datetime.timezone.utc
+        )
+
+    def test_parse_cache(self):
+        element_cls = DateTime.using(parse_cache_size=2)
+        first = element_cls(u"2013-08-12T13:37:00")
+        second = element_cls(u"2013-08-12T13:37:00")
+        assert first.value is second.value
+        assert element_cls._get_parse_cache().statistics() == {
+            'hits': 1,
+            'misses': 1,
+            'size': 1,
+            'maxsize': 2
+        }
+        assert '_parse_cache' not in DateTime.__dict__
+
+    def test_from_raw_many(self):
+        calls = []
+
+        class CountingDateTime(DateTime):
+            def parse(self, string):
+                calls.append(string)
+                return super(CountingDateTime, self).parse(string)
+
+        raw_value = [u"2013-08-12", u"2013-08-13", u"2013-08-12", u"foo"]
+        element = List.of(CountingDateTime)(raw_value)
+        assert calls == [u"2013-08-12", u"2013-08-13", u"foo"]
+        assert element.raw_value == raw_value
+        assert [member.raw_value for member in element] == raw_value
+        assert [member.value for member in element] == [
+            datetime.datetime(2013, 8, 12),
+            datetime.datetime(2013, 8, 13),
+            datetime.datetime(2013, 8, 12),
+            NotUnserializable
+        ]
+        assert element[0].value is element[2].value
+        assert not element.validate()
+
+
+class TestDate(ScalarTest):
+    @pytest.fixture
+    def element_cls(self):
+        return Date
+
+    @pytest.fixture
+    def possible_value(self):
+        return datetime.date(2013, 8, 12)
+
+    @pytest.fixture
+    def possible_raw_value(self):
+        return u"2013-08-12"
+
+    @pytest.fixture
+    def invalid_value(self):
+        return u"2013-08-12T13:37:00"
+
+    @pytest.mark.parametrize(("raw_value", "value"), [
+        (u"2013-08-12", datetime.date(2013, 8, 12)),
+        (b"2013-08-12", datetime.date(2013, 8, 12)),
+        (datetime.datetime(2013, 8, 12), NotUnserializable),
+        (u"foo", NotUnserializable)
+    ])
+    def test_value_raw(self, raw_value, value):
+        assert Date(raw_value).value == value
+
+
+class TestDecimal(ScalarTest):
+    @pytest.fixture
+    def element_cls(self):
+        return Decimal
+
+    @pytest.fixture
+    def possible_value(self):
+        return decimal.Decimal(u"1.1")
+
+    @pytest.fixture
+    def possible_raw_value(self):
+        return u"1.1"
+
+    @pytest.fixture
+    def invalid_value(self):
+        return u"asd"
+
+    @pytest.mark.parametrize(("raw_value", "value"), [
+        (u"1.1", decimal.Decimal(u"1.1")),
+        (b"1.1", decimal.Decimal(u"1.1")),
+        (1, decimal.Decimal(1)),
+        (0.1, decimal.Decimal(u"0.1")),
+        (u"NaN", NotUnserializable),
+        (u"Infinity", NotUnserializable),
+        (True, NotUnserializable),
+        (u"foo", NotUnserializable)
+    ])
+    def test_value_raw(self, raw_value, value):
+        assert Decimal(raw_value).value == value
+
+    def test_strict_number(self):
+        assert Decimal.using(strict=True)(1).value is NotUnserializable
+
+
+class TestUUID(ScalarTest):
+    @pytest.fixture
+    def element_cls(self):
+        return UUID
+
+    @pytest.fixture
+    def possible_value(self):
+        return uuid.UUID(u"12345678-1234-5678-1234-567812345678")
+
+    @pytest.fixture
+    def possible_raw_value(self):
+        return u"12345678-1234-5678-1234-567812345678"
+
+    @pytest.fixture
+    def invalid_value(self):
+        return u"12345678"
+
+    @pytest.mark.parametrize(("raw_value", "value"), [
+        (
+            u"12345678-1234-5678-1234-567812345678",
+            uuid.UUID(u"12345678-1234-5678-1234-567812345678")
+        ),
+        (
+            b"12345678123456781234567812345678",
+            uuid.UUID(u"12345678-1234-5678-1234-567812345678")
+        ),
+        (u"foo", NotUnserializable),
+        (1, NotUnserializable)
+    ])
+    def test_value_raw(self, raw_value, value):
+        assert UUID(raw_value).value == value
@@ -53,6 +53,27 @@ class SequenceTest(ElementTest):
             assert element.count(value) == count
         assert element.count(3) == 0
 
+    def test_index_start_stop(self, element_cls, possible_value):
+        element = element_cls(possible_value)
+        assert element.index(possible_value[-1], -1) == len(possible_value) - 1
+        with pytest.raises(ValueError):
+            element.index(possible_value[0], 1, 1)
+
+    @pytest.mark.parametrize('method', ['test_contains', 'test_index',
+                                        'test_count', 'test_index_start_stop'])
+    def test_indexed(self, element_cls, possible_value, method):
+        getattr(self, method)(element_cls.using(indexed=True), possible_value)
+
+    def test_indexed_is_invalidated(self, element_cls, possible_value):
+        element = element_cls.using(indexed=True)(possible_value)
+        assert possible_value[0] in element
+        element.set_from_native(Unspecified)
+        assert possible_value[0] not in element
+        element.set_from_raw(possible_value)
+        assert element.count(possible_value[0]) == list(possible_value).count(
+            possible_value[0]
+        )
+
     def test_validate_empty(self, element_cls):
         element = element_cls()
         assert not element.validate()
@@ -125,6 +146,12 @@ class TestTuple(SequenceTest):
         assert element.raw_value == [1, 2, 3]
         assert element.value is NotUnserializable
 
+    def test_set_too_long_iterator(self, element_cls):
+        raw_value = iter(range(10))
+        element = element_cls(raw_value)
+        assert element.value is NotUnserializable
+        assert next(raw_value) == 4
+
     def test_validate_without_members(self):
         element = Tuple.of()()
         assert element.value is Unspecified
@@ -169,6 +196,65 @@ class TestList(SequenceTest):
         assert element.raw_value == (1, 2, 3)
         assert element.value is NotUnserializable
 
+    @pytest.mark.parametrize(("raw_value", "value"), [
+        ([1, 2], [1, 2]),
+        ([1, 2, 3], NotUnserializable)
+    ])
+    def test_max_items(self, raw_value, value):
+        element = List.of(Integer).using(max_items=2)(raw_value)
+        assert element.value == value
+
+    def test_set_from_native_raw_value_lazy(self):
+        serialized = []
+
+        class Nested(List.of(List.of(Integer))):
+            def serialize(self, value):
+                serialized.append(value)
+                return value
+
+        element = Nested()
+        element.set_from_native([[1], [2]])
+        assert serialized == []
+        assert element.raw_value == [[1], [2]]
+        assert element.raw_value == [[1], [2]]
+        assert serialized == [[[1], [2]]]
+        element.set_from_raw([[3]])
+        assert element.raw_value == [[3]]
+        assert len(serialized) == 1
+
+    def test_unserialize_list_not_copied(self, element_cls):
+        raw_value = [u"1", u"2"]
+        assert element_cls().unserialize(raw_value) is raw_value
+
+    def test_max_items_iterator(self):
+        raw_value = iter(range(10))
+        element = List.of(Integer).using(max_items=2)(raw_value)
+        assert element.value is NotUnserializable
+        assert next(raw_value) == 3
+
+    @pytest.mark.parametrize(("raw_value", "unserializable"), [
+        ([[1], [2]], False),
+        ([[1], [2, 3]], True)
+    ])
+    def test_max_total_elements(self, raw_value, unserializable):
+        element = List.of(List.of(Integer)).using(max_total_elements=4)(
+            raw_value
+        )
+        assert (element.value is NotUnserializable) == unserializable
+        if unserializable:
+            assert len(element) == 0
+            assert element.validate() is False
+
+    @pytest.mark.parametrize(("raw_value", "unserializable"), [
+        ([[[]]], False),
+        ([[[[1]]]], True),
+        ([[[], [[1]]]], True)
+    ])
+    def test_max_depth(self, raw_value, unserializable):
+        Nested = List.of(List.of(List.of(List.of(Integer))))
+        element = Nested.using(max_depth=3)(raw_value)
+        assert (element.value is NotUnserializable) == unserializable
+
     def test_setitem(self):
         element = List.of(Integer)()
         with pytest.raises(TypeError):
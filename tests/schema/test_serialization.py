@@ -0,0 +1,144 @@
+# coding: utf-8
+"""
+    tests.schema.test_serialization
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :copyright: 2013 by Daniel Neuhäuser
+    :license: BSD, see LICENSE.rst for details
+"""
+import io
+import json
+
+import pytest
+
+from relief import (
+    Integer, Float, Unicode, Bytes, Boolean, DateTime, Decimal, UUID, Tuple,
+    List, Dict, Form, Maybe, OneOf, Literal, Unspecified, NotUnserializable
+)
+from relief.schema import serialization, traversal
+
+
+class Something(Form):
+    foo = Integer
+    bar = List.of(Tuple.of(Unicode, Maybe.of(Integer)))
+    baz = Dict.of(Unicode, List.of(Float))
+
+
+class Click(Form):
+    kind = Unicode
+    x = Integer
+
+
+@pytest.mark.parametrize(("schema", "raw_value"), [
+    (Integer, 1),
+    (Unicode, u"Hello, ☃!\n"),
+    (Boolean, True),
+    (List.of(Integer), []),
+    (List.of(List.of(Integer)), [[1, 2], [], [3]]),
+    (Dict.of(Integer, Unicode), {1: u"one", 2: u"two"}),
+    (Something, {
+        u"foo": 1,
+        u"bar": [(u"spam", 2), (u"eggs", Unspecified)],
+        u"baz": {u"spam": [1.5]}
+    }),
+    (List.of(Maybe.of(List.of(Boolean))), [[True], Unspecified]),
+    (OneOf.by(u"kind", {u"click": Click}), {u"kind": u"click", u"x": 1})
+])
+def test_equivalent_to_json_dumps(schema, raw_value):
+    element = schema(raw_value)
+    expected = json.dumps(element.value, separators=(",", ":"))
+    assert element.to_json_bytes() == expected.encode('ascii')
+    stream = io.BytesIO()
+    element.dump_json(stream)
+    assert stream.getvalue() == expected.encode('ascii')
+
+
+@pytest.mark.parametrize(("schema", "raw_value", "expected"), [
+    (
+        DateTime,
+        u"2013-08-12T13:37:00",
+        b'"2013-08-12T13:37:00"'
+    ),
+    (
+        UUID,
+        u"12345678-1234-5678-1234-567812345678",
+        b'"12345678-1234-5678-1234-567812345678"'
+    ),
+    (Decimal, u"1.10", b'1.10'),
+    (Bytes, b"foo", b'"foo"'),
+    (Literal.of(1, u"a"), u"1", b'1'),
+    (Dict.of(DateTime, Integer), {u"2013-08-12": 1}, b'{"2013-08-12T00:00:00":1}')
+])
+def test_encode_values(schema, raw_value, expected):
+    assert schema(raw_value).to_json_bytes() == expected
+
+
+def test_encode_default():
+    element = Literal.of(1j)(1j)
+    with pytest.raises(TypeError):
+        element.to_json_bytes()
+    assert element.to_json_bytes(default=repr) == b'"1j"'
+
+
+@pytest.mark.parametrize(("schema", "raw_value"), [
+    (Integer, u"foo"),
+    (Integer, None),
+    (List.of(Integer), [1, u"foo"]),
+    (List.of(Integer), None),
+    (Something, Unspecified),
+    (Float, float("nan"))
+])
+def test_no_value(schema, raw_value):
+    with pytest.raises(ValueError):
+        schema(raw_value).to_json_bytes()
+
+
+def test_chunks(monkeypatch):
+    monkeypatch.setattr(serialization, "chunk_size", 10)
+    element = List.of(Integer)(list(range(100)))
+    chunks = list(serialization.iter_json(element))
+    assert len(chunks) > 1
+    assert all(len(chunk) < 20 for chunk in chunks)
+    assert json.loads(b"".join(chunks).decode('ascii')) == list(range(100))
+
+
+def test_deeply_nested():
+    depth = 10000
+    schema, raw_value = Integer, 1
+    for _ in range(depth):
+        schema, raw_value = List.of(schema), [raw_value]
+    element = schema()
+    traversal.set_from_raw(element, raw_value)
+    assert element.to_json_bytes() == b"[" * depth + b"1" + b"]" * depth
+
+
+@pytest.mark.parametrize(("schema", "raw_value"), [
+    (Integer, 1),
+    (List.of(List.of(Integer)), [[1, 2], [], [3]]),
+    (Tuple.of(Unicode, Integer), [u"foo", 1]),
+    (Dict.of(Unicode, Integer), {u"foo": 1}),
+    (Something, {
+        u"foo": 1,
+        u"bar": [[u"spam", 2]],
+        u"baz": {u"spam": [1.5]}
+    }),
+    (Something, {u"foo": u"bar"}),
+    (List.of(Integer), {})
+])
+def test_from_json(schema, raw_value):
+    expected = schema(raw_value)
+    for data in [json.dumps(raw_value), json.dumps(raw_value).encode('utf-8')]:
+        element = schema.from_json(data)
+        assert element.raw_value == raw_value
+        assert element.value == expected.value
+        assert element.validate() == expected.validate()
+
+
+def test_from_json_invalid():
+    with pytest.raises(ValueError):
+        List.of(Integer).from_json(u"[1,")
+
+
+def test_from_json_max_depth():
+    schema = List.of(List.of(List.of(Integer))).using(max_depth=2)
+    assert schema.from_json(u"[[[1]]]").value is NotUnserializable
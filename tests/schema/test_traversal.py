@@ -0,0 +1,170 @@
+# coding: utf-8
+"""
+    tests.schema.test_traversal
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :copyright: 2013 by Daniel Neuhäuser
+    :license: BSD, see LICENSE.rst for details
+"""
+import pytest
+
+from relief import (
+    Integer, Unicode, Tuple, List, Dict, Form, Maybe, NotUnserializable,
+    Unspecified
+)
+from relief.validation import ShorterThan
+from relief.schema import traversal
+
+
+class Something(Form):
+    foo = Integer
+    bar = List.of(Tuple.of(Unicode, Maybe.of(Integer)))
+    baz = Dict.of(Unicode, List.of(Integer))
+
+
+@pytest.mark.parametrize(("schema", "raw_value"), [
+    (Integer, u"1"),
+    (List.of(List.of(Integer)), [[u"1", u"2"], [], [u"3"]]),
+    (List.of(List.of(Integer)), [[u"1", u"foo"]]),
+    (List.of(Integer), Unspecified),
+    (Tuple.of(Integer, List.of(Integer)), (u"1", [u"2"])),
+    (Maybe.of(List.of(Integer)), [u"1"]),
+    (Maybe.of(List.of(Integer)), Unspecified),
+    (Something, {
+        u"foo": u"1",
+        u"bar": [(u"spam", u"2"), (u"eggs", Unspecified)],
+        u"baz": {u"spam": [u"3"]}
+    }),
+    (Something, {u"foo": u"1", u"bar": [(u"spam", u"foo")]})
+])
+def test_equivalent_to_recursion(schema, raw_value):
+    recursive = schema()
+    recursive.set_from_raw(raw_value)
+    iterative = schema()
+    traversal.set_from_raw(iterative, raw_value)
+
+    assert traversal.get_value(iterative) == recursive.value
+    assert iterative.value == recursive.value
+    assert traversal.validate(iterative) == recursive.validate()
+    assert iterative.is_valid == recursive.is_valid
+    assert getattr(iterative, 'errors', None) == getattr(
+        recursive, 'errors', None
+    )
+
+
+def test_deeply_nested():
+    depth = 10000
+    schema, raw_value = Integer, u"1"
+    for _ in range(depth):
+        schema, raw_value = List.of(schema), [raw_value]
+    element = schema()
+
+    traversal.set_from_raw(element, raw_value)
+    assert traversal.validate(element)
+
+    value = traversal.get_value(element)
+    for _ in range(depth):
+        value, = value
+    assert value == 1
+
+
+def test_validate_memoizes_value():
+    accessed = []
+
+    class ListOfIntegers(List.of(Integer)):
+        def _value_from_members(self, values):
+            accessed.append(values)
+            return super(ListOfIntegers, self)._value_from_members(values)
+
+    element = ListOfIntegers.validated_by([
+        ShorterThan(3), ShorterThan(4)
+    ])([1, 2])
+    assert traversal.validate(element)
+    assert len(accessed) == 1
+    assert '_memoized_value' not in element.__dict__
+
+
+def test_validate_fail_fast():
+    element = List.of(List.of(Integer))([[u"foo", 1], [2]])
+    assert not traversal.validate(element, {'fail_fast': True})
+    assert element.is_valid is False
+    assert element[0].is_valid is False
+    assert element[0][1].is_valid is None
+    assert element[1].is_valid is None
+
+
+@pytest.mark.parametrize(("raw_value", "unserializable"), [
+    ([[[]]], False),
+    ([[[[1]]]], True)
+])
+def test_set_from_raw_max_depth(raw_value, unserializable):
+    schema = List.of(List.of(List.of(List.of(Integer)))).using(max_depth=3)
+    element = schema()
+    traversal.set_from_raw(element, raw_value)
+    assert (element.value is NotUnserializable) == unserializable
+
+
+@pytest.mark.parametrize(("schema", "raw_value"), [
+    (Integer, u"1"),
+    (List.of(List.of(Integer)), [[u"1", u"2"], [], [u"3"]]),
+    (List.of(List.of(Integer)), [[u"1", u"foo"]]),
+    (List.of(Integer), Unspecified),
+    (Tuple.of(Integer, List.of(Integer)), (u"1", [u"2"])),
+    (Maybe.of(List.of(Integer)), [u"1"]),
+    (Dict.of(Tuple.of(Integer, Integer), List.of(Integer)), {
+        (u"1", u"2"): [u"3"]
+    }),
+    (Something, {
+        u"foo": u"1",
+        u"bar": [(u"spam", u"2"), (u"eggs", Unspecified)],
+        u"baz": {u"spam": [u"3"]}
+    }),
+    (Something, {u"foo": u"1", u"bar": [(u"spam", u"foo")]}),
+    (List.of(List.of(Integer)).using(max_depth=1), [[u"1"]])
+])
+def test_load_equivalent_to_set_and_validate(schema, raw_value):
+    separate = schema()
+    separate.set_from_raw(raw_value)
+    separate.validate()
+    loaded = schema()
+
+    assert loaded.load(raw_value) == separate.is_valid
+    assert loaded.value == separate.value
+    assert loaded.raw_value == separate.raw_value
+    assert getattr(loaded, 'errors', None) == getattr(
+        separate, 'errors', None
+    )
+
+
+def test_load_fail_fast():
+    raw_value = [[u"foo", u"1"], [u"2"]]
+    element = List.of(List.of(Integer))()
+    assert not element.load(raw_value, {'fail_fast': True})
+    assert element.is_valid is False
+    assert element[0].is_valid is False
+    assert element[0][1].is_valid is None
+    assert element[0][1].value == 1
+    assert element[1].is_valid is None
+    assert element[1].value == [2]
+
+
+def test_iter_errors():
+    element = Something({
+        u"foo": u"spam",
+        u"bar": [(u"spam", u"1"), (u"eggs", u"foo")],
+        u"baz": {u"spam": [u"1", u"bar"]}
+    })
+    assert not element.validate()
+    assert [path for path, errors in traversal.iter_errors(element)] == [
+        (u"foo", ),
+        (u"bar", ),
+        (u"bar", 1),
+        (u"bar", 1, 1),
+        (u"baz", ),
+        (u"baz", u"spam"),
+        (u"baz", u"spam", 1)
+    ]
+    assert dict(traversal.iter_errors(element))[(u"foo", )] == [
+        u"Not a valid value."
+    ]
+    assert list(traversal.iter_errors(Integer(1))) == []
@@ -0,0 +1,236 @@
+# coding: utf-8
+"""
+    tests.test_cli
+    ~~~~~~~~~~~~~~
+
+    :copyright: 2013 by Daniel Neuhäuser
+    :license: BSD, see LICENSE.rst for details
+"""
+import io
+import json
+
+import pytest
+
+from relief import Form, Integer, Unicode, List
+from relief.cli import (
+    main, import_schema, validate_file, Checkpoint, CheckpointMismatch
+)
+
+
+class Record(Form):
+    id = Integer
+    name = Unicode
+    tags = List.of(Integer)
+
+
+LINES = [
+    b'{"id": 1, "name": "spam", "tags": [1]}\n',
+    b'{"id": "foo", "name": "eggs", "tags": []}\n',
+    b'\n',
+    b'{"id": 3, "name": "bacon", "tags": [2, "x"]}\n',
+    b'{"id": \n',
+    b'{"id": 5, "name": "ham", "tags": []}'
+]
+
+
+def test_import_schema():
+    assert import_schema('tests.test_cli:Record') is Record
+    assert import_schema(
+        'tests.test_cli:Record.member_schema'
+    ) is Record.member_schema
+    with pytest.raises(ValueError):
+        import_schema('tests.test_cli')
+    with pytest.raises(AttributeError):
+        import_schema('tests.test_cli:Missing')
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_validate_file(processes):
+    valid_output = io.BytesIO()
+    error_output = io.BytesIO()
+    stats = validate_file(
+        'tests.test_cli:Record', io.BytesIO(b''.join(LINES)),
+        valid_output, error_output, processes=processes, chunk_size=2
+    )
+    assert valid_output.getvalue() == LINES[0] + LINES[5] + b'\n'
+    reports = [
+        json.loads(line.decode('ascii'))
+        for line in error_output.getvalue().splitlines()
+    ]
+    assert [report['line'] for report in reports] == [2, 4, 5]
+    assert [error['path'] for error in reports[0]['errors']] == [['id']]
+    assert [error['path'] for error in reports[1]['errors']] == [
+        ['tags'], ['tags', 1]
+    ]
+    assert reports[2]['errors'][0]['path'] == []
+    assert (stats.lines, stats.valid, stats.invalid) == (6, 2, 3)
+    assert stats.bytes == len(b''.join(LINES))
+    assert u'2 valid, 3 invalid' in stats.format()
+
+
+def test_checkpoint(tmpdir):
+    checkpoint = Checkpoint(str(tmpdir.join('checkpoint.json')), every=1)
+    assert checkpoint.load() is None
+    valid_output = io.BytesIO()
+    error_output = io.BytesIO()
+    # validation interrupted after the first two chunks
+    validate_file(
+        'tests.test_cli:Record', io.BytesIO(b''.join(LINES[:4])),
+        valid_output, error_output, chunk_size=2, checkpoint=checkpoint
+    )
+    state = checkpoint.load()
+    assert state['stats']['lines'] == 4
+    assert state['stats']['error_paths'] == {'/id': 1, '/tags': 1, '/tags/*': 1}
+    # output written after the last checkpoint is discarded
+    valid_output.write(b'garbage')
+    error_output.write(b'garbage')
+
+    stats = validate_file(
+        'tests.test_cli:Record', io.BytesIO(b''.join(LINES)),
+        valid_output, error_output, chunk_size=2, checkpoint=checkpoint,
+        resume=True
+    )
+    assert (stats.lines, stats.valid, stats.invalid) == (6, 2, 3)
+    assert valid_output.getvalue() == LINES[0] + LINES[5] + b'\n'
+    reports = [
+        json.loads(line.decode('ascii'))
+        for line in error_output.getvalue().splitlines()
+    ]
+    assert [report['line'] for report in reports] == [2, 4, 5]
+    assert checkpoint.load()['stats']['lines'] == 6
+
+    with pytest.raises(CheckpointMismatch):
+        validate_file(
+            'tests.test_cli:Record.using', io.BytesIO(b''.join(LINES)),
+            checkpoint=checkpoint, resume=True
+        )
+
+
+def test_checkpoint_is_due():
+    checkpoint = Checkpoint('checkpoint.json', every=10, interval=3600)
+    stats = validate_file(
+        'tests.test_cli:Record', io.BytesIO(LINES[0] * 5)
+    )
+    assert not checkpoint.is_due(stats)
+    stats.valid = 10
+    assert checkpoint.is_due(stats)
+    checkpoint.interval = 0
+    stats.valid = 5
+    assert checkpoint.is_due(stats)
+
+
+def test_profile():
+    stats = validate_file(
+        'tests.test_cli:Record', io.BytesIO(b''.join(LINES)), profile=True
+    )
+    assert stats.profile['Converted'] > 0
+
+
+def test_main(tmpdir, capsys):
+    input = tmpdir.join('input.ndjson')
+    input.write_binary(b''.join(LINES))
+    valid = tmpdir.join('valid.ndjson')
+    errors = tmpdir.join('errors.ndjson')
+    assert main([
+        'validate', '--schema', 'tests.test_cli:Record', str(input),
+        '--valid-output', str(valid), '--error-output', str(errors)
+    ]) == 1
+    assert len(valid.read_binary().splitlines()) == 2
+    assert len(errors.read_binary().splitlines()) == 3
+    assert '5 records' in capsys.readouterr().err
+
+    input.write_binary(LINES[0])
+    assert main([
+        'validate', '--schema', 'tests.test_cli:Record', str(input),
+        '--error-output', str(errors)
+    ]) == 0
+    assert errors.read_binary() == b''
+
+
+def test_main_invalid_schema(tmpdir):
+    input = tmpdir.join('input.ndjson')
+    input.write_binary(b'')
+    with pytest.raises(SystemExit):
+        main(['validate', '--schema', 'tests.test_cli', str(input)])
+
+
+def test_main_resume(tmpdir, capsys):
+    input = tmpdir.join('input.ndjson')
+    input.write_binary(b''.join(LINES))
+    errors = tmpdir.join('errors.ndjson')
+    checkpoint = tmpdir.join('checkpoint.json')
+    arguments = [
+        'validate', '--schema', 'tests.test_cli:Record', str(input),
+        '--error-output', str(errors), '--checkpoint', str(checkpoint),
+        '--checkpoint-every', '1', '--chunk-size', '1', '--profile'
+    ]
+    assert main(arguments) == 1
+    assert main(arguments + ['--resume']) == 1
+    assert len(errors.read_binary().splitlines()) == 3
+    err = capsys.readouterr().err
+    assert 'errors at /id' in err
+    assert 'in Converted' in err
+
+    with pytest.raises(SystemExit):
+        main(arguments[:6] + ['--resume'])
+
+
+def test_main_resume_without_checkpoint(tmpdir):
+    input = tmpdir.join('input.ndjson')
+    input.write_binary(b''.join(LINES))
+    valid = tmpdir.join('valid.ndjson')
+    errors = tmpdir.join('errors.ndjson')
+    arguments = [
+        'validate', '--schema', 'tests.test_cli:Record', str(input),
+        '--valid-output', str(valid), '--error-output', str(errors)
+    ]
+    assert main(arguments) == 1
+    # interrupted before the first checkpoint has been saved
+    assert main(arguments + [
+        '--checkpoint', str(tmpdir.join('checkpoint.json')), '--resume'
+    ]) == 1
+    assert len(valid.read_binary().splitlines()) == 2
+    assert len(errors.read_binary().splitlines()) == 3
+
+
+def failing(element, context):
+    raise ValueError("failing validator")
+
+
+Failing = Record.validated_by([failing])
+
+
+def test_main_validator_errors_are_reported(tmpdir):
+    input = tmpdir.join('input.ndjson')
+    input.write_binary(LINES[0])
+    errors = tmpdir.join('errors.ndjson')
+    assert main([
+        'validate', '--schema', 'tests.test_cli:Failing', str(input),
+        '--error-output', str(errors)
+    ]) == 1
+    report = json.loads(errors.read_binary().decode('ascii'))
+    assert report['errors'][0]['errors'] == [
+        u'Cannot be loaded: ValueError: failing validator'
+    ]
+
+
+@pytest.mark.parametrize("processes", ["1", "2"])
+def test_main_bad_record(tmpdir, processes):
+    input = tmpdir.join('input.ndjson')
+    input.write_binary(
+        LINES[0] + b'{"id": 2, "name": "eggs", "tags": [], "bacon": 1}\n' +
+        LINES[5]
+    )
+    valid = tmpdir.join('valid.ndjson')
+    errors = tmpdir.join('errors.ndjson')
+    assert main([
+        'validate', '--schema', 'tests.test_cli:Record', str(input),
+        '--valid-output', str(valid), '--error-output', str(errors),
+        '-j', processes, '--chunk-size', '1'
+    ]) == 1
+    assert valid.read_binary() == LINES[0] + LINES[5] + b'\n'
+    report = json.loads(errors.read_binary().decode('ascii'))
+    assert report['line'] == 2
+    error, = report['errors']
+    assert error['path'] == []
+    assert error['errors'][0].startswith(u'Cannot be loaded: KeyError')
@@ -6,7 +6,9 @@
     :copyright: 2013 by Daniel Neuhäuser
     :license: BSD, see LICENSE.rst for details
 """
-from relief import Unspecified, NotUnserializable
+import pickle
+
+from relief import Unspecified, NotUnserializable, Unnamed
 from relief._compat import text_type
 
 
@@ -23,6 +25,9 @@ class TestUnspecified(object):
     def test_repr(self):
         assert repr(Unspecified) == 'Unspecified'
 
+    def test_pickle(self):
+        assert pickle.loads(pickle.dumps(Unspecified)) is Unspecified
+
 
 class TestNotUnserializable(object):
     def test_bool(self):
@@ -36,3 +41,10 @@ class TestNotUnserializable(object):
 
     def test_repr(self):
         assert repr(NotUnserializable) == 'NotUnserializable'
+
+    def test_pickle(self):
+        assert pickle.loads(pickle.dumps(NotUnserializable)) is NotUnserializable
+
+
+def test_pickle_unnamed():
+    assert pickle.loads(pickle.dumps(Unnamed)) is Unnamed
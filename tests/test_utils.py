@@ -11,7 +11,11 @@ import inspect
 
 import pytest
 
-from relief.utils import class_cloner, InheritingDictDescriptor
+from relief import Integer, Unspecified
+from relief.utils import (
+    class_cloner, InheritingDictDescriptor, ElementPool, LRUCache, map_ordered,
+    read_chunks
+)
 
 
 class TestClassCloner(object):
@@ -190,3 +194,94 @@ class TestInheritingDictDescriptor(object):
 
         foo = Foo()
         assert repr(foo.properties) == "{'foo': 1}"
+
+
+class TestElementPool(object):
+    def test_element(self):
+        pool = ElementPool(Integer)
+        with pool.element() as element:
+            element.set_from_raw(u'1')
+            assert element.validate()
+        assert len(pool) == 1
+        with pool.element() as recycled:
+            assert recycled is element
+            assert recycled.value is Unspecified
+            assert recycled.is_valid is None
+        assert len(pool) == 1
+
+    def test_element_releases_on_error(self):
+        pool = ElementPool(Integer)
+        with pytest.raises(ValueError):
+            with pool.element():
+                raise ValueError()
+        assert len(pool) == 1
+
+    def test_maxsize(self):
+        pool = ElementPool(Integer, maxsize=1)
+        a = pool.acquire()
+        b = pool.acquire()
+        assert a is not b
+        pool.release(a)
+        pool.release(b)
+        assert len(pool) == 1
+
+
+class TestLRUCache(object):
+    def test_get_set(self):
+        cache = LRUCache(maxsize=2)
+        assert cache.get(1) is None
+        cache.set(1, u'one')
+        assert cache.get(1) == u'one'
+        assert cache.statistics() == {
+            'hits': 1, 'misses': 1, 'size': 1, 'maxsize': 2
+        }
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(maxsize=2)
+        cache.set(1, u'one')
+        cache.set(2, u'two')
+        cache.get(1)
+        cache.set(3, u'three')
+        assert len(cache) == 2
+        assert cache.get(2) is None
+        assert cache.get(1) == u'one'
+        assert cache.get(3) == u'three'
+
+    def test_unhashable(self):
+        cache = LRUCache()
+        with pytest.raises(TypeError):
+            cache.get([])
+
+    def test_clear(self):
+        cache = LRUCache()
+        cache.set(1, u'one')
+        cache.get(1)
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.hits == cache.misses == 0
+
+
+def square(number):
+    return number * number
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_map_ordered(processes):
+    consumed = []
+
+    def tasks():
+        for number in range(20):
+            consumed.append(number)
+            yield number
+
+    results = map_ordered(square, tasks(), processes)
+    assert next(results) == 0
+    # tasks are read only a bounded amount ahead of the results
+    assert len(consumed) <= 2 * processes + 1
+    assert list(results) == [number * number for number in range(1, 20)]
+
+
+def test_read_chunks():
+    assert list(read_chunks(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(read_chunks(range(4), 2)) == [[0, 1], [2, 3]]
+    assert list(read_chunks([], 2)) == []
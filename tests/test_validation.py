@@ -6,13 +6,22 @@
     :copyright: 2013 by Daniel Neuhäuser
     :license: BSD, see LICENSE.rst for details
 """
+import time
+
+import pytest
+
 from relief.validation import (
     Present, Converted, IsTrue, IsFalse, ShorterThan, LongerThan,
     LengthWithinRange, ContainedIn, LessThan, GreaterThan, WithinRange,
-    ItemsEqual, AttributesEqual, ProbablyAnEmailAddress, MatchesRegex, IsURL
+    ItemsEqual, AttributesEqual, ProbablyAnEmailAddress, MatchesRegex, IsURL,
+    UniqueItems, UniqueBy, ValidatorOrder, FusedBounds, optimize_chain
 )
+from relief import Unspecified, ValidationContext
+from relief.validation import _find_duplicates
 from relief.schema.scalars import Unicode, Integer
 from relief.schema.mappings import Dict, Form
+from relief.schema.sequences import List
+from relief.utils import LRUCache
 
 
 def test_present():
@@ -141,6 +150,22 @@ def test_contained_in():
     assert unicode.errors == [u"Not a valid value."]
 
 
+def test_contained_in_freezes_options():
+    assert ContainedIn([u"foo", u"bar"]).options == frozenset([u"foo", u"bar"])
+    assert ContainedIn([[u"foo"]]).options == [[u"foo"]]
+    assert ContainedIn(u"foobar").options == u"foobar"
+
+
+def test_contained_in_unhashable_value():
+    Validated = List.of(Integer).validated_by([ContainedIn([(1, 2), (3, )])])
+    element = Validated([1, 2])
+    assert not element.validate()
+    assert element.errors == [u"Not a valid value."]
+
+    Validated = List.of(Integer).validated_by([ContainedIn([(1, 2), [3]])])
+    assert Validated([3]).validate()
+
+
 def test_less_than():
     Validated = Integer.validated_by([LessThan(3)])
     integer = Validated(2)
@@ -291,3 +316,279 @@ def test_is_url():
     element = Validated()
     assert not element.validate()
     assert element.errors == ['Must be a URL.']
+
+
+def test_unique_items():
+    Validated = List.of(Integer).validated_by([UniqueItems(max_reported=2)])
+    element = Validated([1, 2, 3])
+    assert element.validate()
+    assert not element.errors
+
+    element = Validated([1, 2, 1, 1, 2])
+    assert not element.validate()
+    assert element.errors == [u"Must not contain duplicates, found at 2, 3."]
+
+    element = Validated()
+    assert not element.validate()
+    assert element.errors == [u"Must not contain duplicates."]
+
+
+def test_unique_items_unhashable():
+    Validated = List.of(List.of(Integer)).validated_by([UniqueItems()])
+    element = Validated([[1], [2], [1], [2], [1]])
+    assert not element.validate()
+    assert element.errors == [u"Must not contain duplicates, found at 2, 3, 4."]
+
+    Validated = List.of(Dict.of(Integer, Integer)).validated_by([UniqueItems()])
+    element = Validated([{1: 1}, {1: 2}, {1: 1}])
+    assert not element.validate()
+    assert element.errors == [u"Must not contain duplicates, found at 2."]
+
+
+@pytest.mark.parametrize(("keys", "duplicates"), [
+    ([1, 1, [2]], [1]),
+    ([[2], 1, 1, [2]], [2, 3]),
+    ([frozenset([1]), frozenset([2]), [3], frozenset([1])], [3]),
+    ([set([1]), set([2]), set([3]), set([1])], [3])
+])
+def test_find_duplicates_fallbacks(keys, duplicates):
+    assert _find_duplicates(keys, 10) == duplicates
+
+
+def test_unique_by():
+    Validated = List.of(Form.of({"id": Integer})).validated_by([
+        UniqueBy(lambda item: item["id"])
+    ])
+    element = Validated([{"id": 1}, {"id": 2}])
+    assert element.validate()
+    assert not element.errors
+
+    element = Validated([{"id": 1}, {"id": 2}, {"id": 1}])
+    assert not element.validate()
+    assert element.errors == [u"Must not contain duplicates, found at 2."]
+
+
+def test_validator_order_cost():
+    cheap = ShorterThan(3)
+    expensive = MatchesRegex(u'^a+$')
+    order = ValidatorOrder([expensive, cheap])
+    assert order.order == [cheap, expensive]
+
+    def impure(element, context):
+        return True
+    order = ValidatorOrder([expensive, impure, expensive, cheap])
+    assert order.order == [expensive, impure, cheap, expensive]
+
+
+def test_validator_order_adaptive():
+    rarely_fails = LongerThan(0)
+    often_fails = ShorterThan(3)
+    Validated = Unicode.validated_by([rarely_fails, often_fails]).using(
+        validator_order='adaptive'
+    )
+    for _ in range(200):
+        element = Validated(u'abcd')
+        assert not element.validate()
+        assert element.errors == [u"Must be shorter than 3."]
+    order = Validated._validator_order_cache
+    calls, rejections, runtime = order.statistics[1]
+    assert rejections == 200
+    assert order.order == [often_fails, rarely_fails]
+    assert order.statistics[0][0] < 200
+
+
+def test_all_errors():
+    Validated = Unicode.validated_by([ShorterThan(3), MatchesRegex(u'^a+$')])
+    element = Validated(u'bbbb')
+    assert not element.validate()
+    assert element.errors == [u"Must be shorter than 3."]
+
+    element = Validated.using(validator_order='cost')(u'bbbb')
+    assert not element.validate({'all_errors': True})
+    assert element.errors == [
+        u"Must be shorter than 3.", u"Must be a valid value."
+    ]
+
+
+def test_memoize():
+    calls = []
+
+    class CountingIsURL(IsURL):
+        cache = LRUCache()
+        # validate is overridden, so memoization has to be enabled again
+        memoize = True
+
+        def validate(self, element, context):
+            calls.append(element.value)
+            return super(CountingIsURL, self).validate(element, context)
+
+    Validated = Unicode.validated_by([CountingIsURL()])
+    for _ in range(3):
+        element = Validated(u'example.com')
+        assert not element.validate()
+        assert element.errors == [u'Must be a URL.']
+        element = Validated(u'http://example.com')
+        assert element.validate()
+        assert not element.errors
+    assert calls == [u'example.com', u'http://example.com']
+    assert CountingIsURL.cache.statistics()['hits'] == 4
+    assert CountingIsURL.cache.statistics()['misses'] == 2
+
+
+def test_memoize_not_inherited_by_overridden_validate():
+    class ContainedInContext(ContainedIn):
+        cache = LRUCache()
+
+        def __init__(self):
+            super(ContainedInContext, self).__init__([])
+
+        def validate(self, element, context):
+            self.options = context[u'options']
+            return super(ContainedInContext, self).validate(element, context)
+
+    class Inheriting(ContainedIn):
+        cache = LRUCache()
+
+    Validated = Unicode.validated_by([ContainedInContext()])
+    assert Validated(u'a').validate({u'options': [u'a']})
+    assert not Validated(u'a').validate({u'options': [u'b']})
+    assert ContainedInContext.cache.statistics()['misses'] == 0
+
+    Validated = Unicode.validated_by([Inheriting([u'a'])])
+    assert Validated(u'a').validate()
+    assert Validated(u'a').validate()
+    assert Inheriting.cache.statistics()['hits'] == 1
+
+
+def test_optimize_chain():
+    present = Present()
+    shorter = ShorterThan(5)
+    longer = LongerThan(1)
+    regex = MatchesRegex(u'^a+$')
+    impure = lambda element, context: True
+    chain = optimize_chain([
+        present, Present(), shorter, longer, ShorterThan(5), regex, impure,
+        Present()
+    ])
+    assert len(chain) == 5
+    assert chain[0] is present
+    assert isinstance(chain[1], FusedBounds)
+    assert chain[1].validators == [shorter, longer]
+    assert chain[2:4] == [regex, impure]
+    assert isinstance(chain[4], Present)
+
+
+def test_optimized_errors_unchanged():
+    validators = [
+        Present(), Present(), LongerThan(1), ShorterThan(4), ShorterThan(4),
+        GreaterThan(u'b')
+    ]
+    Validated = Unicode.validated_by(validators)
+    Unoptimized = Validated.using(optimize_validators=False)
+    for value in [Unspecified, u'a', u'aaaa', u'aa', u'cc']:
+        optimized = Validated(value)
+        unoptimized = Unoptimized(value)
+        assert optimized.validate() == unoptimized.validate()
+        assert optimized.errors == unoptimized.errors
+    assert len(Validated._optimized_validators_cache[1]) == 3
+
+
+def test_validation_context_mapping():
+    values = {u'foo': 1}
+    context = ValidationContext(values, bar=2)
+    assert context == {u'foo': 1, u'bar': 2}
+    assert context[u'foo'] == 1
+    assert context.get(u'baz') is None
+    context[u'baz'] = 3
+    assert u'baz' in context
+    del context[u'baz']
+    assert len(context) == 2
+    assert ValidationContext.coerce(context) is context
+    assert ValidationContext.coerce(None) == {}
+
+
+def test_validation_context_flags():
+    context = ValidationContext()
+    assert not context.instrumented
+    assert not context.limited
+    context['trace'] = lambda validator, element, result: None
+    assert context.instrumented
+    context['error_budget'] = 1
+    assert context.limited
+
+
+def test_validation_context_trace_and_profile():
+    traced = []
+    profile = {}
+    validator = ShorterThan(3)
+    element = Unicode.validated_by([validator])(u'abcd')
+    context = ValidationContext(
+        trace=lambda *args: traced.append(args), profile=profile
+    )
+    assert not element.validate(context)
+    assert traced == [(validator, element, False)]
+    assert list(profile) == [validator]
+
+    # plain mappings still work, when validators are called directly
+    traced = []
+    validator(element, {'trace': lambda *args: traced.append(args)})
+    assert traced == [(validator, element, False)]
+
+
+def test_profile_optimized_validators():
+    validators = [LongerThan(1), ShorterThan(3)]
+    element = Unicode.validated_by(validators)(u'ab')
+    assert element.validate()
+    profile = {}
+    assert element.validate({'profile': profile})
+    assert set(profile) == set(validators)
+
+
+def test_fail_fast():
+    element = List.of(Integer)([1, u'foo', u'bar'])
+    context = ValidationContext(fail_fast=True)
+    assert not element.validate(context)
+    assert context.stopped
+    assert element[1].is_valid is False
+    assert element[2].is_valid is None
+
+
+def test_error_budget():
+    element = List.of(Integer)([u'foo', u'bar', u'baz'])
+    context = ValidationContext(error_budget=2)
+    assert not element.validate(context)
+    assert context.errors_noted == 2
+    assert element[1].is_valid is False
+    assert element[2].is_valid is None
+
+
+def test_timeout():
+    def slow(element, context):
+        time.sleep(0.01)
+        return True
+
+    element = List.of(Integer.validated_by([slow]))(list(range(100)))
+    context = ValidationContext(timeout=0.02)
+    assert not element.validate(context)
+    assert context.stopped
+    assert context.interrupted
+    assert element.is_valid is None
+    assert element[0].is_valid
+    assert element[-1].is_valid is None
+
+
+def test_cancel():
+    def cancelling(element, context):
+        context.cancel()
+        return True
+
+    Validated = Form.of([
+        ("spam", Integer.validated_by([cancelling])), ("eggs", Integer)
+    ])
+    form = Validated({"spam": 1, "eggs": 2})
+    context = ValidationContext()
+    assert not form.validate(context)
+    assert context.interrupted
+    assert form.is_valid is None
+    assert form.spam.is_valid
+    assert form.eggs.is_valid is None